@@ -9,6 +9,7 @@ OKX 量化交易机器人 - 主程序
 import sys
 import time
 import signal
+import threading
 import argparse
 from datetime import datetime
 
@@ -42,6 +43,7 @@ class TradingBot:
 
         # WebSocket客户端
         self.ws_client = None
+        self.private_ws_client = None
 
         # 初始化策略
         strategy_type = self.config.get('trading.strategy_type', 'position')  # 默认使用position策略
@@ -124,8 +126,15 @@ class TradingBot:
         self.logger.info("OKX 量化交易机器人初始化完成")
         self.logger.info("=" * 60)
 
-    def run_live(self):
-        """运行实盘/模拟盘交易"""
+    def run_live(self, stop_event: threading.Event = None):
+        """
+        运行实盘/模拟盘交易
+
+        Args:
+            stop_event: 停止通知（在其他线程中运行时使用），置位后主循环立即退出
+        """
+        if stop_event is None:
+            stop_event = threading.Event()
         try:
             self.logger.info("启动实时交易模式...")
             self.is_running = True
@@ -175,16 +184,39 @@ class TradingBot:
             # 订阅行情数据
             self.ws_client.subscribe_ticker(symbol, self.on_ticker)
 
+            # 盘口驱动的策略订阅最优买卖价
+            if hasattr(self.strategy, 'on_bbo'):
+                self.ws_client.subscribe_bbo(symbol, self.on_bbo)
+
             # 订阅订单更新（需要登录）
             # self.ws_client.subscribe_orders(callback=self.on_order_update)
 
+            # 持仓/订单推送走私有频道，策略不再轮询REST持仓接口
+            if hasattr(self.strategy, 'on_position_update'):
+                try:
+                    self.private_ws_client = OKXWebSocket(
+                        api_key=okx_config['api_key'],
+                        secret_key=okx_config['secret_key'],
+                        passphrase=okx_config['passphrase'],
+                        is_simulated=okx_config.get('is_simulated', True),
+                        channel_type='private'
+                    )
+                    self.private_ws_client.connect()
+                    self.private_ws_client.subscribe_positions('SWAP', self.on_position_update)
+                    self.private_ws_client.subscribe_orders('SWAP', self.on_order_update)
+                    self.strategy.fill_push_enabled = True
+                except Exception as e:
+                    # 私有频道不可用时策略继续定期轮询REST持仓接口
+                    self.logger.warning(f"订阅持仓推送失败，改用轮询: {e}")
+
             self.logger.info("WebSocket已连接，开始监听市场数据...")
 
             # 主循环
-            while self.is_running:
+            while self.is_running and not stop_event.is_set():
                 try:
-                    # 定期检查订单状态
-                    time.sleep(5)
+                    # 定期检查订单状态（收到停止通知时立即醒来）
+                    if stop_event.wait(5):
+                        break
 
                     # 获取待成交订单
                     orders = self.api_client.get_pending_orders(inst_id=symbol)
@@ -292,6 +324,20 @@ class TradingBot:
         except Exception as e:
             self.logger.error(f"处理行情数据异常: {e}")
 
+    def on_bbo(self, data):
+        """处理最优买卖价数据"""
+        try:
+            self.strategy.on_bbo(data)
+        except Exception as e:
+            self.logger.error(f"处理盘口数据异常: {e}")
+
+    def on_position_update(self, data):
+        """处理持仓推送"""
+        try:
+            self.strategy.on_position_update(data)
+        except Exception as e:
+            self.logger.error(f"处理持仓推送异常: {e}")
+
     def on_order_update(self, data):
         """处理订单更新"""
         try:
@@ -310,12 +356,19 @@ class TradingBot:
         except Exception as e:
             self.logger.error(f"取消订单失败: {e}")
 
+        # 释放策略资源
+        try:
+            self.strategy.close()
+        except Exception as e:
+            self.logger.error(f"关闭策略失败: {e}")
+
         # 断开WebSocket
-        if self.ws_client:
-            try:
-                self.ws_client.disconnect()
-            except Exception as e:
-                self.logger.error(f"断开WebSocket失败: {e}")
+        for ws_client in (self.ws_client, self.private_ws_client):
+            if ws_client:
+                try:
+                    ws_client.disconnect()
+                except Exception as e:
+                    self.logger.error(f"断开WebSocket失败: {e}")
 
         self.logger.info("交易机器人已停止")
 
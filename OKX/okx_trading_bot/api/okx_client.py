@@ -7,8 +7,28 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from functools import wraps
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlencode
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时退回标准库json
+    orjson = None
+
+
+def _dumps_body(data: Dict) -> bytes:
+    """序列化请求体为紧凑的UTF-8字节串（签名与发送使用同一份字节）"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _loads_body(content: bytes) -> Dict:
+    """解析响应体，安装了orjson时直接从字节串解析"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
 
 class RateLimiter:
     """API请求频率限制器"""
@@ -87,15 +107,26 @@ class OKXClient:
                 'https': proxy
             }
 
+        # 复用连接的会话，连续请求不必每次重新握手TLS
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount('https://', adapter)
+        self.session.headers['Connection'] = 'keep-alive'
+
         # 频率限制器 - 按OKX规则: 私有接口 10次/秒
         self.rate_limiter = RateLimiter(max_calls=10, period=1.0)
 
-    def _generate_signature(self, timestamp: str, method: str, request_path: str, body: str = '') -> str:
+        # 合约信息缓存: inst_type -> (缓存时间, {instId: 合约信息})
+        self._instruments_cache = {}
+        self._instruments_cache_ttl = 3600
+        self._instruments_lock = threading.Lock()
+
+    def _generate_signature(self, timestamp: str, method: str, request_path: str, body: bytes = b'') -> str:
         """生成签名"""
-        message = timestamp + method + request_path + body
+        message = (timestamp + method + request_path).encode('utf-8') + body
         mac = hmac.new(
             bytes(self.secret_key, encoding='utf-8'),
-            bytes(message, encoding='utf-8'),
+            message,
             digestmod='sha256'
         )
         signature = base64.b64encode(mac.digest()).decode()
@@ -119,9 +150,9 @@ class OKXClient:
             request_path = f"{endpoint}?{query_string}"
 
         # 构建请求体
-        body = ''
+        body = b''
         if data:
-            body = json.dumps(data)
+            body = _dumps_body(data)
 
         # 生成签名
         signature = self._generate_signature(timestamp, method, request_path, body)
@@ -134,19 +165,26 @@ class OKXClient:
         # 发送请求
         try:
             if method == 'GET':
-                response = requests.get(url, headers=headers, params=params, proxies=self.proxies, timeout=30)
+                response = self.session.get(url, headers=headers, params=params, proxies=self.proxies, timeout=30)
             elif method == 'POST':
-                response = requests.post(url, headers=headers, json=data, proxies=self.proxies, timeout=30)
+                response = self.session.post(url, headers=headers, data=body, proxies=self.proxies, timeout=30)
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
 
             response.raise_for_status()
-            result = response.json()
+            try:
+                result = _loads_body(response.content)
+            except ValueError as e:
+                raise Exception(f"Invalid JSON response: {str(e)}")
 
             # 检查API返回的错误码 - 频率限制错误码50011需要重试
             if result.get('code') == '50011':
                 raise Exception("Rate limit exceeded, will retry...")
 
+            # 批量接口部分成功返回2，逐单结果见data中的sCode，不能重试（会重复下单）
+            if result.get('code') == '2':
+                return result
+
             if result.get('code') != '0':
                 raise Exception(f"API Error: {result.get('msg', 'Unknown error')}")
 
@@ -321,6 +359,22 @@ class OKXClient:
         params = {'instType': inst_type}
         return self._request('GET', endpoint, params=params)
 
+    def get_instrument(self, inst_type: str, inst_id: str) -> Optional[Dict]:
+        """
+        获取单个交易产品信息（带缓存，同一类型的产品列表在有效期内只请求一次）
+
+        Returns:
+            产品信息，不存在时返回None
+        """
+        with self._instruments_lock:
+            cached = self._instruments_cache.get(inst_type)
+            if cached is None or time.time() - cached[0] > self._instruments_cache_ttl:
+                result = self.get_instruments(inst_type)
+                cached = (time.time(), {inst['instId']: inst for inst in result['data']})
+                self._instruments_cache[inst_type] = cached
+
+        return cached[1].get(inst_id)
+
     def get_funding_rate(self, inst_id: str) -> Dict:
         """获取永续合约资金费率"""
         endpoint = '/api/v5/public/funding-rate'
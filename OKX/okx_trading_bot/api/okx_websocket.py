@@ -35,7 +35,9 @@ class OKXWebSocket:
 
         self.ws = None
         self.callbacks: Dict[str, List[Callable]] = {}
+        self.subscriptions: List[Dict] = []  # 已订阅的频道参数，重连后重新订阅
         self.is_connected = False
+        self.login_event = threading.Event()  # 私有频道登录成功后置位
         self.ping_thread = None
         self.reconnect_count = 0
         self.max_reconnect = 5
@@ -58,7 +60,13 @@ class OKXWebSocket:
 
             # 处理订阅确认
             if 'event' in data:
-                if data['event'] == 'subscribe':
+                if data['event'] == 'login':
+                    if data.get('code') == '0':
+                        print("WebSocket登录成功")
+                        self.login_event.set()
+                    else:
+                        print(f"WebSocket登录失败: {data.get('msg', 'Unknown error')}")
+                elif data['event'] == 'subscribe':
                     print(f"订阅成功: {data.get('arg', {})}")
                 elif data['event'] == 'error':
                     print(f"订阅错误: {data.get('msg', 'Unknown error')}")
@@ -153,6 +161,7 @@ class OKXWebSocket:
 
     def connect(self):
         """建立WebSocket连接"""
+        self.login_event.clear()
         websocket.enableTrace(False)
         self.ws = websocket.WebSocketApp(
             self.ws_url,
@@ -175,6 +184,14 @@ class OKXWebSocket:
         if not self.is_connected:
             raise Exception("WebSocket连接超时")
 
+        # 私有频道需等待登录完成后才能订阅
+        if self.channel_type == 'private' and not self.login_event.wait(timeout):
+            raise Exception("WebSocket登录超时")
+
+        # 重连时恢复之前的订阅（回调函数仍保留在callbacks中）
+        if self.subscriptions:
+            self.ws.send(json.dumps({"op": "subscribe", "args": self.subscriptions}))
+
         # 启动ping线程
         self.ping_thread = threading.Thread(target=self._ping_loop, daemon=True)
         self.ping_thread.start()
@@ -187,7 +204,8 @@ class OKXWebSocket:
         if self.ws:
             self.ws.close()
 
-    def subscribe(self, channel: str, inst_id: str = None, callback: Callable = None):
+    def subscribe(self, channel: str, inst_id: str = None, callback: Callable = None,
+                  inst_type: str = None):
         """
         订阅频道
 
@@ -195,12 +213,15 @@ class OKXWebSocket:
             channel: 频道名称 (tickers, candle1m, books, trades等)
             inst_id: 产品ID
             callback: 数据回调函数
+            inst_type: 产品类型（positions、orders等私有频道按类型订阅）
         """
         if not self.is_connected:
             raise Exception("WebSocket未连接")
 
         # 构建订阅消息
         args = {"channel": channel}
+        if inst_type:
+            args["instType"] = inst_type
         if inst_id:
             args["instId"] = inst_id
 
@@ -211,6 +232,8 @@ class OKXWebSocket:
 
         # 发送订阅消息
         self.ws.send(json.dumps(subscribe_msg))
+        if args not in self.subscriptions:
+            self.subscriptions.append(args)
 
         # 注册回调函数
         if callback:
@@ -234,6 +257,8 @@ class OKXWebSocket:
         }
 
         self.ws.send(json.dumps(unsubscribe_msg))
+        self.subscriptions = [sub for sub in self.subscriptions
+                              if (sub.get('channel'), sub.get('instId')) != (channel, inst_id)]
 
         # 移除回调函数
         callback_key = f"{channel}:{inst_id}" if inst_id else channel
@@ -270,6 +295,10 @@ class OKXWebSocket:
         channel = f"books{depth}"
         self.subscribe(channel, inst_id, callback)
 
+    def subscribe_bbo(self, inst_id: str, callback: Callable):
+        """订阅最优买卖价（逐笔推送，买一/卖一变化即推送）"""
+        self.subscribe("bbo-tbt", inst_id, callback)
+
     def subscribe_trades(self, inst_id: str, callback: Callable):
         """订阅交易数据"""
         self.subscribe("trades", inst_id, callback)
@@ -280,8 +309,8 @@ class OKXWebSocket:
 
     def subscribe_positions(self, inst_type: str = "SWAP", callback: Callable = None):
         """订阅持仓信息（需要登录）"""
-        self.subscribe("positions", inst_type, callback)
+        self.subscribe("positions", callback=callback, inst_type=inst_type)
 
     def subscribe_orders(self, inst_type: str = "SWAP", callback: Callable = None):
         """订阅订单信息（需要登录）"""
-        self.subscribe("orders", inst_type, callback)
+        self.subscribe("orders", callback=callback, inst_type=inst_type)
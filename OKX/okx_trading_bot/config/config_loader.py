@@ -2,6 +2,12 @@ import yaml
 import os
 from typing import Any, Dict
 
+# 优先使用libyaml的C实现，未编译libyaml时退回纯Python实现
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 
 class Config:
     """配置加载器"""
@@ -11,7 +17,7 @@ class Config:
             config_path = os.path.join(os.path.dirname(__file__), 'config.yaml')
 
         with open(config_path, 'r', encoding='utf-8') as f:
-            self.config: Dict[str, Any] = yaml.safe_load(f)
+            self.config: Dict[str, Any] = yaml.load(f, Loader=YamlLoader)
 
     def get(self, key: str, default: Any = None) -> Any:
         """获取配置项，支持点号分隔的嵌套路径"""
@@ -14,6 +14,8 @@
 
 import time
 import statistics
+from collections import deque
+from itertools import islice
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from .base_strategy import BaseStrategy
@@ -55,7 +57,7 @@ class AdvancedStrategy(BaseStrategy):
 
         # 数据存储
         self.price_data = {
-            '1m': [],
+            '1m': deque(maxlen=100),  # 实时价格，超出长度自动丢弃最旧的
             '5m': [],
             '15m': []
         }
@@ -93,14 +95,11 @@ class AdvancedStrategy(BaseStrategy):
     def _load_instrument_info(self):
         """加载合约信息"""
         try:
-            instruments = self.api_client.get_instruments('SWAP')
-            if instruments['code'] == '0':
-                for inst in instruments['data']:
-                    if inst['instId'] == self.symbol:
-                        self.contract_value = float(inst.get('ctVal', 10000000))
-                        self.min_size = float(inst.get('minSz', 0.1))
-                        self.lot_size = float(inst.get('lotSz', 0.1))
-                        break
+            inst = self.api_client.get_instrument('SWAP', self.symbol)
+            if inst:
+                self.contract_value = float(inst.get('ctVal', 10000000))
+                self.min_size = float(inst.get('minSz', 0.1))
+                self.lot_size = float(inst.get('lotSz', 0.1))
         except Exception as e:
             self.logger.warning(f"获取合约信息失败: {e}")
 
@@ -116,8 +115,6 @@ class AdvancedStrategy(BaseStrategy):
 
             # 更新1分钟数据
             self.price_data['1m'].append(current_price)
-            if len(self.price_data['1m']) > 100:
-                self.price_data['1m'].pop(0)
 
             # 每30秒检查一次
             current_time = time.time()
@@ -192,7 +189,7 @@ class AdvancedStrategy(BaseStrategy):
         """计算移动平均"""
         if len(prices) < period:
             return None
-        return sum(prices[-period:]) / period
+        return sum(islice(prices, len(prices) - period, None)) / period
 
     def calculate_ema(self, prices: List[float], period: int) -> Optional[float]:
         """计算指数移动平均"""
@@ -210,6 +207,8 @@ class AdvancedStrategy(BaseStrategy):
         if len(prices) < period + 1:
             return None
 
+        # 只有最近period个涨跌参与计算
+        prices = list(islice(prices, len(prices) - period - 1, None))
         gains = []
         losses = []
 
@@ -1,7 +1,12 @@
+import os
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional
 
 
+# 策略运行状态（指标缓存、挂单检查点等）目录固定在包目录下，不随启动时的工作目录变化
+STATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'state')
+
+
 class BaseStrategy(ABC):
     """策略基类"""
 
@@ -59,3 +64,7 @@ class BaseStrategy(ABC):
     def get_order(self, order_id: str) -> Optional[Dict]:
         """获取指定订单"""
         return self.pending_orders.get(order_id)
+
+    def close(self):
+        """释放策略持有的资源（线程池、后台线程等），机器人停止时在撤单之后调用"""
+        pass
@@ -2,12 +2,19 @@
 增强版量化策略 - 多指标组合
 整合: MACD + KDJ + RSI + 布林带 + 动态仓位管理 + 智能止盈止损
 """
+import os
+import json
+import math
 import time
 import statistics
+import numpy as np
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, STATE_DIR
 from ..utils.logger import setup_logger
+from ..utils.helpers import format_number
 
 
 class EnhancedStrategy(BaseStrategy):
@@ -41,17 +48,38 @@ class EnhancedStrategy(BaseStrategy):
         self.rsi_period = config.get('rsi_period', 14)
         self.bb_period = config.get('bb_period', 20)
 
+        # 平滑系数（只计算一次）
+        self._alpha_fast = 2.0 / (self.macd_fast + 1)
+        self._alpha_slow = 2.0 / (self.macd_slow + 1)
+        self._alpha_signal = 2.0 / (self.macd_signal + 1)
+        self._alpha_k = 1.0 / self.kdj_m1
+        self._alpha_d = 1.0 / self.kdj_m2
+
         # 合约信息
         self.contract_value = 0.01
         self.min_size = 0.01
         self.lot_size = 0.01
         self._load_instrument_info()
 
-        # 数据缓存
-        self.price_history = []
+        # 市价单公共参数
+        self._order_template = {
+            'inst_id': self.symbol,
+            'order_type': 'market',
+            'pos_side': 'net',
+            'td_mode': 'cross'
+        }
+
+        # 数据缓存（price_history 是 close_history 的别名）
         self.high_history = []
         self.low_history = []
-        self.close_history = []
+        self.close_history = array('d')  # 连续存储的float64，比list[float]更紧凑
+
+        # 指标状态持久化（重启后免预热）
+        self.state_file = config.get('state_file', os.path.join(STATE_DIR, f"enhanced_{self.symbol}.json"))
+        self.state_persist_interval = config.get('state_persist_interval', 60)
+        self.state_max_age = config.get('state_max_age', 600)
+        self._last_persist = 0
+        self._load_state()
 
         # 交易状态
         self.current_position = None
@@ -62,6 +90,9 @@ class EnhancedStrategy(BaseStrategy):
 
         self.last_check_time = 0
 
+        # K线与持仓查询并发执行，隐藏网络延迟
+        self._io_pool = ThreadPoolExecutor(max_workers=2)
+
         self.logger.info("=" * 60)
         self.logger.info("🚀 增强版多指标策略初始化")
         self.logger.info("=" * 60)
@@ -73,26 +104,80 @@ class EnhancedStrategy(BaseStrategy):
     def _load_instrument_info(self):
         """加载合约信息"""
         try:
-            instruments = self.api_client.get_instruments('SWAP')
-            if instruments['code'] == '0':
-                for inst in instruments['data']:
-                    if inst['instId'] == self.symbol:
-                        self.contract_value = float(inst.get('ctVal', 0.01))
-                        self.min_size = float(inst.get('minSz', 0.01))
-                        self.lot_size = float(inst.get('lotSz', 0.01))
-                        break
+            inst = self.api_client.get_instrument('SWAP', self.symbol)
+            if inst:
+                self.contract_value = float(inst.get('ctVal', 0.01))
+                self.min_size = float(inst.get('minSz', 0.01))
+                self.lot_size = float(inst.get('lotSz', 0.01))
         except Exception as e:
             self.logger.warning(f"获取合约信息失败: {e}")
 
-    def calculate_ema(self, prices: List[float], period: int) -> Optional[float]:
+    @property
+    def price_history(self) -> array:
+        """价格历史（与收盘价历史为同一份数据）"""
+        return self.close_history
+
+    def _load_state(self):
+        """加载上次保存的指标状态"""
+        if not os.path.exists(self.state_file):
+            return
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+
+            if state.get('symbol') != self.symbol:
+                return
+
+            age = time.time() - state.get('time', 0)
+            if age > self.state_max_age:
+                self.logger.info(f"指标状态已过期({age:.0f}秒)，重新预热")
+                return
+
+            self.close_history = array('d', state['price_history'])
+            if state.get('kdj_k_history'):
+                self.kdj_k_history = list(state['kdj_k_history'])
+                self.kdj_d_history = list(state['kdj_d_history'])
+
+            self.logger.info(f"已恢复指标状态: {len(self.price_history)}个价格")
+        except Exception as e:
+            self.logger.warning(f"加载指标状态失败: {e}")
+
+    def _save_state(self):
+        """保存指标状态"""
+        self._last_persist = time.time()
+        try:
+            state = {
+                'symbol': self.symbol,
+                'time': self._last_persist,
+                'price_history': self.price_history.tolist(),
+                'kdj_k_history': getattr(self, 'kdj_k_history', []),
+                'kdj_d_history': getattr(self, 'kdj_d_history', [])
+            }
+
+            directory = os.path.dirname(self.state_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # 先写临时文件再替换，避免中途崩溃留下损坏的文件
+            tmp_file = self.state_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            self.logger.warning(f"保存指标状态失败: {e}")
+
+    def calculate_ema(self, prices: List[float], period: int,
+                      alpha: Optional[float] = None) -> Optional[float]:
         """计算EMA（指数移动平均）"""
         if len(prices) < period:
             return None
 
-        multiplier = 2 / (period + 1)
+        if alpha is None:
+            alpha = 2.0 / (period + 1)
         ema = prices[0]
         for price in prices[1:]:
-            ema = (price - ema) * multiplier + ema
+            ema += alpha * (price - ema)
         return ema
 
     def calculate_macd(self, prices: List[float]) -> Optional[Tuple[float, float, float]]:
@@ -103,29 +188,27 @@ class EnhancedStrategy(BaseStrategy):
         if len(prices) < self.macd_slow:
             return None
 
-        # 快线EMA
-        ema_fast = self.calculate_ema(prices, self.macd_fast)
-        # 慢线EMA
-        ema_slow = self.calculate_ema(prices, self.macd_slow)
+        alpha_fast = self._alpha_fast
+        alpha_slow = self._alpha_slow
 
-        if ema_fast is None or ema_slow is None:
-            return None
+        # 单次遍历同时推进快线/慢线EMA，记录每个位置的MACD值
+        ema_fast = ema_slow = prices[0]
+        macd_list = []
+        for i in range(1, len(prices)):
+            price = prices[i]
+            ema_fast += alpha_fast * (price - ema_fast)
+            ema_slow += alpha_slow * (price - ema_slow)
+            if i >= self.macd_slow - 1:
+                macd_list.append(ema_fast - ema_slow)
 
         # MACD = 快线 - 慢线
         macd = ema_fast - ema_slow
 
         # 信号线 = MACD的9日EMA
-        macd_list = []
-        for i in range(self.macd_slow, len(prices) + 1):
-            ema_f = self.calculate_ema(prices[:i], self.macd_fast)
-            ema_s = self.calculate_ema(prices[:i], self.macd_slow)
-            if ema_f and ema_s:
-                macd_list.append(ema_f - ema_s)
-
         if len(macd_list) < self.macd_signal:
             return None
 
-        signal = self.calculate_ema(macd_list, self.macd_signal)
+        signal = self.calculate_ema(macd_list, self.macd_signal, self._alpha_signal)
         if signal is None:
             return None
 
@@ -171,7 +254,8 @@ class EnhancedStrategy(BaseStrategy):
         if len(self.kdj_k_history) == 0:
             k = rsv
         else:
-            k = (self.kdj_k_history[-1] * (self.kdj_m1 - 1) + rsv) / self.kdj_m1
+            k_prev = self.kdj_k_history[-1]
+            k = k_prev + self._alpha_k * (rsv - k_prev)
 
         self.kdj_k_history.append(k)
         if len(self.kdj_k_history) > 50:
@@ -181,7 +265,8 @@ class EnhancedStrategy(BaseStrategy):
         if len(self.kdj_d_history) == 0:
             d = k
         else:
-            d = (self.kdj_d_history[-1] * (self.kdj_m2 - 1) + k) / self.kdj_m2
+            d_prev = self.kdj_d_history[-1]
+            d = d_prev + self._alpha_d * (k - d_prev)
 
         self.kdj_d_history.append(d)
         if len(self.kdj_d_history) > 50:
@@ -246,9 +331,12 @@ class EnhancedStrategy(BaseStrategy):
         """
         score = 0
         details = []
+        prices = self.price_history
+        n = len(prices)
+        last_price = prices[-1] if n else None
 
         # 1. MACD指标 (25分)
-        macd_result = self.calculate_macd(self.price_history)
+        macd_result = self.calculate_macd(prices)
         if macd_result:
             macd, signal, histogram = macd_result
 
@@ -293,7 +381,7 @@ class EnhancedStrategy(BaseStrategy):
                         details.append(f"KDJ死叉(+15, K={k:.1f})")
 
         # 3. RSI指标 (20分)
-        rsi = self.calculate_rsi(self.price_history)
+        rsi = self.calculate_rsi(prices)
         if rsi:
             if side == 'long':
                 if rsi < 30:
@@ -311,32 +399,31 @@ class EnhancedStrategy(BaseStrategy):
                     details.append(f"RSI偏高(+10, {rsi:.1f})")
 
         # 4. 布林带指标 (20分)
-        bb = self.calculate_bollinger_bands(self.price_history)
-        if bb and self.price_history:
+        bb = self.calculate_bollinger_bands(prices)
+        if bb and n:
             upper, middle, lower = bb
-            current_price = self.price_history[-1]
 
             if side == 'long':
                 # 价格接近下轨
-                if current_price <= lower:
+                if last_price <= lower:
                     score += 20
                     details.append("价格触及下轨(+20)")
-                elif current_price < middle:
+                elif last_price < middle:
                     score += 10
                     details.append("价格低于中轨(+10)")
             else:  # short
                 # 价格接近上轨
-                if current_price >= upper:
+                if last_price >= upper:
                     score += 20
                     details.append("价格触及上轨(+20)")
-                elif current_price > middle:
+                elif last_price > middle:
                     score += 10
                     details.append("价格高于中轨(+10)")
 
         # 5. 趋势确认 (10分)
-        if len(self.price_history) >= 20:
-            ma_short = sum(self.price_history[-5:]) / 5
-            ma_long = sum(self.price_history[-20:]) / 20
+        if n >= 20:
+            ma_short = sum(prices[-5:]) / 5
+            ma_long = sum(prices[-20:]) / 20
 
             if side == 'long' and ma_short > ma_long:
                 score += 10
@@ -396,15 +483,14 @@ class EnhancedStrategy(BaseStrategy):
                 return
 
             # 更新价格历史
-            self.price_history.append(current_price)
             self.close_history.append(current_price)
 
-            # 获取K线数据更新高低价
-            self._update_kline_data()
+            if len(self.close_history) > 200:
+                del self.close_history[0]
 
-            if len(self.price_history) > 200:
-                self.price_history.pop(0)
-                self.close_history.pop(0)
+            # 定期保存指标状态
+            if time.time() - self._last_persist > self.state_persist_interval:
+                self._save_state()
 
             # 每30秒检查一次
             current_time = time.time()
@@ -412,8 +498,19 @@ class EnhancedStrategy(BaseStrategy):
                 return
             self.last_check_time = current_time
 
-            # 更新持仓
-            self._update_position()
+            # 并发获取K线（更新高低价）和持仓
+            klines_future = self._io_pool.submit(self._fetch_klines)
+            positions_future = self._io_pool.submit(self._fetch_positions)
+
+            try:
+                self._apply_klines(klines_future.result())
+            except Exception:
+                pass
+
+            try:
+                self._apply_position(positions_future.result())
+            except Exception as e:
+                self.logger.error(f"更新持仓失败: {e}")
 
             # 检查交易信号
             if self.current_position:
@@ -424,15 +521,17 @@ class EnhancedStrategy(BaseStrategy):
         except Exception as e:
             self.logger.error(f"处理行情异常: {e}")
 
-    def _update_kline_data(self):
-        """更新K线数据（高低价）"""
-        try:
-            candles = self.api_client.get_candles(self.symbol, bar='15m', limit=50)
-            if candles['code'] == '0' and candles['data']:
-                self.high_history = [float(c[2]) for c in reversed(candles['data'])]
-                self.low_history = [float(c[3]) for c in reversed(candles['data'])]
-        except:
-            pass
+    def _fetch_klines(self) -> Dict:
+        """获取K线数据"""
+        return self.api_client.get_candles(self.symbol, bar='15m', limit=50)
+
+    def _apply_klines(self, candles: Dict):
+        """用K线数据更新高低价"""
+        if candles['code'] == '0' and candles['data']:
+            # K线按时间倒序返回，翻转后一次性转换最高价/最低价两列
+            high_low = np.asarray(candles['data'])[::-1, 2:4].astype(np.float64)
+            self.high_history = high_low[:, 0]
+            self.low_history = high_low[:, 1]
 
     def _check_entry_signals(self):
         """检查入场信号"""
@@ -461,7 +560,9 @@ class EnhancedStrategy(BaseStrategy):
         try:
             position_size = self.calculate_dynamic_position_size(signal_strength)
             contracts = position_size / self.contract_value
-            contracts = round(contracts / self.lot_size) * self.lot_size
+            # 向下取整到最小变动单位，加微小偏移抵消浮点误差（如0.3/0.1=2.9999...）
+            steps = math.floor(contracts / self.lot_size + 1e-9)
+            contracts = round(steps * self.lot_size, 8)
 
             if contracts < self.min_size:
                 contracts = self.min_size
@@ -471,12 +572,9 @@ class EnhancedStrategy(BaseStrategy):
             self.logger.info(f"开仓: {side.upper()}, 数量={contracts}张, 信号强度={signal_strength:.1f}")
 
             result = self.api_client.place_order(
-                inst_id=self.symbol,
                 side=order_side,
-                order_type='market',
-                size=str(contracts),
-                pos_side='net',
-                td_mode='cross'
+                size=format_number(contracts),
+                **self._order_template
             )
 
             if result['code'] == '0':
@@ -490,59 +588,78 @@ class EnhancedStrategy(BaseStrategy):
         except Exception as e:
             self.logger.error(f"开仓异常: {e}")
 
+    def _set_exit_triggers(self, entry_price: float, side: str):
+        """按开仓价预先计算止盈/止损/移动止盈的触发价"""
+        self._entry_price_inv = 1.0 / entry_price
+        if side == 'long':
+            self._tp_trigger = entry_price * (1 + self.base_take_profit)
+            self._sl_trigger = entry_price * (1 - self.base_stop_loss)
+            self._trail_trigger = entry_price * (1 + self.trailing_distance)
+        else:
+            self._tp_trigger = entry_price * (1 - self.base_take_profit)
+            self._sl_trigger = entry_price * (1 + self.base_stop_loss)
+            self._trail_trigger = entry_price * (1 - self.trailing_distance)
+
     def _check_exit_conditions(self):
         """检查退出条件"""
         if not self.current_position:
             return
 
         try:
-            entry_price = self.current_position['entry_price']
-            side = self.current_position['side']
-            current_price = self.price_history[-1] if self.price_history else None
+            position = self.current_position
+            entry_price = position['entry_price']
+            prices = self.price_history
+            current_price = prices[-1] if prices else None
 
-            if not current_price:
+            if not current_price or entry_price <= 0:
                 return
 
-            # 计算盈亏率
-            if side == 'long':
-                profit_rate = (current_price - entry_price) / entry_price
-            else:
-                profit_rate = (entry_price - current_price) / entry_price
+            is_long = position['side'] == 'long'
 
-            # 移动止盈
-            if self.trailing_stop and profit_rate > self.trailing_distance:
-                if self.highest_profit_price is None:
-                    self.highest_profit_price = current_price
+            # 移动止盈（盈利超过回撤距离后启动）
+            if self.trailing_stop and (current_price > self._trail_trigger if is_long
+                                       else current_price < self._trail_trigger):
+                highest = self.highest_profit_price
+                if highest is None:
+                    highest = current_price
                     self.logger.info(f"🎯 启动移动止盈")
 
-                if side == 'long' and current_price > self.highest_profit_price:
-                    self.highest_profit_price = current_price
-                elif side == 'short' and current_price < self.highest_profit_price:
-                    self.highest_profit_price = current_price
+                if is_long and current_price > highest:
+                    highest = current_price
+                elif not is_long and current_price < highest:
+                    highest = current_price
+                self.highest_profit_price = highest
 
                 # 检查回撤
-                if side == 'long':
-                    drawdown = (self.highest_profit_price - current_price) / self.highest_profit_price
+                if is_long:
+                    triggered = current_price <= highest * (1 - self.trailing_distance)
                 else:
-                    drawdown = (current_price - self.highest_profit_price) / self.highest_profit_price
+                    triggered = current_price >= highest * (1 + self.trailing_distance)
 
-                if drawdown >= self.trailing_distance:
+                if triggered:
                     self.logger.info(f"📈 移动止盈触发")
-                    self._close_position(profit_rate, "移动止盈")
+                    self._close_position(self._profit_rate(current_price, is_long), "移动止盈")
                     return
 
             # 固定止盈
-            if profit_rate >= self.base_take_profit:
+            if (current_price >= self._tp_trigger) if is_long else (current_price <= self._tp_trigger):
+                profit_rate = self._profit_rate(current_price, is_long)
                 self.logger.info(f"🎯 触发止盈: {profit_rate*100:.2f}%")
                 self._close_position(profit_rate, "固定止盈")
             # 止损
-            elif profit_rate <= -self.base_stop_loss:
+            elif (current_price <= self._sl_trigger) if is_long else (current_price >= self._sl_trigger):
+                profit_rate = self._profit_rate(current_price, is_long)
                 self.logger.info(f"🛑 触发止损: {profit_rate*100:.2f}%")
                 self._close_position(profit_rate, "止损")
 
         except Exception as e:
             self.logger.error(f"检查退出条件异常: {e}")
 
+    def _profit_rate(self, current_price: float, is_long: bool) -> float:
+        """计算当前持仓收益率"""
+        diff = current_price - self.current_position['entry_price']
+        return (diff if is_long else -diff) * self._entry_price_inv
+
     def _close_position(self, profit_rate: float, reason: str):
         """平仓"""
         if not self.current_position:
@@ -556,12 +673,9 @@ class EnhancedStrategy(BaseStrategy):
             self.logger.info(f"平仓: {reason}, 收益率={profit_rate*100:.2f}%")
 
             result = self.api_client.place_order(
-                inst_id=self.symbol,
                 side=order_side,
-                order_type='market',
-                size=str(contracts),
-                pos_side='net',
-                td_mode='cross'
+                size=format_number(contracts),
+                **self._order_template
             )
 
             if result['code'] == '0':
@@ -582,22 +696,32 @@ class EnhancedStrategy(BaseStrategy):
         except Exception as e:
             self.logger.error(f"平仓异常: {e}")
 
+    def _fetch_positions(self) -> Dict:
+        """获取持仓数据"""
+        return self.api_client.get_positions(inst_id=self.symbol)
+
+    def _apply_position(self, positions: Dict):
+        """用持仓数据更新当前持仓"""
+        if positions['code'] == '0' and positions['data']:
+            for pos in positions['data']:
+                pos_size = float(pos.get('pos', 0))
+                if pos_size != 0:
+                    self.current_position = {
+                        'side': 'long' if pos_size > 0 else 'short',
+                        'size': abs(pos_size),
+                        'entry_price': float(pos.get('avgPx', 0)),
+                        'contracts': abs(pos_size)
+                    }
+                    if self.current_position['entry_price'] > 0:
+                        self._set_exit_triggers(self.current_position['entry_price'],
+                                                self.current_position['side'])
+                    return
+        self.current_position = None
+
     def _update_position(self):
         """更新持仓"""
         try:
-            positions = self.api_client.get_positions(inst_id=self.symbol)
-            if positions['code'] == '0' and positions['data']:
-                for pos in positions['data']:
-                    pos_size = float(pos.get('pos', 0))
-                    if pos_size != 0:
-                        self.current_position = {
-                            'side': 'long' if pos_size > 0 else 'short',
-                            'size': abs(pos_size),
-                            'entry_price': float(pos.get('avgPx', 0)),
-                            'contracts': abs(pos_size)
-                        }
-                        return
-            self.current_position = None
+            self._apply_position(self._fetch_positions())
         except Exception as e:
             self.logger.error(f"更新持仓失败: {e}")
 
@@ -613,6 +737,10 @@ class EnhancedStrategy(BaseStrategy):
         """取消所有订单"""
         pass
 
+    def close(self):
+        """关闭K线/持仓查询线程池"""
+        self._io_pool.shutdown(wait=False)
+
     def get_status(self) -> Dict:
         """获取策略状态"""
         return {
@@ -1,9 +1,42 @@
+import os
+import json
 import time
-from typing import Dict, List, Optional
-from .base_strategy import BaseStrategy
-from ..utils.helpers import calculate_grid_levels, calculate_position_size
+import logging
+import queue
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .base_strategy import BaseStrategy, STATE_DIR
+from ..utils.helpers import (calculate_grid_levels, calculate_geometric_grid_levels, calculate_position_size,
+                             decimal_places)
 from ..utils.logger import setup_logger
 
+# OKX批量下单/撤单每次最多20个
+MAX_BATCH_ORDERS = 20
+# 放入订单推送队列后，后台处理线程退出
+_STOP = object()
+
+
+class GridOrder:
+    """单个网格档位上的挂单"""
+
+    __slots__ = ('order_id', 'price', 'side', 'size', 'status')
+
+    def __init__(self, order_id: str, price: float, side: str, size: float, status: str = 'pending'):
+        self.order_id = order_id
+        self.price = price
+        self.side = side
+        self.size = size
+        self.status = status
+
+    def to_dict(self) -> Dict:
+        """转换为字典（用于状态输出）"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return (f"GridOrder(order_id={self.order_id!r}, price={self.price}, side={self.side!r}, "
+                f"size={self.size}, status={self.status!r})")
+
 
 class GridStrategy(BaseStrategy):
     """网格交易策略"""
@@ -20,65 +53,135 @@ class GridStrategy(BaseStrategy):
         self.price_lower = config.get('price_lower', 40000)
         self.investment = config.get('investment', 1000)
         self.min_profit_rate = config.get('min_profit_rate', 0.005)
+        self.spacing_mode = config.get('spacing_mode', 'log')  # log=等比网格, arithmetic=等差网格
 
         # 获取合约信息
         self.contract_value = 1  # 默认合约面值
         self.min_size = 0.01  # 默认最小下单量
         self.lot_size = 0.01  # 默认下单精度
+        self.tick_size = None  # 价格精度
         try:
-            instruments = self.api_client.get_instruments('SWAP')
-            if instruments['code'] == '0':
-                for inst in instruments['data']:
-                    if inst['instId'] == self.symbol:
-                        self.contract_value = float(inst.get('ctVal', 1))
-                        self.min_size = float(inst.get('minSz', 0.01))
-                        self.lot_size = float(inst.get('lotSz', 0.01))
-                        break
+            inst = self.api_client.get_instrument('SWAP', self.symbol)
+            if inst:
+                self.contract_value = float(inst.get('ctVal', 1))
+                self.min_size = float(inst.get('minSz', 0.01))
+                self.lot_size = float(inst.get('lotSz', 0.01))
+                if inst.get('tickSz'):
+                    self.tick_size = float(inst['tickSz'])
         except Exception as e:
             self.logger.warning(f"获取合约信息失败，使用默认值: {e}")
 
-        # 计算网格档位
-        self.grid_levels = calculate_grid_levels(
-            self.price_upper,
-            self.price_lower,
-            self.grid_num
-        )
+        # 按价格/数量精度预生成格式串，避免下单时走通用的float转字符串
+        px_fmt = '{:.%df}' % (decimal_places(self.tick_size) if self.tick_size else 8)
+        sz_fmt = '{:.%df}' % decimal_places(self.lot_size)
+
+        # 计算网格档位（升序）
+        if self.spacing_mode == 'log':
+            # 等比网格: 相邻档位涨幅相同
+            levels = calculate_geometric_grid_levels(self.price_upper, self.price_lower, self.grid_num)
+        else:
+            levels = calculate_grid_levels(self.price_upper, self.price_lower, self.grid_num)
+        self.grid_levels = np.asarray(levels, dtype=np.float64)
+        if self.tick_size:
+            # 对齐到价格精度，等比档位通常不是tickSz的整数倍
+            self.grid_levels = np.round(self.grid_levels / self.tick_size) * self.tick_size
+
+        # 成交后的反向挂单表: 档位 -> (买单成交后卖出档位, 卖出价, 卖单成交后买入档位, 买入价)
+        # 相邻档位间(i, i+1)的利润率不满足最小要求时对应项为None
+        step_profit_ok = (np.diff(self.grid_levels) / self.grid_levels[:-1] >= self.min_profit_rate).tolist()
+        self._level_prices = level_prices = self.grid_levels.tolist()
+        self._fill_transitions: List[Tuple[Optional[int], Optional[float], Optional[int], Optional[float]]] = []
+        for i in range(len(level_prices)):
+            up = i + 1 if i + 1 < len(level_prices) and step_profit_ok[i] else None
+            down = i - 1 if i > 0 and step_profit_ok[i - 1] else None
+            self._fill_transitions.append((
+                up, level_prices[up] if up is not None else None,
+                down, level_prices[down] if down is not None else None
+            ))
+
+        # 每个档位的下单张数
+        if self.spacing_mode == 'log':
+            # 等比网格按档位价格分配等额资金（高价档位张数更少），逐档检查最小下单量
+            self.per_grid_size = None
+            level_sizes = self.investment / self.grid_num / self.grid_levels / self.contract_value
+            level_sizes = np.round(level_sizes / self.lot_size) * self.lot_size
+            below_min = int(np.count_nonzero(level_sizes < self.min_size))
+            if below_min:
+                self.logger.warning(f"{below_min}个档位张数小于最小值，已调整为: {self.min_size}")
+            self._grid_sizes = np.maximum(level_sizes, self.min_size).tolist()
+        else:
+            # 计算每个网格的数量（币数量）
+            mid_price = (self.price_upper + self.price_lower) / 2
+            coin_amount = calculate_position_size(
+                self.investment,
+                mid_price,
+                self.grid_num
+            )
+
+            # 转换为合约张数
+            self.per_grid_size = coin_amount / self.contract_value
 
-        # 计算每个网格的数量（币数量）
-        mid_price = (self.price_upper + self.price_lower) / 2
-        coin_amount = calculate_position_size(
-            self.investment,
-            mid_price,
-            self.grid_num
-        )
+            # 四舍五入到合约精度
+            self.per_grid_size = round(self.per_grid_size / self.lot_size) * self.lot_size
 
-        # 转换为合约张数
-        self.per_grid_size = coin_amount / self.contract_value
+            # 确保满足最小下单量
+            if self.per_grid_size < self.min_size:
+                self.per_grid_size = self.min_size
+                self.logger.warning(f"每格张数小于最小值，已调整为: {self.min_size}")
 
-        # 四舍五入到合约精度
-        self.per_grid_size = round(self.per_grid_size / self.lot_size) * self.lot_size
+            self._grid_sizes = [self.per_grid_size] * self.grid_num
 
-        # 确保满足最小下单量
-        if self.per_grid_size < self.min_size:
-            self.per_grid_size = self.min_size
-            self.logger.warning(f"每格张数小于最小值，已调整为: {self.min_size}")
+        # 档位固定，预先格式化每个档位的价格/张数字符串，下单时直接取用
+        self._px_strs = [px_fmt.format(price) for price in self._level_prices]
+        self._sz_strs = [sz_fmt.format(size) for size in self._grid_sizes]
 
         # 网格状态
-        self.grid_orders = {}  # 存储每个网格的订单
+        self.grid_orders: Dict[int, GridOrder] = {}  # 存储每个网格的订单
+        self._order_id_to_grid = {}  # 订单ID -> 网格档位
         self.filled_grids = set()  # 已成交的网格
         self.current_price = None
 
+        # 成交后的反向挂单先缓冲一个短窗口，合并后走批量下单（同一档位只保留最后一次）
+        # 缓冲和提交都在订单推送处理线程中进行，提交完成并登记订单后才处理下一条推送
+        self.coalesce_window = config.get('coalesce_window', 0.05)  # 合并窗口（秒）
+        self._pending_placements: Dict[int, Tuple[int, float, str]] = {}
+        self._flush_deadline = None  # 缓冲到期时间（time.monotonic），无缓冲时为None
+        # 网格状态（挂单、缓冲）在推送处理线程和主线程撤单之间共享
+        self._state_lock = threading.RLock()
+
+        # 挂单检查点: 每成交N次保存一次，重启后核对交易所挂单并恢复
+        self.checkpoint_file = config.get('checkpoint_file', os.path.join(STATE_DIR, f"grid_{self.symbol}.json"))
+        self.checkpoint_every_fills = config.get('checkpoint_every_fills', 5)
+        self._fills_since_checkpoint = 0
+
+        # 订单推送先入队，由后台线程处理，避免下单请求阻塞WebSocket接收线程
+        self._event_q = queue.Queue()
+        self._consumer = threading.Thread(target=self._drain_events, name='grid-events', daemon=True)
+        self._consumer.start()
+
         self.logger.info(f"初始化网格策略:")
         self.logger.info(f"交易对: {self.symbol}")
         self.logger.info(f"合约面值: {self.contract_value}")
         self.logger.info(f"最小下单量: {self.min_size} 张")
         self.logger.info(f"价格范围: {self.price_lower} - {self.price_upper}")
         self.logger.info(f"网格数量: {self.grid_num}")
-        self.logger.info(f"每格张数: {self.per_grid_size:.4f}")
-        self.logger.info(f"网格档位: {[f'{level:.2f}' for level in self.grid_levels]}")
+        if self.per_grid_size is None:
+            self.logger.info("每格张数: %.4f - %.4f（按档位价格分配）", min(self._grid_sizes), max(self._grid_sizes))
+        else:
+            self.logger.info(f"每格张数: {self.per_grid_size:.4f}")
+        self.logger.info("网格档位: %d档, %.8g - %.8g", len(self.grid_levels),
+                         self.grid_levels[0], self.grid_levels[-1])
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("网格档位明细: %s", self.grid_levels.tolist())
 
     def initialize_grid(self):
         """初始化网格订单"""
+        # 挂单登记完成前不处理订单推送，避免刚挂出的订单成交推送找不到档位
+        with self._state_lock:
+            self._initialize_grid()
+
+    def _initialize_grid(self):
+        """恢复检查点并挂出初始网格订单（调用方持有状态锁）"""
         try:
             # 获取当前价格
             ticker = self.api_client.get_ticker(self.symbol)
@@ -86,14 +189,23 @@ class GridStrategy(BaseStrategy):
                 self.current_price = float(ticker['data'][0]['last'])
                 self.logger.info(f"当前价格: {self.current_price:.2f}")
 
-                # 在当前价格以下挂买单，以上挂卖单
-                for i, price in enumerate(self.grid_levels):
-                    if price < self.current_price:
-                        # 挂买单
-                        self._place_grid_order(i, price, 'buy')
-                    elif price > self.current_price:
-                        # 挂卖单
-                        self._place_grid_order(i, price, 'sell')
+                # 在当前价格以下挂买单，以上挂卖单（等于当前价的档位不挂）
+                levels = self.grid_levels
+                buy_idx = np.flatnonzero(levels < self.current_price).tolist()
+                sell_idx = np.flatnonzero(levels > self.current_price).tolist()
+                prices = self._level_prices
+
+                # 恢复上次运行仍在交易所挂着的订单，这些档位不再重复下单
+                restored = self._restore_checkpoint()
+                if restored:
+                    self.logger.info(f"已恢复 {restored} 个网格挂单")
+
+                orders = self.grid_orders
+                placements = [(i, prices[i], 'buy') for i in buy_idx if i not in orders]
+                placements += [(i, prices[i], 'sell') for i in sell_idx if i not in orders]
+
+                self._place_grid_orders_batch(placements)
+                self._save_checkpoint()
 
                 self.logger.info(f"网格初始化完成，共挂 {len(self.grid_orders)} 个订单")
 
@@ -107,28 +219,151 @@ class GridStrategy(BaseStrategy):
                 inst_id=self.symbol,
                 side=side,
                 order_type='limit',
-                size=str(self.per_grid_size),
-                price=str(price),
+                size=self._sz_strs[grid_index],
+                price=self._px_strs[grid_index],
                 pos_side='net',
                 td_mode='cross'
             )
 
             if result['code'] == '0' and result['data']:
-                order_id = result['data'][0]['ordId']
-                self.grid_orders[grid_index] = {
-                    'order_id': order_id,
-                    'price': price,
-                    'side': side,
-                    'size': self.per_grid_size,
-                    'status': 'pending'
-                }
-                self.logger.info(f"下网格订单: 档位{grid_index}, {side} @ {price:.2f}, 订单ID: {order_id}")
+                self._record_grid_order(grid_index, result['data'][0]['ordId'], price, side)
             else:
                 self.logger.error(f"下单失败: {result.get('msg', 'Unknown error')}")
 
         except Exception as e:
             self.logger.error(f"下网格订单异常: {e}")
 
+    def _place_grid_orders_batch(self, placements: List[Tuple[int, float, str]]):
+        """
+        批量下网格订单
+
+        Args:
+            placements: (档位, 价格, 方向) 列表，按每批20个提交
+        """
+        symbol = self.symbol
+        px_strs = self._px_strs
+        sz_strs = self._sz_strs
+        for start in range(0, len(placements), MAX_BATCH_ORDERS):
+            chunk = placements[start:start + MAX_BATCH_ORDERS]
+            orders = [
+                {
+                    'instId': symbol,
+                    'tdMode': 'cross',
+                    'side': side,
+                    'posSide': 'net',
+                    'ordType': 'limit',
+                    'sz': sz_strs[grid_index],
+                    'px': px_strs[grid_index]
+                }
+                for grid_index, price, side in chunk
+            ]
+
+            try:
+                result = self.api_client.batch_orders(orders)
+            except Exception as e:
+                self.logger.error(f"批量下网格订单异常: {e}")
+                continue
+
+            # 返回结果与提交顺序一一对应
+            for (grid_index, price, side), item in zip(chunk, result.get('data', [])):
+                if item.get('sCode') == '0':
+                    self._record_grid_order(grid_index, item['ordId'], price, side)
+                else:
+                    self.logger.error(f"下单失败: 档位{grid_index}, {item.get('sMsg', 'Unknown error')}")
+
+    def _queue_placement(self, grid_index: int, price: float, side: str):
+        """缓冲反向挂单，窗口到期或凑满一批时批量提交（推送处理线程）"""
+        self._pending_placements[grid_index] = (grid_index, price, side)
+        if len(self._pending_placements) >= MAX_BATCH_ORDERS:
+            # 已凑满一批，立即提交
+            self._flush_placements()
+        elif self._flush_deadline is None:
+            self._flush_deadline = time.monotonic() + self.coalesce_window
+
+    def _flush_placements(self):
+        """提交缓冲中的反向挂单（推送处理线程）"""
+        self._flush_deadline = None
+        placements = list(self._pending_placements.values())
+        self._pending_placements.clear()
+
+        if placements:
+            self._place_grid_orders_batch(placements)
+
+        if self._fills_since_checkpoint >= self.checkpoint_every_fills:
+            self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        """保存网格挂单检查点"""
+        self._fills_since_checkpoint = 0
+        try:
+            checkpoint = {
+                'symbol': self.symbol,
+                'time': time.time(),
+                'levels': self._px_strs,
+                'orders': {str(i): grid_order.to_dict() for i, grid_order in list(self.grid_orders.items())}
+            }
+
+            directory = os.path.dirname(self.checkpoint_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # 先写临时文件再替换，避免中途崩溃留下损坏的文件
+            tmp_file = self.checkpoint_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f)
+            os.replace(tmp_file, self.checkpoint_file)
+        except Exception as e:
+            self.logger.warning(f"保存网格检查点失败: {e}")
+
+    def _restore_checkpoint(self) -> int:
+        """
+        从检查点恢复仍在交易所挂着的网格订单
+
+        Returns:
+            恢复的订单数量
+        """
+        if not os.path.exists(self.checkpoint_file):
+            return 0
+
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+
+            # 交易对或网格档位变化后检查点作废
+            if checkpoint.get('symbol') != self.symbol or checkpoint.get('levels') != self._px_strs:
+                return 0
+
+            saved = checkpoint.get('orders', {})
+            if not saved:
+                return 0
+
+            result = self.api_client.get_pending_orders(inst_id=self.symbol)
+            if result.get('code') != '0':
+                return 0
+            live_ids = {order.get('ordId') for order in result.get('data', [])}
+
+            for index, order in saved.items():
+                if order['order_id'] not in live_ids:
+                    continue
+                grid_index = int(index)
+                self._order_id_to_grid[order['order_id']] = grid_index
+                self.grid_orders[grid_index] = GridOrder(order['order_id'], order['price'], order['side'],
+                                                         order['size'], order.get('status', 'pending'))
+            return len(self.grid_orders)
+        except Exception as e:
+            self.logger.warning(f"加载网格检查点失败: {e}")
+            return 0
+
+    def _record_grid_order(self, grid_index: int, order_id: str, price: float, side: str):
+        """记录已挂出的网格订单"""
+        previous = self.grid_orders.get(grid_index)
+        if previous:
+            self._order_id_to_grid.pop(previous.order_id, None)
+
+        self._order_id_to_grid[order_id] = grid_index
+        self.grid_orders[grid_index] = GridOrder(order_id, price, side, self._grid_sizes[grid_index])
+        self.logger.info(f"下网格订单: 档位{grid_index}, {side} @ {price:.2f}, 订单ID: {order_id}")
+
     def on_tick(self, ticker_data: Dict):
         """处理行情更新"""
         try:
@@ -144,6 +379,30 @@ class GridStrategy(BaseStrategy):
             self.logger.error(f"处理行情数据失败: {e}")
 
     def on_order_update(self, order_data: Dict):
+        """处理订单更新（仅入队，由后台线程处理）"""
+        if order_data:
+            self._event_q.put_nowait(order_data)
+
+    def _drain_events(self):
+        """后台线程: 依次处理订单推送，缓冲窗口到期时提交反向挂单"""
+        while True:
+            deadline = self._flush_deadline
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                order_data = self._event_q.get(timeout=timeout)
+            except queue.Empty:
+                order_data = None
+            if order_data is _STOP:
+                return
+
+            with self._state_lock:
+                if order_data is not None:
+                    self._process_order_update(order_data)
+                deadline = self._flush_deadline
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._flush_placements()
+
+    def _process_order_update(self, order_data: List[Dict]):
         """处理订单更新"""
         try:
             if not order_data:
@@ -154,12 +413,7 @@ class GridStrategy(BaseStrategy):
                 state = order.get('state')
 
                 # 查找该订单对应的网格
-                grid_index = None
-                for idx, grid_order in self.grid_orders.items():
-                    if grid_order['order_id'] == order_id:
-                        grid_index = idx
-                        break
-
+                grid_index = self._order_id_to_grid.get(order_id)
                 if grid_index is None:
                     continue
 
@@ -170,8 +424,8 @@ class GridStrategy(BaseStrategy):
                 # 订单取消
                 elif state == 'canceled':
                     self.logger.warning(f"网格订单被取消: 档位{grid_index}")
-                    if grid_index in self.grid_orders:
-                        del self.grid_orders[grid_index]
+                    del self._order_id_to_grid[order_id]
+                    self.grid_orders.pop(grid_index, None)
 
         except Exception as e:
             self.logger.error(f"处理订单更新失败: {e}")
@@ -183,35 +437,27 @@ class GridStrategy(BaseStrategy):
             if not grid_order:
                 return
 
-            filled_side = grid_order['side']
-            filled_price = grid_order['price']
+            filled_side = grid_order.side
+            filled_price = grid_order.price
 
             self.logger.info(f"网格订单成交: 档位{grid_index}, {filled_side} @ {filled_price:.2f}")
 
             # 标记该网格已成交
             self.filled_grids.add(grid_index)
+            self._fills_since_checkpoint += 1
 
             # 删除已成交的订单
             del self.grid_orders[grid_index]
+            self._order_id_to_grid.pop(grid_order.order_id, None)
 
-            # 在相邻档位下反向订单
+            # 在相邻档位下反向订单: 买单成交后在上一档挂卖单，卖单成交后在下一档挂买单
+            sell_index, sell_price, buy_index, buy_price = self._fill_transitions[grid_index]
             if filled_side == 'buy':
-                # 买单成交后，在上一档挂卖单
-                if grid_index + 1 < len(self.grid_levels):
-                    next_price = self.grid_levels[grid_index + 1]
-                    # 确保利润率满足最小要求
-                    profit_rate = (next_price - filled_price) / filled_price
-                    if profit_rate >= self.min_profit_rate:
-                        self._place_grid_order(grid_index + 1, next_price, 'sell')
-
+                if sell_index is not None:
+                    self._queue_placement(sell_index, sell_price, 'sell')
             elif filled_side == 'sell':
-                # 卖单成交后，在下一档挂买单
-                if grid_index - 1 >= 0:
-                    next_price = self.grid_levels[grid_index - 1]
-                    # 确保利润率满足最小要求
-                    profit_rate = (filled_price - next_price) / next_price
-                    if profit_rate >= self.min_profit_rate:
-                        self._place_grid_order(grid_index - 1, next_price, 'buy')
+                if buy_index is not None:
+                    self._queue_placement(buy_index, buy_price, 'buy')
 
         except Exception as e:
             self.logger.error(f"处理成交订单失败: {e}")
@@ -222,22 +468,44 @@ class GridStrategy(BaseStrategy):
         return []
 
     def cancel_all_orders(self):
-        """取消所有网格订单"""
+        """取消所有网格订单（批量撤单，每批最多20个）"""
         self.logger.info("取消所有网格订单...")
-        for grid_index, grid_order in list(self.grid_orders.items()):
+
+        with self._state_lock:
+            self._cancel_all_orders()
+
+    def _cancel_all_orders(self):
+        """批量撤掉当前登记的网格订单（调用方持有状态锁）"""
+        # 丢弃尚未提交的反向挂单
+        self._flush_deadline = None
+        self._pending_placements.clear()
+
+        pending = list(self.grid_orders.items())
+        for start in range(0, len(pending), MAX_BATCH_ORDERS):
+            chunk = pending[start:start + MAX_BATCH_ORDERS]
+            orders = [{'instId': self.symbol, 'ordId': grid_order.order_id} for _, grid_order in chunk]
+
             try:
-                result = self.api_client.cancel_order(
-                    inst_id=self.symbol,
-                    ord_id=grid_order['order_id']
-                )
-                if result['code'] == '0':
-                    self.logger.info(f"取消订单成功: 档位{grid_index}, 订单ID: {grid_order['order_id']}")
-                else:
-                    self.logger.error(f"取消订单失败: {result.get('msg', 'Unknown error')}")
+                result = self.api_client.batch_cancel_orders(orders)
             except Exception as e:
                 self.logger.error(f"取消订单异常: {e}")
+                continue
+
+            for (grid_index, grid_order), item in zip(chunk, result.get('data', [])):
+                if item.get('sCode') == '0':
+                    self.logger.info(f"取消订单成功: 档位{grid_index}, 订单ID: {grid_order.order_id}")
+                else:
+                    self.logger.error(f"取消订单失败: 档位{grid_index}, {item.get('sMsg', 'Unknown error')}")
 
         self.grid_orders.clear()
+        self._order_id_to_grid.clear()
+        self._save_checkpoint()
+
+    def close(self):
+        """停止订单推送处理线程"""
+        self._event_q.put_nowait(_STOP)
+        if threading.current_thread() is not self._consumer:
+            self._consumer.join(timeout=5)
 
     def get_grid_status(self) -> Dict:
         """获取网格状态"""
@@ -248,17 +516,20 @@ class GridStrategy(BaseStrategy):
             'price_range': [self.price_lower, self.price_upper],
             'pending_orders': len(self.grid_orders),
             'filled_grids': len(self.filled_grids),
-            'grid_orders': self.grid_orders
+            'grid_orders': {i: grid_order.to_dict() for i, grid_order in self.grid_orders.items()}
         }
 
     def print_grid_status(self):
         """打印网格状态"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
         status = self.get_grid_status()
         self.logger.info("=" * 50)
-        self.logger.info(f"交易对: {status['symbol']}")
-        self.logger.info(f"当前价格: {status['current_price']:.2f}")
-        self.logger.info(f"价格范围: {status['price_range'][0]} - {status['price_range'][1]}")
-        self.logger.info(f"网格数量: {status['grid_num']}")
-        self.logger.info(f"挂单数量: {status['pending_orders']}")
-        self.logger.info(f"已成交网格: {status['filled_grids']}")
+        self.logger.info("交易对: %s", status['symbol'])
+        self.logger.info("当前价格: %s", status['current_price'])
+        self.logger.info("价格范围: %s - %s", status['price_range'][0], status['price_range'][1])
+        self.logger.info("网格数量: %s", status['grid_num'])
+        self.logger.info("挂单数量: %s", status['pending_orders'])
+        self.logger.info("已成交网格: %s", status['filled_grids'])
         self.logger.info("=" * 50)
@@ -3,10 +3,47 @@
 
 基于市场趋势进行做多或做空操作
 """
+import os
 import time
-from typing import Dict, List, Optional
-from .base_strategy import BaseStrategy
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .base_strategy import BaseStrategy, STATE_DIR
+from ..utils.helpers import decimal_places
 from ..utils.logger import setup_logger
+from ..utils._njit import njit
+
+
+@njit(cache=True, fastmath=True)
+def _window_sums(ring, head, count, short, long):
+    """
+    从环形缓冲区最新价格向前一次遍历，同时求短期/长期窗口的价格之和
+
+    Args:
+        ring: 价格环形缓冲区
+        head: 下一个写入位置（其前一个位置为最新价格）
+        count: 缓冲区中已有的价格数量（不足一个窗口时只对已有价格求和）
+        short: 短期MA周期
+        long: 长期MA周期
+
+    Returns:
+        (短期窗口和, 长期窗口和)
+    """
+    size = ring.shape[0]
+    short_n = short if short < count else count
+    long_n = long if long < count else count
+    span = short_n if short_n > long_n else long_n
+    short_sum = 0.0
+    long_sum = 0.0
+    for k in range(span):
+        price = ring[(head - 1 - k) % size]
+        if k < short_n:
+            short_sum += price
+        if k < long_n:
+            long_sum += price
+    return short_sum, long_sum
 
 
 class PositionStrategy(BaseStrategy):
@@ -30,27 +67,60 @@ class PositionStrategy(BaseStrategy):
         self.lot_size = 1  # 下单精度（张）
 
         try:
-            instruments = self.api_client.get_instruments('SWAP')
-            if instruments['code'] == '0':
-                for inst in instruments['data']:
-                    if inst['instId'] == self.symbol:
-                        self.contract_value = float(inst.get('ctVal', 0.01))
-                        self.min_size = float(inst.get('minSz', 1))
-                        self.lot_size = float(inst.get('lotSz', 1))
-                        self.logger.info(f"合约面值: {self.contract_value}, 最小下单量: {self.min_size}")
-                        break
+            inst = self.api_client.get_instrument('SWAP', self.symbol)
+            if inst:
+                self.contract_value = float(inst.get('ctVal', 0.01))
+                self.min_size = float(inst.get('minSz', 1))
+                self.lot_size = float(inst.get('lotSz', 1))
+                self.logger.info(f"合约面值: {self.contract_value}, 最小下单量: {self.min_size}")
         except Exception as e:
             self.logger.warning(f"获取合约信息失败，使用默认值: {e}")
 
+        # 按下单精度预生成数量格式串
+        self._sz_fmt = '{:.%df}' % decimal_places(self.lot_size)
+
         # 当前状态
         self.current_price = None
         self.current_position = None  # {'side': 'long'/'short', 'size': float, 'entry_price': float}
-        self.last_check_time = 0
+
+        # 盘口驱动: 只在买一/卖一价变化时做决策
+        self._last_bbo = (None, None)
+        self.position_refresh_interval = config.get('position_refresh_interval', 30)  # 持仓同步间隔（秒）
+        self._last_position_refresh = 0
+        self._position_push_active = False  # 已接入持仓频道推送
+        self.entry_cooldown = config.get('entry_cooldown', 30)  # 开仓失败后的冷却时间（秒）
+        self.close_cooldown = config.get('close_cooldown', 30)  # 每次平仓后（无论成败）的冷却时间（秒）
+        self._cooldown_until = 0  # 冷却期内不检查入场和止盈止损
+        self._order_in_flight = False  # 开仓/平仓下单进行中
+
+        # 开仓成交确认: 订单频道推送成交后唤醒等待中的开仓
+        self.fill_push_enabled = False  # 主程序订阅订单频道成功后开启
+        self.fill_timeout = config.get('fill_timeout', 5)  # 等待成交的超时时间（秒）
+        self._fill_lock = threading.Lock()
+        self._pending_open_futures: Dict[str, Future] = {}
+        self._recent_fills: Dict[str, Dict] = {}  # 先于等待者到达的成交推送
 
         # 简单移动平均线参数
         self.ma_short_period = config.get('ma_short_period', 5)
         self.ma_long_period = config.get('ma_long_period', 20)
-        self.price_history = []  # 存储历史价格用于计算MA
+        # 预分配的环形缓冲区存储历史价格，_head 指向下一个写入位置
+        self._ring_size = max(self.ma_short_period, self.ma_long_period)
+        self._prices = np.zeros(self._ring_size, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        self._ma_short_sum = 0.0  # 短期窗口价格累加和
+        self._ma_long_sum = 0.0   # 长期窗口价格累加和
+        # 累加和按增量维护，每写入N个价格完整重算一次以消除浮点误差累积
+        self.ma_resync_every = config.get('ma_resync_every', 500)
+        self._pushes_since_resync = 0
+
+        # 价格缓冲区映射到文件，重启后直接恢复，无需重新积累价格
+        self.history_file = config.get('history_file', os.path.join(STATE_DIR, f"position_{self.symbol}_ma.bin"))
+        self.state_max_age = config.get('state_max_age', 600)  # 超过该时长的历史价格视为过期（秒）
+        self.history_flush_every = config.get('history_flush_every', 10)  # 每写入N个价格落盘一次
+        self._hist_mm = None
+        self._pushes_since_flush = 0
+        self._open_history()
 
         self.logger.info(f"初始化做多做空策略:")
         self.logger.info(f"交易对: {self.symbol}")
@@ -60,7 +130,7 @@ class PositionStrategy(BaseStrategy):
         self.logger.info(f"杠杆: {self.leverage}x")
 
     def on_tick(self, ticker_data: Dict):
-        """处理行情更新"""
+        """处理行情更新（只维护价格和均线，交易决策由盘口驱动）"""
         try:
             if not ticker_data:
                 return
@@ -72,19 +142,42 @@ class PositionStrategy(BaseStrategy):
 
             self.current_price = last_price
 
-            # 添加到价格历史
-            self.price_history.append(last_price)
-            if len(self.price_history) > self.ma_long_period:
-                self.price_history.pop(0)
+            # 添加到价格历史（超出长度自动丢弃最旧的价格），同步更新窗口累加和
+            self._push_price(last_price)
+
+        except Exception as e:
+            self.logger.error(f"处理行情数据失败: {e}")
+
+    def on_bbo(self, bbo_data: Dict):
+        """处理最优买卖价推送，仅在买一/卖一价变化时检查交易信号"""
+        try:
+            if not bbo_data:
+                return
+
+            book = bbo_data[0]
+            if not book.get('bids') or not book.get('asks'):
+                return
+
+            bid = float(book['bids'][0][0])
+            ask = float(book['asks'][0][0])
+            if (bid, ask) == self._last_bbo:
+                return
+            self._last_bbo = (bid, ask)
+
+            if self.current_price is None:
+                return
+            self.current_price = (bid + ask) / 2
 
-            # 每30秒检查一次
+            # 下单进行中或冷却期内不做决策，避免重复开平仓
             current_time = time.time()
-            if current_time - self.last_check_time < 30:
+            if self._order_in_flight or current_time < self._cooldown_until:
                 return
-            self.last_check_time = current_time
 
-            # 检查当前持仓
-            self._update_position()
+            # 未接入持仓推送时，定期与交易所同步持仓
+            if (not self._position_push_active
+                    and current_time - self._last_position_refresh >= self.position_refresh_interval):
+                self._last_position_refresh = current_time
+                self._update_position()
 
             # 如果有持仓，检查止盈止损
             if self.current_position:
@@ -94,59 +187,168 @@ class PositionStrategy(BaseStrategy):
                 self._check_entry_signals()
 
         except Exception as e:
-            self.logger.error(f"处理行情数据失败: {e}")
+            self.logger.error(f"处理盘口数据失败: {e}")
 
     def _update_position(self):
-        """更新当前持仓信息"""
+        """通过REST接口同步当前持仓信息"""
         try:
             positions = self.api_client.get_positions(inst_id=self.symbol)
             if positions['code'] == '0' and positions['data']:
                 for pos in positions['data']:
-                    pos_size = float(pos.get('pos', 0))
-                    if pos_size != 0:
-                        avg_price = float(pos.get('avgPx', 0))
-                        # pos为正数表示做多，负数表示做空
-                        side = 'long' if pos_size > 0 else 'short'
-                        self.current_position = {
-                            'side': side,
-                            'size': abs(pos_size),
-                            'entry_price': avg_price,
-                            'contracts': abs(pos_size)
-                        }
+                    if float(pos.get('pos', 0)) != 0:
+                        self._apply_position(pos)
                         return
-                # 没有持仓
-                self.current_position = None
-            else:
-                self.current_position = None
+            # 没有持仓
+            self.current_position = None
         except Exception as e:
             self.logger.error(f"更新持仓失败: {e}")
 
+    def _apply_position(self, pos: Dict):
+        """根据单条持仓数据更新当前持仓"""
+        pos_size = float(pos.get('pos') or 0)
+        if pos_size == 0:
+            self.current_position = None
+            return
+
+        avg_price = float(pos.get('avgPx') or 0)
+        # pos为正数表示做多，负数表示做空
+        side = 'long' if pos_size > 0 else 'short'
+        self.current_position = {
+            'side': side,
+            'size': abs(pos_size),
+            'entry_price': avg_price,
+            'contracts': abs(pos_size)
+        }
+
+    def on_position_update(self, position_data: List[Dict]):
+        """处理持仓频道推送（收到推送后不再轮询REST持仓接口）"""
+        try:
+            for pos in position_data:
+                if pos.get('instId') == self.symbol:
+                    self._apply_position(pos)
+            self._position_push_active = True
+        except Exception as e:
+            self.logger.error(f"处理持仓推送失败: {e}")
+
+    @property
+    def price_history(self) -> np.ndarray:
+        """按时间顺序（旧→新）返回历史价格"""
+        if self._count < self._ring_size:
+            return self._prices[:self._count]
+        return np.concatenate((self._prices[self._head:], self._prices[:self._head]))
+
+    def _open_history(self):
+        """打开价格缓冲区的内存映射文件: 布局为 [head, count, 环形缓冲区...]"""
+        shape = (self._ring_size + 2,)
+        try:
+            directory = os.path.dirname(self.history_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # 文件大小与当前MA周期一致且未过期才恢复，否则重建
+            resume = (os.path.exists(self.history_file)
+                      and os.path.getsize(self.history_file) == shape[0] * 8
+                      and time.time() - os.path.getmtime(self.history_file) <= self.state_max_age)
+            mm = np.memmap(self.history_file, dtype=np.float64, mode='r+' if resume else 'w+', shape=shape)
+        except Exception as e:
+            self.logger.warning(f"打开价格历史文件失败，仅使用内存缓冲区: {e}")
+            return
+
+        self._hist_mm = mm
+        self._prices = mm[2:]
+        if not resume:
+            return
+
+        head, count = int(mm[0]), int(mm[1])
+        if 0 <= head < self._ring_size and 0 <= count <= self._ring_size:
+            self._head, self._count = head, count
+            self._resync_ma()
+            self.logger.info(f"已恢复价格历史: {count}个价格")
+        else:
+            mm[:] = 0.0
+
+    def _push_price(self, price: float):
+        """写入环形缓冲区并增量维护短期/长期MA的窗口累加和"""
+        ring = self._prices
+        size = self._ring_size
+        head = self._head
+
+        # 短期窗口移出的是 ma_short_period 笔之前的价格
+        if self._count >= self.ma_short_period:
+            self._ma_short_sum -= ring[(head - self.ma_short_period) % size]
+        if self._count >= self.ma_long_period:
+            self._ma_long_sum -= ring[(head - self.ma_long_period) % size]
+        if self._count < size:
+            self._count += 1
+
+        ring[head] = price
+        self._head = (head + 1) % size
+        self._ma_short_sum += price
+        self._ma_long_sum += price
+
+        self._pushes_since_resync += 1
+        if self._pushes_since_resync >= self.ma_resync_every:
+            self._resync_ma()
+
+        mm = self._hist_mm
+        if mm is not None:
+            mm[0] = self._head
+            mm[1] = self._count
+            self._pushes_since_flush += 1
+            if self._pushes_since_flush >= self.history_flush_every:
+                self._pushes_since_flush = 0
+                mm.flush()
+
+    def _resync_ma(self) -> Tuple[Optional[float], Optional[float]]:
+        """
+        完整重算短期/长期窗口累加和，校正增量累加的浮点误差
+
+        Returns:
+            (短期MA, 长期MA)，数据不足时对应项为None
+        """
+        self._pushes_since_resync = 0
+        count = self._count
+        if count == 0:
+            return None, None
+
+        short_sum, long_sum = _window_sums(self._prices, self._head, count,
+                                           self.ma_short_period, self.ma_long_period)
+        self._ma_short_sum = float(short_sum)
+        self._ma_long_sum = float(long_sum)
+
+        ma_short = self._ma_short_sum / self.ma_short_period if count >= self.ma_short_period else None
+        ma_long = self._ma_long_sum / self.ma_long_period if count >= self.ma_long_period else None
+        return ma_short, ma_long
+
     def _calculate_ma(self, period: int) -> Optional[float]:
         """计算移动平均线"""
-        if len(self.price_history) < period:
+        if self._count < period:
             return None
-        return sum(self.price_history[-period:]) / period
+        if period == self.ma_short_period:
+            return self._ma_short_sum / period
+        if period == self.ma_long_period:
+            return self._ma_long_sum / period
+        return float(self.price_history[-period:].mean())
 
     def _check_entry_signals(self):
         """检查入场信号"""
         try:
             # 需要足够的历史数据
-            if len(self.price_history) < self.ma_long_period:
+            if self._count < self.ma_long_period or self._count < self.ma_short_period:
                 return
 
+            # 均线直接取增量维护的窗口累加和，O(1)
             ma_short = self._calculate_ma(self.ma_short_period)
             ma_long = self._calculate_ma(self.ma_long_period)
-
-            if ma_short is None or ma_long is None:
-                return
+            price = self.current_price
 
             # 短期MA向上突破长期MA，做多信号
-            if ma_short > ma_long and self.current_price > ma_short:
+            if ma_short > ma_long and price > ma_short:
                 self.logger.info(f"检测到做多信号: 价格={self.current_price:.2f}, MA{self.ma_short_period}={ma_short:.2f}, MA{self.ma_long_period}={ma_long:.2f}")
                 self._open_position('long')
 
             # 短期MA向下突破长期MA，做空信号
-            elif ma_short < ma_long and self.current_price < ma_short:
+            elif ma_short < ma_long and price < ma_short:
                 self.logger.info(f"检测到做空信号: 价格={self.current_price:.2f}, MA{self.ma_short_period}={ma_short:.2f}, MA{self.ma_long_period}={ma_long:.2f}")
                 self._open_position('short')
 
@@ -187,8 +389,17 @@ class PositionStrategy(BaseStrategy):
         except Exception as e:
             self.logger.error(f"检查止盈止损失败: {e}")
 
+    def _start_cooldown(self, seconds: float):
+        """进入冷却期，冷却结束时先与交易所同步一次持仓再做决策"""
+        self._cooldown_until = time.time() + seconds
+        self._last_position_refresh = self._cooldown_until - self.position_refresh_interval
+
     def _open_position(self, side: str):
         """开仓"""
+        if self._order_in_flight:
+            return
+        self._order_in_flight = True
+        handed_off = False
         try:
             # 计算合约张数
             contracts = self.position_size / self.contract_value
@@ -209,7 +420,7 @@ class PositionStrategy(BaseStrategy):
                 inst_id=self.symbol,
                 side=order_side,
                 order_type='market',  # 市价单
-                size=str(contracts),
+                size=self._sz_fmt.format(contracts),
                 pos_side='net',
                 td_mode='cross'
             )
@@ -217,20 +428,83 @@ class PositionStrategy(BaseStrategy):
             if result['code'] == '0' and result['data']:
                 order_id = result['data'][0]['ordId']
                 self.logger.info(f"开仓成功: {side}, 订单ID: {order_id}")
-                # 更新持仓
-                time.sleep(1)  # 等待订单成交
-                self._update_position()
+                # 在后台线程等待成交，不阻塞行情推送线程；成交确认前保持下单中状态
+                threading.Thread(target=self._resolve_fill, args=(order_id, side),
+                                 name='position-fill', daemon=True).start()
+                handed_off = True
             else:
                 self.logger.error(f"开仓失败: {result.get('msg', 'Unknown error')}")
+                self._start_cooldown(self.entry_cooldown)
 
         except Exception as e:
             self.logger.error(f"开仓异常: {e}")
+            self._start_cooldown(self.entry_cooldown)
+        finally:
+            if not handed_off:
+                self._order_in_flight = False
+
+    def _resolve_fill(self, order_id: str, side: str):
+        """等待开仓订单成交后用成交数据更新持仓，超时再查询持仓接口（后台线程）"""
+        try:
+            fill = self._wait_for_fill(order_id)
+            if fill:
+                filled_contracts = float(fill['accFillSz'])
+                self.current_position = {
+                    'side': side,
+                    'size': filled_contracts,
+                    'entry_price': float(fill.get('avgPx') or 0),
+                    'contracts': filled_contracts
+                }
+            else:
+                self._update_position()
+        except Exception as e:
+            self.logger.error(f"确认开仓成交失败: {e}")
+        finally:
+            self._order_in_flight = False
+
+    def _wait_for_fill(self, order_id: str) -> Optional[Dict]:
+        """
+        等待订单完全成交
+
+        Returns:
+            成交后的订单数据，超时返回None
+        """
+        if not self.fill_push_enabled:
+            # 没有订单推送时轮询订单状态
+            deadline = time.time() + self.fill_timeout
+            while time.time() < deadline:
+                try:
+                    result = self.api_client.get_order(inst_id=self.symbol, ord_id=order_id)
+                    if result['code'] == '0' and result['data'] and result['data'][0].get('state') == 'filled':
+                        return result['data'][0]
+                except Exception as e:
+                    self.logger.warning(f"查询订单状态失败: {e}")
+                time.sleep(0.2)
+            return None
+
+        future = Future()
+        with self._fill_lock:
+            fill = self._recent_fills.pop(order_id, None)
+            if fill is None:
+                self._pending_open_futures[order_id] = future
+        if fill is not None:
+            return fill
+
+        try:
+            return future.result(timeout=self.fill_timeout)
+        except FutureTimeoutError:
+            self.logger.warning(f"等待订单成交超时: {order_id}")
+            return None
+        finally:
+            with self._fill_lock:
+                self._pending_open_futures.pop(order_id, None)
 
     def _close_position(self):
         """平仓"""
-        if not self.current_position:
+        if not self.current_position or self._order_in_flight:
             return
 
+        self._order_in_flight = True
         try:
             side = self.current_position['side']
             contracts = int(self.current_position['contracts'])
@@ -244,7 +518,7 @@ class PositionStrategy(BaseStrategy):
                 inst_id=self.symbol,
                 side=order_side,
                 order_type='market',
-                size=str(contracts),
+                size=self._sz_fmt.format(contracts),
                 pos_side='net',
                 td_mode='cross'
             )
@@ -259,6 +533,10 @@ class PositionStrategy(BaseStrategy):
 
         except Exception as e:
             self.logger.error(f"平仓异常: {e}")
+        finally:
+            # 平仓失败时不在每次盘口变化时重发；成功时等持仓同步后再考虑重新开仓
+            self._start_cooldown(self.close_cooldown)
+            self._order_in_flight = False
 
     def on_order_update(self, order_data: Dict):
         """处理订单更新"""
@@ -271,6 +549,17 @@ class PositionStrategy(BaseStrategy):
                 state = order.get('state')
                 self.logger.info(f"订单更新: ID={order_id}, 状态={state}")
 
+                if state == 'filled':
+                    with self._fill_lock:
+                        future = self._pending_open_futures.pop(order_id, None)
+                        if future is None:
+                            # 成交推送可能先于开仓线程登记等待，暂存最近的成交
+                            self._recent_fills[order_id] = order
+                            if len(self._recent_fills) > 50:
+                                self._recent_fills.pop(next(iter(self._recent_fills)))
+                    if future is not None:
+                        future.set_result(order)
+
         except Exception as e:
             self.logger.error(f"处理订单更新失败: {e}")
 
@@ -292,37 +581,44 @@ class PositionStrategy(BaseStrategy):
 
     def get_status(self) -> Dict:
         """获取策略状态"""
+        ma_short, ma_long = self._resync_ma()
         return {
             'symbol': self.symbol,
             'current_price': self.current_price,
             'position': self.current_position,
-            'ma_short': self._calculate_ma(self.ma_short_period),
-            'ma_long': self._calculate_ma(self.ma_long_period)
+            'ma_short': ma_short,
+            'ma_long': ma_long
         }
 
     def print_status(self):
         """打印策略状态"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
         status = self.get_status()
         self.logger.info("=" * 60)
-        self.logger.info(f"交易对: {status['symbol']}")
-        self.logger.info(f"当前价格: {status['current_price']:.2f}" if status['current_price'] else "当前价格: N/A")
+        self.logger.info("交易对: %s", status['symbol'])
+        if status['current_price']:
+            self.logger.info("当前价格: %.2f", status['current_price'])
+        else:
+            self.logger.info("当前价格: N/A")
 
         if status['ma_short']:
-            self.logger.info(f"MA{self.ma_short_period}: {status['ma_short']:.2f}")
+            self.logger.info("MA%d: %.2f", self.ma_short_period, status['ma_short'])
         if status['ma_long']:
-            self.logger.info(f"MA{self.ma_long_period}: {status['ma_long']:.2f}")
+            self.logger.info("MA%d: %.2f", self.ma_long_period, status['ma_long'])
 
         if status['position']:
             pos = status['position']
-            self.logger.info(f"当前持仓: {pos['side'].upper()}")
-            self.logger.info(f"持仓数量: {pos['contracts']} 张 ({pos['size'] * self.contract_value:.4f} ETH)")
-            self.logger.info(f"入场价格: {pos['entry_price']:.2f}")
+            self.logger.info("当前持仓: %s", pos['side'].upper())
+            self.logger.info("持仓数量: %s 张 (%.4f ETH)", pos['contracts'], pos['size'] * self.contract_value)
+            self.logger.info("入场价格: %.2f", pos['entry_price'])
             if self.current_price:
                 if pos['side'] == 'long':
                     pnl_rate = (self.current_price - pos['entry_price']) / pos['entry_price']
                 else:
                     pnl_rate = (pos['entry_price'] - self.current_price) / pos['entry_price']
-                self.logger.info(f"浮动盈亏: {pnl_rate*100:.2f}%")
+                self.logger.info("浮动盈亏: %.2f%%", pnl_rate * 100)
         else:
             self.logger.info("当前持仓: 无")
 
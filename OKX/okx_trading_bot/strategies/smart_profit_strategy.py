@@ -11,16 +11,50 @@
 """
 
 import time
+import logging
 from typing import Dict, List, Optional
 from datetime import datetime, time as dt_time
+import numpy as np
 from .base_strategy import BaseStrategy
 from ..utils.logger import setup_logger
-import statistics
+from ..utils._njit import njit
+
+# 价格历史保留的最大长度
+PRICE_HISTORY_SIZE = 100
+# 波动率统计窗口（价格个数）
+VOLATILITY_WINDOW = 20
+
+
+@njit(cache=True, fastmath=True)
+def _return_volatility(prices):
+    """
+    计算一段价格的收益率样本标准差（两遍求和，收益率几乎恒定时也不会出现负方差）
+
+    Args:
+        prices: 按时间顺序的价格，长度至少为3
+
+    Returns:
+        收益率波动率
+    """
+    m = prices.shape[0] - 1
+    total = 0.0
+    for i in range(m):
+        total += (prices[i + 1] - prices[i]) / prices[i]
+    mean = total / m
+
+    sq = 0.0
+    for i in range(m):
+        d = (prices[i + 1] - prices[i]) / prices[i] - mean
+        sq += d * d
+    return (sq / (m - 1)) ** 0.5
 
 
 class SmartProfitStrategy(BaseStrategy):
     """智能利润最大化策略"""
 
+    # UTC高波动时段: 12:00-16:00 (亚洲), 20:00-02:00 (欧美)
+    _TRADING_HOURS = frozenset({12, 13, 14, 15, 20, 21, 22, 23, 0, 1})
+
     def __init__(self, config: Dict, api_client):
         super().__init__(config)
         self.api_client = api_client
@@ -49,21 +83,22 @@ class SmartProfitStrategy(BaseStrategy):
         self.lot_size = 0.01
 
         try:
-            instruments = self.api_client.get_instruments('SWAP')
-            if instruments['code'] == '0':
-                for inst in instruments['data']:
-                    if inst['instId'] == self.symbol:
-                        self.contract_value = float(inst.get('ctVal', 0.1))
-                        self.min_size = float(inst.get('minSz', 0.01))
-                        self.lot_size = float(inst.get('lotSz', 0.01))
-                        break
+            inst = self.api_client.get_instrument('SWAP', self.symbol)
+            if inst:
+                self.contract_value = float(inst.get('ctVal', 0.1))
+                self.min_size = float(inst.get('minSz', 0.01))
+                self.lot_size = float(inst.get('lotSz', 0.01))
         except Exception as e:
             self.logger.warning(f"获取合约信息失败: {e}")
 
         # 状态变量
         self.current_price = None
         self.current_position = None
-        self.price_history = []
+        # 价格环形缓冲区: 每个价格同时写入 head 和 head+size 两处，
+        # 任意最近n个价格都是一段连续切片，无需拼接
+        self._prices = np.empty(2 * PRICE_HISTORY_SIZE, dtype=np.float64)
+        self._head = 0
+        self._n = 0
         self.last_check_time = 0
 
         # 交易记录
@@ -84,6 +119,28 @@ class SmartProfitStrategy(BaseStrategy):
         self.min_signal_strength = config.get('min_signal_strength', 60)
         self.rsi_history = []
 
+        # Wilder平滑RSI的平均涨幅/跌幅，积累 rsi_period+1 个价格后开始递推
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._rsi_ready = False
+
+        # 波动率和自适应止盈止损只随价格历史变化，缓存到下一次写入新价格
+        self._volatility = None
+        self._cached_stops = None
+        self._stops_dirty = True
+
+        # 短期/长期均线窗口的价格累加和，随新价格增量更新
+        self._sum_short = 0.0
+        self._sum_long = 0.0
+        # 每写入N个价格完整重算一次累加和，消除浮点误差累积
+        self.ma_resync_every = config.get('ma_resync_every', 500)
+        self._pushes_since_resync = 0
+        # 价格数量首次够计算两条均线后置位，之后保持为True
+        self._warmup_size = max(self.ma_short_period, self.ma_long_period)
+        self._warmed_up = False
+        # 上一次打印市场分析时的行情快照，行情没有变化时不重复打印
+        self._last_snap = None
+
         self.logger.info("=" * 60)
         self.logger.info("智能利润最大化策略初始化")
         self.logger.info("=" * 60)
@@ -98,67 +155,97 @@ class SmartProfitStrategy(BaseStrategy):
         self.logger.info(f"  波动率自适应: {'开启' if self.use_volatility_adapt else '关闭'}")
         self.logger.info("=" * 60)
 
+    def _last_n(self, n: int) -> np.ndarray:
+        """返回最近n个价格（按时间顺序的连续视图）"""
+        end = self._head + PRICE_HISTORY_SIZE
+        return self._prices[end - n:end]
+
+    def _push_price(self, price: float):
+        """写入价格环形缓冲区，并增量维护均线窗口累加和"""
+        head = self._head
+        end = head + PRICE_HISTORY_SIZE
+        # 窗口已满时移出的是 period 笔之前的价格（在覆盖写入前读取）
+        if self._n >= self.ma_short_period:
+            self._sum_short -= self._prices[end - self.ma_short_period]
+        if self._n >= self.ma_long_period:
+            self._sum_long -= self._prices[end - self.ma_long_period]
+        self._sum_short += price
+        self._sum_long += price
+        prev_price = self._prices[end - 1] if self._n else price
+
+        self._prices[head] = price
+        self._prices[head + PRICE_HISTORY_SIZE] = price
+        self._head = (head + 1) % PRICE_HISTORY_SIZE
+        if self._n < PRICE_HISTORY_SIZE:
+            self._n += 1
+            if self._n >= self._warmup_size:
+                self._warmed_up = True
+        self._volatility = None
+        self._stops_dirty = True
+
+        self._pushes_since_resync += 1
+        if self._pushes_since_resync >= self.ma_resync_every:
+            self._pushes_since_resync = 0
+            self._sum_short = float(self._last_n(min(self._n, self.ma_short_period)).sum())
+            self._sum_long = float(self._last_n(min(self._n, self.ma_long_period)).sum())
+
+        # RSI: 首次凑齐 period+1 个价格时用简单平均作为起点，之后按Wilder公式递推
+        period = self.rsi_period
+        if self._rsi_ready:
+            delta = price - prev_price
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            self._avg_gain = (self._avg_gain * (period - 1) + gain) / period
+            self._avg_loss = (self._avg_loss * (period - 1) + loss) / period
+        elif self._n > period:
+            # 涨跌拆分用 np.maximum 代替逐个判断正负
+            d = np.diff(self._last_n(period + 1))
+            self._avg_gain = float(np.maximum(d, 0.0).sum()) / period
+            self._avg_loss = float(np.maximum(-d, 0.0).sum()) / period
+            self._rsi_ready = True
+
+    @property
+    def price_history(self) -> np.ndarray:
+        """按时间顺序返回全部历史价格"""
+        return self._last_n(self._n)
+
     def calculate_ma(self, period: int) -> Optional[float]:
         """计算移动平均"""
-        if len(self.price_history) < period:
+        if self._n < period:
             return None
-        return sum(self.price_history[-period:]) / period
+        if period == self.ma_short_period:
+            return self._sum_short / period
+        if period == self.ma_long_period:
+            return self._sum_long / period
+        return float(self._last_n(period).sum()) / period
 
     def calculate_rsi(self) -> Optional[float]:
-        """计算RSI指标"""
-        if len(self.price_history) < self.rsi_period + 1:
+        """计算RSI指标（Wilder平滑，随新价格O(1)更新）"""
+        if not self._rsi_ready:
             return None
 
-        prices = self.price_history[-(self.rsi_period + 1):]
-        gains = []
-        losses = []
-
-        for i in range(1, len(prices)):
-            change = prices[i] - prices[i-1]
-            if change > 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(change))
-
-        avg_gain = sum(gains) / self.rsi_period
-        avg_loss = sum(losses) / self.rsi_period
-
-        if avg_loss == 0:
+        if self._avg_loss == 0:
             return 100
 
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        rs = self._avg_gain / self._avg_loss
+        return 100 - (100 / (1 + rs))
 
     def calculate_volatility(self) -> float:
         """计算价格波动率"""
-        if len(self.price_history) < 20:
+        if self._n < VOLATILITY_WINDOW:
             return 0.04  # 默认4%
 
-        recent_prices = self.price_history[-20:]
-        returns = [(recent_prices[i] - recent_prices[i-1]) / recent_prices[i-1]
-                   for i in range(1, len(recent_prices))]
-
-        if len(returns) < 2:
-            return 0.04
-
-        return statistics.stdev(returns)
+        if self._volatility is None:
+            self._volatility = float(_return_volatility(self._last_n(VOLATILITY_WINDOW)))
+        return self._volatility
 
     def is_trading_time(self) -> bool:
         """检查是否在推荐交易时段"""
         if not self.use_time_filter:
             return True
 
-        # UTC时间高波动时段
-        # 12:00-16:00 (亚洲)
-        # 20:00-00:00 (欧美)
-        now = datetime.utcnow()
-        hour = now.hour
-
-        # 亚洲时段或欧美时段
-        return (12 <= hour < 16) or (20 <= hour < 24) or (0 <= hour < 2)
+        # 直接由时间戳换算UTC小时，避免每次构造datetime对象
+        return int(time.time() // 3600) % 24 in self._TRADING_HOURS
 
     def calculate_signal_strength(self, side: str, ma_short: float, ma_long: float,
                                    rsi: Optional[float]) -> float:
@@ -170,8 +257,12 @@ class SmartProfitStrategy(BaseStrategy):
         2. RSI确认
         3. 价格位置
         4. 波动率
+
+        开启信号过滤时，一旦剩余各项拿满分也达不到 min_signal_strength 就提前返回当前得分
         """
         score = 0
+        # 开启信号过滤时用于剪枝的门槛，关闭时不剪枝
+        threshold = self.min_signal_strength if self.use_signal_filter else float('-inf')
 
         # 1. MA差距评分 (0-40分)
         ma_diff = abs(ma_short - ma_long) / self.current_price
@@ -184,6 +275,10 @@ class SmartProfitStrategy(BaseStrategy):
         else:
             score += 10
 
+        # 后续最多还能得 30 + 20 + 10 分
+        if score + 60 < threshold:
+            return score
+
         # 2. RSI确认 (0-30分)
         if rsi:
             if side == 'long':
@@ -201,6 +296,9 @@ class SmartProfitStrategy(BaseStrategy):
                 elif rsi > 30:
                     score += 10
 
+        if score + 30 < threshold:
+            return score
+
         # 3. 价格位置 (0-20分)
         if side == 'long' and self.current_price > ma_short:
             score += 20
@@ -209,6 +307,9 @@ class SmartProfitStrategy(BaseStrategy):
         else:
             score += 10
 
+        if score + 10 < threshold:
+            return score
+
         # 4. 时间过滤 (0-10分)
         if self.is_trading_time():
             score += 10
@@ -267,6 +368,9 @@ class SmartProfitStrategy(BaseStrategy):
         if not self.use_volatility_adapt:
             return self.base_stop_loss, self.base_take_profit
 
+        if not self._stops_dirty:
+            return self._cached_stops
+
         volatility = self.calculate_volatility()
 
         # 基准波动率 4%
@@ -281,7 +385,9 @@ class SmartProfitStrategy(BaseStrategy):
         adjusted_tp = self.base_take_profit * volatility_ratio
         adjusted_tp = max(0.03, min(0.06, adjusted_tp))
 
-        return adjusted_sl, adjusted_tp
+        self._cached_stops = (adjusted_sl, adjusted_tp)
+        self._stops_dirty = False
+        return self._cached_stops
 
     def on_tick(self, ticker_data: Dict):
         """处理行情更新"""
@@ -294,16 +400,13 @@ class SmartProfitStrategy(BaseStrategy):
                 return
 
             self.current_price = last_price
-            self.price_history.append(last_price)
 
-            if len(self.price_history) > 100:
-                self.price_history.pop(0)
-
-            # 每30秒检查一次
+            # 每30秒检查一次，价格历史也按30秒采样一次，指标建立在均匀的时间网格上
             current_time = time.time()
             if current_time - self.last_check_time < 30:
                 return
             self.last_check_time = current_time
+            self._push_price(last_price)
 
             # 更新持仓
             self._update_position()
@@ -321,34 +424,39 @@ class SmartProfitStrategy(BaseStrategy):
     def _check_entry_signals(self):
         """检查入场信号"""
         try:
-            if len(self.price_history) < self.ma_long_period:
-                self.logger.info(f"数据不足: {len(self.price_history)}/{self.ma_long_period}, 等待更多数据...")
+            logger = self.logger
+            if not self._warmed_up:
+                logger.info("数据不足: %d/%d, 等待更多数据...", self._n, self._warmup_size)
                 return
 
+            # 均线直接取增量维护的窗口累加和
             ma_short = self.calculate_ma(self.ma_short_period)
             ma_long = self.calculate_ma(self.ma_long_period)
             rsi = self.calculate_rsi()
 
-            if ma_short is None or ma_long is None:
-                self.logger.info(f"均线计算失败: MA{self.ma_short_period}={ma_short}, MA{self.ma_long_period}={ma_long}")
-                return
-
             # 打印市场状态
-            rsi_str = f"{rsi:.1f}" if rsi is not None else "N/A"
-            self.logger.info(f"📊 市场分析: 价格=${self.current_price:.8f}, MA{self.ma_short_period}={ma_short:.8f}, MA{self.ma_long_period}={ma_long:.8f}, RSI={rsi_str}")
+            log_info = logger.isEnabledFor(logging.INFO)
+            if log_info:
+                rsi_str = f"{rsi:.1f}" if rsi is not None else "N/A"
+                snap = (round(self.current_price, 2), round(ma_short, 2), round(ma_long, 2),
+                        int(rsi) if rsi is not None else -1)
+                if snap != self._last_snap:
+                    self._last_snap = snap
+                    logger.info("📊 市场分析: 价格=$%.8f, MA%d=%.8f, MA%d=%.8f, RSI=%s", self.current_price,
+                                self.ma_short_period, ma_short, self.ma_long_period, ma_long, rsi_str)
 
             # 做多信号
             if ma_short > ma_long and self.current_price > ma_short:
                 signal_strength = self.calculate_signal_strength('long', ma_short, ma_long, rsi)
 
                 if self.use_signal_filter and signal_strength < self.min_signal_strength:
-                    self.logger.info(f"做多信号强度不足: {signal_strength:.1f}/{self.min_signal_strength}, 跳过")
+                    logger.info("做多信号强度不足: %.1f/%s, 跳过", signal_strength, self.min_signal_strength)
                     return
 
-                self.logger.info(f"检测到做多信号 (强度: {signal_strength:.1f}/100)")
-                rsi_display = f"{rsi:.1f}" if rsi is not None else "N/A"
-                self.logger.info(f"  价格={self.current_price:.2f}, MA{self.ma_short_period}={ma_short:.2f}, "
-                               f"MA{self.ma_long_period}={ma_long:.2f}, RSI={rsi_display}")
+                if log_info:
+                    logger.info("检测到做多信号 (强度: %.1f/100)", signal_strength)
+                    logger.info("  价格=%.2f, MA%d=%.2f, MA%d=%.2f, RSI=%s", self.current_price,
+                                self.ma_short_period, ma_short, self.ma_long_period, ma_long, rsi_str)
                 self._open_position('long', signal_strength)
 
             # 做空信号
@@ -356,13 +464,13 @@ class SmartProfitStrategy(BaseStrategy):
                 signal_strength = self.calculate_signal_strength('short', ma_short, ma_long, rsi)
 
                 if self.use_signal_filter and signal_strength < self.min_signal_strength:
-                    self.logger.info(f"做空信号强度不足: {signal_strength:.1f}/{self.min_signal_strength}, 跳过")
+                    logger.info("做空信号强度不足: %.1f/%s, 跳过", signal_strength, self.min_signal_strength)
                     return
 
-                self.logger.info(f"检测到做空信号 (强度: {signal_strength:.1f}/100)")
-                rsi_display = f"{rsi:.1f}" if rsi is not None else "N/A"
-                self.logger.info(f"  价格={self.current_price:.2f}, MA{self.ma_short_period}={ma_short:.2f}, "
-                               f"MA{self.ma_long_period}={ma_long:.2f}, RSI={rsi_display}")
+                if log_info:
+                    logger.info("检测到做空信号 (强度: %.1f/100)", signal_strength)
+                    logger.info("  价格=%.2f, MA%d=%.2f, MA%d=%.2f, RSI=%s", self.current_price,
+                                self.ma_short_period, ma_short, self.ma_long_period, ma_long, rsi_str)
                 self._open_position('short', signal_strength)
 
         except Exception as e:
@@ -415,73 +523,50 @@ class SmartProfitStrategy(BaseStrategy):
             return
 
         try:
+            # 热路径上反复读取的属性先取到局部变量
+            cp = self.current_price
             entry_price = self.current_position['entry_price']
             side = self.current_position['side']
+            use_ts = self.use_trailing_stop
+            ts_trigger = self.trailing_stop_trigger
+            ts_distance = self.trailing_stop_distance
+            logger = self.logger
 
             # 获取自适应止盈止损
             stop_loss, take_profit = self.calculate_adaptive_stops()
 
-            if side == 'long':
-                profit_rate = (self.current_price - entry_price) / entry_price
-
-                # 移动止盈逻辑
-                if self.use_trailing_stop:
-                    if profit_rate >= self.trailing_stop_trigger:
-                        if not self.trailing_stop_active:
-                            self.trailing_stop_active = True
-                            self.highest_profit_price = self.current_price
-                            self.logger.info(f"🎯 启动移动止盈! 当前价格: {self.current_price:.2f}")
-
-                        if self.current_price > self.highest_profit_price:
-                            self.highest_profit_price = self.current_price
-
-                        # 检查是否回撤到追踪距离
-                        drawdown = (self.highest_profit_price - self.current_price) / self.highest_profit_price
-                        if drawdown >= self.trailing_stop_distance:
-                            self.logger.info(f"📈 移动止盈触发! 最高价={self.highest_profit_price:.2f}, "
-                                           f"当前价={self.current_price:.2f}, 回撤={drawdown*100:.2f}%")
-                            self._close_position(profit_rate, reason="移动止盈")
-                            return
-
-                # 固定止盈
-                if profit_rate >= take_profit:
-                    self.logger.info(f"🎯 触发止盈: {profit_rate*100:.2f}% >= {take_profit*100:.2f}%")
-                    self._close_position(profit_rate, reason="固定止盈")
-                # 止损
-                elif profit_rate <= -stop_loss:
-                    self.logger.info(f"🛑 触发止损: {profit_rate*100:.2f}% <= -{stop_loss*100:.2f}%")
-                    self._close_position(profit_rate, reason="止损")
+            # 做多为1、做空为-1，多空两个方向共用同一套判断
+            sign = 1.0 if side == 'long' else -1.0
+            profit_rate = sign * (cp - entry_price) / entry_price
+
+            # 移动止盈逻辑（做多跟踪最高价，做空跟踪最低价）
+            if use_ts and profit_rate >= ts_trigger:
+                highest = self.highest_profit_price
+                if not self.trailing_stop_active:
+                    self.trailing_stop_active = True
+                    highest = cp
+                    logger.info("🎯 启动移动止盈! 当前价格: %.2f", cp)
+
+                if sign * cp > sign * highest:
+                    highest = cp
+                self.highest_profit_price = highest
+
+                # 检查是否回撤到追踪距离
+                drawdown = sign * (highest - cp) / highest
+                if drawdown >= ts_distance:
+                    logger.info("📈 移动止盈触发! %s=%.2f, 当前价=%.2f, 回撤=%.2f%%",
+                                '最高价' if sign > 0 else '最低价', highest, cp, drawdown * 100)
+                    self._close_position(profit_rate, reason="移动止盈")
+                    return
 
-            else:  # short
-                profit_rate = (entry_price - self.current_price) / entry_price
-
-                # 移动止盈逻辑
-                if self.use_trailing_stop:
-                    if profit_rate >= self.trailing_stop_trigger:
-                        if not self.trailing_stop_active:
-                            self.trailing_stop_active = True
-                            self.highest_profit_price = self.current_price
-                            self.logger.info(f"🎯 启动移动止盈! 当前价格: {self.current_price:.2f}")
-
-                        if self.current_price < self.highest_profit_price:
-                            self.highest_profit_price = self.current_price
-
-                        # 检查是否回撤
-                        drawdown = (self.current_price - self.highest_profit_price) / self.highest_profit_price
-                        if drawdown >= self.trailing_stop_distance:
-                            self.logger.info(f"📈 移动止盈触发! 最低价={self.highest_profit_price:.2f}, "
-                                           f"当前价={self.current_price:.2f}, 回撤={drawdown*100:.2f}%")
-                            self._close_position(profit_rate, reason="移动止盈")
-                            return
-
-                # 固定止盈
-                if profit_rate >= take_profit:
-                    self.logger.info(f"🎯 触发止盈: {profit_rate*100:.2f}% >= {take_profit*100:.2f}%")
-                    self._close_position(profit_rate, reason="固定止盈")
-                # 止损
-                elif profit_rate <= -stop_loss:
-                    self.logger.info(f"🛑 触发止损: {profit_rate*100:.2f}% <= -{stop_loss*100:.2f}%")
-                    self._close_position(profit_rate, reason="止损")
+            # 固定止盈
+            if profit_rate >= take_profit:
+                logger.info("🎯 触发止盈: %.2f%% >= %.2f%%", profit_rate * 100, take_profit * 100)
+                self._close_position(profit_rate, reason="固定止盈")
+            # 止损
+            elif profit_rate <= -stop_loss:
+                logger.info("🛑 触发止损: %.2f%% <= -%.2f%%", profit_rate * 100, stop_loss * 100)
+                self._close_position(profit_rate, reason="止损")
 
         except Exception as e:
             self.logger.error(f"检查退出条件异常: {e}")
@@ -0,0 +1,20 @@
+"""
+可选的 Numba JIT 装饰器
+
+安装了numba时使用 numba.njit 编译数值计算热点函数，
+未安装时原样返回Python函数，调用方式不变。
+"""
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba不可用时的空装饰器，兼容 @njit 和 @njit(...) 两种写法"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
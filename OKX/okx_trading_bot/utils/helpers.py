@@ -1,11 +1,35 @@
 import math
-from typing import List, Tuple
-from decimal import Decimal, ROUND_DOWN
+from typing import List
+from decimal import Decimal
+import numpy as np
+
+
+# 常用精度的格式串预先生成，避免每次调用重新拼接格式说明
+_FIXED_FMT = {p: '{:.%df}' % p for p in range(13)}
 
 
 def format_number(number: float, precision: int = 8) -> str:
     """格式化数字，去除科学计数法"""
-    return f"{number:.{precision}f}".rstrip('0').rstrip('.')
+    fmt = _FIXED_FMT.get(precision)
+    text = fmt.format(number) if fmt else f"{number:.{precision}f}"
+    # 只有带小数部分时才去掉末尾的0和小数点（precision=0时整数末尾的0要保留）
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    return text
+
+
+def decimal_places(step: float) -> int:
+    """
+    计算精度步长对应的小数位数
+
+    Args:
+        step: 精度步长（如tickSz、lotSz）
+
+    Returns:
+        小数位数，如 0.01 -> 2, 1 -> 0
+    """
+    exponent = Decimal(str(step)).normalize().as_tuple().exponent
+    return max(0, -exponent)
 
 
 def calculate_grid_levels(price_upper: float, price_lower: float, grid_num: int) -> List[float]:
@@ -26,10 +50,9 @@ def calculate_grid_levels(price_upper: float, price_lower: float, grid_num: int)
     if price_upper <= price_lower:
         raise ValueError("价格上限必须大于价格下限")
 
-    step = (price_upper - price_lower) / (grid_num - 1)
-    levels = [price_lower + i * step for i in range(grid_num)]
+    levels = np.linspace(price_lower, price_upper, grid_num)
 
-    return levels
+    return levels.tolist()
 
 
 def calculate_geometric_grid_levels(price_upper: float, price_lower: float, grid_num: int) -> List[float]:
@@ -50,10 +73,10 @@ def calculate_geometric_grid_levels(price_upper: float, price_lower: float, grid
     if price_upper <= price_lower:
         raise ValueError("价格上限必须大于价格下限")
 
-    ratio = (price_upper / price_lower) ** (1 / (grid_num - 1))
-    levels = [price_lower * (ratio ** i) for i in range(grid_num)]
+    # 首尾档位精确等于上下限，不会因逐次乘比例累积舍入误差
+    levels = np.geomspace(price_lower, price_upper, grid_num)
 
-    return levels
+    return levels.tolist()
 
 
 def calculate_position_size(investment: float, price: float, grid_num: int) -> float:
@@ -74,12 +97,30 @@ def calculate_position_size(investment: float, price: float, grid_num: int) -> f
     return per_grid_quantity
 
 
+# 10的整数次幂查表
+_POW10 = tuple(10 ** i for i in range(16))
+
+
 def round_down(value: float, decimals: int) -> float:
     """向下取整到指定小数位"""
-    multiplier = 10 ** decimals
+    multiplier = _POW10[decimals] if 0 <= decimals < 16 else 10 ** decimals
     return math.floor(value * multiplier) / multiplier
 
 
+# 持仓方向 -> 盈亏符号
+_SIDE_SIGN = {'long': 1.0, 'short': -1.0, 'LONG': 1.0, 'SHORT': -1.0, 'Long': 1.0, 'Short': -1.0}
+
+
+def _side_sign(side: str) -> float:
+    """持仓方向对应的盈亏符号，做多为1，做空为-1"""
+    sign = _SIDE_SIGN.get(side)
+    if sign is None:
+        sign = _SIDE_SIGN.get(side.lower())
+        if sign is None:
+            raise ValueError(f"Invalid side: {side}")
+    return sign
+
+
 def calculate_pnl(entry_price: float, current_price: float, size: float, side: str) -> float:
     """
     计算盈亏
@@ -93,14 +134,7 @@ def calculate_pnl(entry_price: float, current_price: float, size: float, side: s
     Returns:
         盈亏金额
     """
-    if side.lower() == 'long':
-        pnl = (current_price - entry_price) * size
-    elif side.lower() == 'short':
-        pnl = (entry_price - current_price) * size
-    else:
-        raise ValueError(f"Invalid side: {side}")
-
-    return pnl
+    return _side_sign(side) * (current_price - entry_price) * size
 
 
 def calculate_pnl_rate(entry_price: float, current_price: float, side: str) -> float:
@@ -115,11 +149,4 @@ def calculate_pnl_rate(entry_price: float, current_price: float, side: str) -> f
     Returns:
         收益率
     """
-    if side.lower() == 'long':
-        rate = (current_price - entry_price) / entry_price
-    elif side.lower() == 'short':
-        rate = (entry_price - current_price) / entry_price
-    else:
-        raise ValueError(f"Invalid side: {side}")
-
-    return rate
+    return _side_sign(side) * (current_price - entry_price) / entry_price
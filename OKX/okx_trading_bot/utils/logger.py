@@ -1,5 +1,8 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
 
 
@@ -22,7 +25,7 @@ def setup_logger(name: str, log_file: str = None, level: str = "INFO") -> loggin
     # 控制台处理器
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
 
     # 文件处理器
     if log_file:
@@ -33,7 +36,15 @@ def setup_logger(name: str, log_file: str = None, level: str = "INFO") -> loggin
 
         file_handler = logging.FileHandler(log_file, encoding='utf-8')
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    # 调用线程只把日志记录放入队列，格式化和写控制台/文件由后台监听线程完成
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # 退出前把队列中剩余的日志写完
+    logger._queue_listener = listener
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     return logger
 
@@ -4,15 +4,49 @@ OKX量化交易 - 增强版桌面UI
 """
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
+import codecs
+import functools
 import threading
+import queue
 import time
+import selectors
 import subprocess
 import os
+import sys
+import signal
 import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import yaml
 from okx_trading_bot.config import Config
 from okx_trading_bot.api import OKXClient
 
+# 配置读写优先使用libyaml的C实现，模块加载时确定一次
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
+# Pillow为可选依赖，安装后标题中的emoji预渲染为图片复用
+try:
+    from PIL import Image, ImageDraw, ImageFont, ImageTk
+except ImportError:
+    Image = None
+
+# 日志面板超过上限行数时，一次删到保留行数，避免每批日志都做删除
+LOG_MAX_LINES = 5000
+LOG_KEEP_LINES = 4000
+
+# 机器人输出中需要显示到日志面板的交易关键字
+TRADE_KEYWORDS_RE = re.compile('检测到|开仓|平仓|触发')
+# 交易相关输出行在日志面板中的前缀
+TRADE_LINE_PREFIX = '📊 '
+
+# 彩色emoji字体（Windows自带）
+EMOJI_FONT = 'seguiemj.ttf'
+
 
 class ModernButton(tk.Canvas):
     """现代化按钮控件（带动画效果）"""
@@ -35,9 +69,11 @@ class ModernButton(tk.Canvas):
         self.bind('<Leave>', self.on_leave)
         self.bind('<Button-1>', self.on_click)
 
-    def create_rounded_rect(self, x1, y1, x2, y2, radius=25, **kwargs):
-        """创建圆角矩形"""
-        points = [x1+radius, y1,
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _rounded_points(x1, y1, x2, y2, radius):
+        """圆角矩形顶点坐标（同尺寸按钮共用同一份结果）"""
+        return (x1+radius, y1,
                   x1+radius, y1,
                   x2-radius, y1,
                   x2-radius, y1,
@@ -56,7 +92,11 @@ class ModernButton(tk.Canvas):
                   x1, y2-radius,
                   x1, y1+radius,
                   x1, y1+radius,
-                  x1, y1]
+                  x1, y1)
+
+    def create_rounded_rect(self, x1, y1, x2, y2, radius=25, **kwargs):
+        """创建圆角矩形"""
+        points = self._rounded_points(x1, y1, x2, y2, radius)
         return self.create_polygon(points, **kwargs, smooth=True)
 
     def on_enter(self, event):
@@ -98,12 +138,15 @@ class TradingUI:
         self.root.title("OKX 量化交易系统 v2.0")
         self.root.geometry("1500x950")
 
-        # 设置高DPI支持
-        try:
-            from ctypes import windll
-            windll.shcore.SetProcessDpiAwareness(1)
-        except:
-            pass
+        # 设置高DPI支持（仅Windows，启动时设置一次）
+        self._dpi_ok = False
+        if os.name == 'nt':
+            try:
+                from ctypes import windll
+                windll.shcore.SetProcessDpiAwareness(1)
+                self._dpi_ok = True
+            except Exception:
+                pass
 
         # 现代化配色方案
         self.colors = {
@@ -121,8 +164,29 @@ class TradingUI:
             'danger': '#e74c3c'
         }
 
+        # 涨/跌颜色在刷新时频繁使用，单独取出
+        self._col_up = self.colors['success']
+        self._col_dn = self.colors['danger']
+
+        # 运行/离线两种状态下状态栏的显示，颜色提前解析好
+        self._states = {
+            'online': {'fill': self._col_up, 'text': "系统运行中", 'fg': self._col_up, 'running': True},
+            'offline': {'fill': self._col_dn, 'text': "系统离线", 'fg': self._col_dn, 'running': False},
+        }
+
         self.root.configure(bg=self.colors['bg_dark'])
 
+        # (emoji, 字号) -> PhotoImage，同一个emoji只渲染一次
+        self._emoji_img = {}
+
+        # 各标签最近一次设置的内容，刷新时值没变就不再调用config
+        self._label_state = {}
+        self._last_position_text = None
+
+        # 账户详情窗口只创建一次，关闭时隐藏，再次打开时复用
+        self._details_win = None
+        self._detail_text = None
+
         # 加载配置
         self.config = Config()
         okx_config = self.config.get_okx_config()
@@ -149,14 +213,39 @@ class TradingUI:
             'position': '仓位策略 (简单)',
             'grid': '网格策略 (震荡)'
         }
+        # 显示名称 -> 策略代码
+        self._strategy_rev = {name: code for code, name in self.available_strategies.items()}
 
-        self.symbol = self.config.get('trading.symbol', 'PEPE-USDT-SWAP')
+        self._set_symbol(self.config.get('trading.symbol', 'PEPE-USDT-SWAP'))
         self.strategy_type = self.config.get('trading.strategy_type', 'smart')
         self.bot_process = None
         self.is_running = False
-        self.update_thread = None
+        # 默认在UI进程内的线程中运行机器人；需要进程隔离时配置 ui.bot_in_process: false
+        self.bot_in_process = self.config.get('ui.bot_in_process', True)
+        self._bot = None
+        self._bot_thread = None  # 机器人线程退出后才清空
+        self._bot_stop = threading.Event()  # 本次运行是否已请求停止
+        # 子进程输出的选择器和定时读取任务
+        self._out_sel = None
+        self._poll_job = None
+
+        # REST查询结果短时缓存，key -> (结果, 过期时间)，合并短时间内的重复刷新
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._cache_ttl = 2.0
+
+        # 所有后台REST任务交给同一个常驻工作线程串行执行，避免并发请求和频繁创建线程
+        self._jobs = queue.Queue()
+        self.update_thread = threading.Thread(target=self._worker, daemon=True)
+        self.update_thread.start()
+        # 行情、余额、持仓三个查询互不依赖，用小线程池并发发出
+        self._fetch_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix='ui-fetch')
+
+        # 日志队列：后台线程只负责放入，控件只在主线程中更新
+        self._log_q = queue.Queue()
 
         self.setup_ui()
+        self._drain_logs()
         self.start_auto_update()
 
     def setup_ui(self):
@@ -173,7 +262,7 @@ class TradingUI:
 
         tk.Label(
             title_frame,
-            text="🚀 OKX",
+            **self._emoji_text("🚀 OKX", 32),
             font=('Microsoft YaHei UI', 24, 'bold'),
             bg=self.colors['bg_medium'],
             fg=self.colors['accent_green']
@@ -250,7 +339,7 @@ class TradingUI:
         # 卡片标题
         title_label = tk.Label(
             card,
-            text=title,
+            **self._emoji_text(title, 18),
             font=('Microsoft YaHei UI', 13, 'bold'),
             bg=self.colors['bg_medium'],
             fg=self.colors['text_white'],
@@ -260,6 +349,35 @@ class TradingUI:
 
         return card
 
+    def _emoji_image(self, emoji, size):
+        """把emoji渲染成PhotoImage并缓存，渲染失败时返回None"""
+        key = (emoji, size)
+        if key in self._emoji_img:
+            return self._emoji_img[key]
+
+        image = None
+        if Image is not None:
+            try:
+                font = ImageFont.truetype(EMOJI_FONT, size)
+                canvas = Image.new('RGBA', (size * 2, size * 2), (0, 0, 0, 0))
+                ImageDraw.Draw(canvas).text((0, 0), emoji, font=font, embedded_color=True)
+                bbox = canvas.getbbox()
+                if bbox:
+                    image = ImageTk.PhotoImage(canvas.crop(bbox))
+            except Exception:
+                image = None
+
+        self._emoji_img[key] = image
+        return image
+
+    def _emoji_text(self, text, size):
+        """标题以emoji开头时返回图片+文字的Label参数，否则原样返回文字"""
+        emoji, sep, rest = text.partition(' ')
+        image = self._emoji_image(emoji, size) if sep else None
+        if image is None:
+            return {'text': text}
+        return {'text': ' ' + rest, 'image': image, 'compound': 'left'}
+
     def create_trading_config_card(self, parent):
         """创建交易配置卡片"""
         card = self.create_card(parent, "⚙ 交易配置", height=200)
@@ -348,75 +466,41 @@ class TradingUI:
             self.colors['accent_blue'], '#0a3d62', width=150, height=35
         ).pack(pady=10)
 
-    def create_market_card(self, parent):
-        """创建市场行情卡片"""
-        card = self.create_card(parent, "📊 市场行情", height=170)
-
-        content = tk.Frame(card, bg=self.colors['bg_medium'])
-        content.pack(fill='both', expand=True, padx=20, pady=(0, 15))
-
-        # 价格显示
-        price_frame = tk.Frame(content, bg=self.colors['bg_medium'])
-        price_frame.pack(fill='x', pady=5)
-
-        tk.Label(
-            price_frame,
-            text="当前价格",
-            font=('Microsoft YaHei UI', 10),
-            bg=self.colors['bg_medium'],
-            fg=self.colors['text_gray']
-        ).pack(side='left')
-
-        self.price_label = tk.Label(
-            price_frame,
-            text="加载中...",
-            font=('Consolas', 15, 'bold'),
-            bg=self.colors['bg_medium'],
-            fg=self.colors['accent_green']
-        )
-        self.price_label.pack(side='right')
-
-        # 24h涨跌
-        change_frame = tk.Frame(content, bg=self.colors['bg_medium'])
-        change_frame.pack(fill='x', pady=5)
+    def _kv_row(self, parent, left, text='--', font=('Consolas', 11), color=None):
+        """创建一行“名称 - 数值”，返回右侧数值标签"""
+        row = tk.Frame(parent, bg=self.colors['bg_medium'])
+        row.pack(fill='x', pady=5)
 
         tk.Label(
-            change_frame,
-            text="24h 波动",
+            row,
+            text=left,
             font=('Microsoft YaHei UI', 10),
             bg=self.colors['bg_medium'],
             fg=self.colors['text_gray']
         ).pack(side='left')
 
-        self.change_label = tk.Label(
-            change_frame,
-            text="--",
-            font=('Consolas', 13, 'bold'),
+        label = tk.Label(
+            row,
+            text=text,
+            font=font,
             bg=self.colors['bg_medium'],
-            fg=self.colors['text_white']
+            fg=color or self.colors['text_white']
         )
-        self.change_label.pack(side='right')
+        label.pack(side='right')
+        return label
 
-        # 成交量
-        volume_frame = tk.Frame(content, bg=self.colors['bg_medium'])
-        volume_frame.pack(fill='x', pady=5)
+    def create_market_card(self, parent):
+        """创建市场行情卡片"""
+        card = self.create_card(parent, "📊 市场行情", height=170)
 
-        tk.Label(
-            volume_frame,
-            text="24h 成交",
-            font=('Microsoft YaHei UI', 10),
-            bg=self.colors['bg_medium'],
-            fg=self.colors['text_gray']
-        ).pack(side='left')
+        content = tk.Frame(card, bg=self.colors['bg_medium'])
+        content.pack(fill='both', expand=True, padx=20, pady=(0, 15))
 
-        self.volume_label = tk.Label(
-            volume_frame,
-            text="--",
-            font=('Consolas', 11),
-            bg=self.colors['bg_medium'],
-            fg=self.colors['text_white']
-        )
-        self.volume_label.pack(side='right')
+        # 价格、24h涨跌、成交量
+        self.price_label = self._kv_row(content, "当前价格", "加载中...", ('Consolas', 15, 'bold'),
+                                        self.colors['accent_green'])
+        self.change_label = self._kv_row(content, "24h 波动", font=('Consolas', 13, 'bold'))
+        self.volume_label = self._kv_row(content, "24h 成交")
 
     def create_account_card(self, parent):
         """创建账户信息卡片"""
@@ -425,68 +509,11 @@ class TradingUI:
         content = tk.Frame(card, bg=self.colors['bg_medium'])
         content.pack(fill='both', expand=True, padx=20, pady=(0, 15))
 
-        # 总资产
-        equity_frame = tk.Frame(content, bg=self.colors['bg_medium'])
-        equity_frame.pack(fill='x', pady=5)
-
-        tk.Label(
-            equity_frame,
-            text="总权益",
-            font=('Microsoft YaHei UI', 10),
-            bg=self.colors['bg_medium'],
-            fg=self.colors['text_gray']
-        ).pack(side='left')
-
-        self.balance_label = tk.Label(
-            equity_frame,
-            text="$0.00",
-            font=('Consolas', 15, 'bold'),
-            bg=self.colors['bg_medium'],
-            fg=self.colors['accent_blue']
-        )
-        self.balance_label.pack(side='right')
-
-        # 可用余额
-        avail_frame = tk.Frame(content, bg=self.colors['bg_medium'])
-        avail_frame.pack(fill='x', pady=5)
-
-        tk.Label(
-            avail_frame,
-            text="可用",
-            font=('Microsoft YaHei UI', 10),
-            bg=self.colors['bg_medium'],
-            fg=self.colors['text_gray']
-        ).pack(side='left')
-
-        self.available_label = tk.Label(
-            avail_frame,
-            text="$0.00",
-            font=('Consolas', 11),
-            bg=self.colors['bg_medium'],
-            fg=self.colors['text_white']
-        )
-        self.available_label.pack(side='right')
-
-        # 保证金占用
-        margin_frame = tk.Frame(content, bg=self.colors['bg_medium'])
-        margin_frame.pack(fill='x', pady=5)
-
-        tk.Label(
-            margin_frame,
-            text="保证金",
-            font=('Microsoft YaHei UI', 10),
-            bg=self.colors['bg_medium'],
-            fg=self.colors['text_gray']
-        ).pack(side='left')
-
-        self.margin_label = tk.Label(
-            margin_frame,
-            text="$0.00 (0%)",
-            font=('Consolas', 11),
-            bg=self.colors['bg_medium'],
-            fg=self.colors['text_white']
-        )
-        self.margin_label.pack(side='right')
+        # 总权益、可用余额、保证金占用
+        self.balance_label = self._kv_row(content, "总权益", "$0.00", ('Consolas', 15, 'bold'),
+                                          self.colors['accent_blue'])
+        self.available_label = self._kv_row(content, "可用", "$0.00")
+        self.margin_label = self._kv_row(content, "保证金", "$0.00 (0%)")
 
         # 查看详情按钮
         ModernButton(
@@ -575,6 +602,9 @@ class TradingUI:
             pady=10
         )
         self.log_text.pack(fill='both', expand=True, padx=20, pady=(0, 15))
+        # 只读，写入时临时打开
+        self.log_text.config(state='disabled')
+        self._log_lines = 0
 
         # 初始日志
         self.log("✓ 系统初始化完成")
@@ -585,56 +615,116 @@ class TradingUI:
         self.log("⚡ 准备就绪，配置交易参数后点击'启动交易'")
 
     def log(self, message, color=None):
-        """添加日志"""
-        def _log():
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            log_message = f"[{timestamp}] {message}\n"
-            self.log_text.insert('end', log_message)
-            self.log_text.see('end')
-        self.root.after(0, _log)
+        """添加日志（只放入队列，任何线程都可以调用，由主线程定时批量写入日志面板）"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self._log_q.put(f"[{timestamp}] {message}\n")
+
+    def _drain_logs(self):
+        """主线程每50ms取出队列中的全部日志，一次性写入日志面板"""
+        lines = []
+        try:
+            while True:
+                lines.append(self._log_q.get_nowait())
+        except queue.Empty:
+            pass
+
+        if lines:
+            self._write_log(lines)
+        self.root.after(50, self._drain_logs)
+
+    def _write_log(self, lines):
+        """把一批日志写入日志面板"""
+        text = ''.join(lines)
+        log_text = self.log_text
+        log_text.config(state='normal')
+        log_text.insert('end', text)
+
+        # 超出行数上限时删掉最早的日志，控制内存占用
+        self._log_lines += text.count('\n')
+        if self._log_lines > LOG_MAX_LINES:
+            log_text.delete('1.0', f'{self._log_lines - LOG_KEEP_LINES + 1}.0')
+            self._log_lines = LOG_KEEP_LINES
+        log_text.config(state='disabled')
+        log_text.see('end')
+
+    def _cached(self, key, ttl, fn):
+        """带过期时间的REST查询缓存"""
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry and entry[1] > now:
+                return entry[0]
+
+        value = fn()
+        if value.get('code') == '0':
+            with self._cache_lock:
+                self._cache[key] = (value, now + ttl)
+        return value
+
+    def _invalidate_symbol_cache(self, symbol):
+        """清除指定交易对相关的缓存"""
+        with self._cache_lock:
+            for key in [k for k in self._cache if k[1] == symbol]:
+                del self._cache[key]
+
+    def _set_symbol(self, symbol):
+        """切换交易对，并按币种确定价格显示精度"""
+        self.symbol = symbol
+        self._price_fmt = "${:.8f}" if symbol.startswith(('PEPE', 'SHIB')) else "${:.4f}"
 
     def on_symbol_changed(self, event):
         """币种选择变化"""
-        self.symbol = self.symbol_var.get()
+        self._invalidate_symbol_cache(self.symbol)
+        self._set_symbol(self.symbol_var.get())
         self.log(f"📌 切换交易对: {self.symbol}")
         self.refresh_data()
 
     def on_strategy_changed(self, event):
         """策略选择变化"""
         strategy_name = self.strategy_var.get()
-        # 反向查找策略代码
-        for code, name in self.available_strategies.items():
-            if name == strategy_name:
-                self.strategy_type = code
-                break
+        self.strategy_type = self._strategy_rev.get(strategy_name, self.strategy_type)
         self.log(f"📌 切换策略: {strategy_name}")
 
     def save_config(self):
-        """保存配置"""
-        try:
-            config_path = os.path.join(os.path.dirname(__file__), 'okx_trading_bot', 'config', 'config.yaml')
+        """保存配置（文件读写放到后台线程，不阻塞界面）"""
+        symbol = self.symbol
+        strategy_type = self.strategy_type
 
-            # 读取现有配置
-            import yaml
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config_data = yaml.safe_load(f)
+        def _save():
+            try:
+                config_path = os.path.join(os.path.dirname(__file__), 'okx_trading_bot', 'config', 'config.yaml')
 
-            # 更新配置
-            config_data['trading']['symbol'] = self.symbol
-            config_data['trading']['strategy_type'] = self.strategy_type
+                # 读取现有配置
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    config_data = yaml.load(f, Loader=YamlLoader)
 
-            # 保存配置
-            with open(config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config_data, f, allow_unicode=True)
+                # 更新配置
+                config_data['trading']['symbol'] = symbol
+                config_data['trading']['strategy_type'] = strategy_type
 
-            self.log("✓ 配置已保存")
-            messagebox.showinfo("成功", "配置已保存！")
-        except Exception as e:
-            self.log(f"✗ 保存配置失败: {e}")
-            messagebox.showerror("错误", f"保存失败: {e}")
+                # 保存配置
+                with open(config_path, 'w', encoding='utf-8') as f:
+                    yaml.dump(config_data, f, Dumper=YamlDumper, allow_unicode=True)
+
+                self.log("✓ 配置已保存")
+                self.root.after(0, lambda: messagebox.showinfo("成功", "配置已保存！"))
+            except Exception as e:
+                error = f"保存失败: {e}"
+                self.log(f"✗ 保存配置失败: {e}")
+                self.root.after(0, lambda: messagebox.showerror("错误", error))
+
+        threading.Thread(target=_save, daemon=True).start()
 
     def show_account_details(self):
         """显示账户详细信息"""
+        # 详情窗口打开期间暂停主界面的定时刷新
+        self._poll_enabled = False
+        if self._details_win is not None and self._details_win.winfo_exists():
+            self._details_win.deiconify()
+            self._details_win.lift()
+            self._refresh_details()
+            return
+
         detail_window = tk.Toplevel(self.root)
         detail_window.title("账户详细信息")
         detail_window.geometry("700x600")
@@ -665,58 +755,85 @@ class TradingUI:
         )
         detail_text.pack(fill='both', expand=True, padx=15, pady=15)
 
+        # 关闭按钮（只隐藏窗口，下次打开直接复用）
+        ModernButton(
+            detail_window, "关闭", self._close_details,
+            self.colors['accent_purple'], '#341f97', width=200, height=45
+        ).pack(pady=20)
+        detail_window.protocol("WM_DELETE_WINDOW", self._close_details)
+
+        self._details_win = detail_window
+        self._detail_text = detail_text
+        self._refresh_details()
+
+    def _close_details(self):
+        """隐藏详情窗口并恢复定时刷新"""
+        self._details_win.withdraw()
+        self._poll_enabled = True
+
+    def _refresh_details(self):
+        """刷新详情窗口：先显示加载提示，查询放到后台线程"""
+        self._detail_text.delete('1.0', 'end')
+        self._detail_text.insert('end', "加载中...\n")
+        threading.Thread(target=self._load_account_details, daemon=True).start()
+
+    def _load_account_details(self):
+        """查询账户信息（后台线程），结果交回主线程写入详情窗口"""
         # 获取账户信息
+        lines = []
         try:
             balance = self.api_client.get_balance()
             positions = self.api_client.get_positions()
 
-            detail_text.insert('end', "=" * 60 + "\n")
-            detail_text.insert('end', "账户概览\n")
-            detail_text.insert('end', "=" * 60 + "\n\n")
+            lines.append("=" * 60 + "\n")
+            lines.append("账户概览\n")
+            lines.append("=" * 60 + "\n\n")
 
             if balance['code'] == '0' and balance['data']:
                 data = balance['data'][0]
-                detail_text.insert('end', f"总权益: ${float(data.get('totalEq', 0)):.2f} USDT\n")
-                detail_text.insert('end', f"可用余额: ${float(data.get('availBal', 0)):.2f} USDT\n")
-                detail_text.insert('end', f"冻结余额: ${float(data.get('frozenBal', 0)):.2f} USDT\n")
-                detail_text.insert('end', f"账户等级: {data.get('acctLv', 'N/A')}\n\n")
+                lines.append(f"总权益: ${float(data.get('totalEq', 0)):.2f} USDT\n")
+                lines.append(f"可用余额: ${float(data.get('availBal', 0)):.2f} USDT\n")
+                lines.append(f"冻结余额: ${float(data.get('frozenBal', 0)):.2f} USDT\n")
+                lines.append(f"账户等级: {data.get('acctLv', 'N/A')}\n\n")
 
-                detail_text.insert('end', "=" * 60 + "\n")
-                detail_text.insert('end', "币种余额\n")
-                detail_text.insert('end', "=" * 60 + "\n\n")
+                lines.append("=" * 60 + "\n")
+                lines.append("币种余额\n")
+                lines.append("=" * 60 + "\n\n")
 
                 for detail in data.get('details', []):
                     ccy = detail.get('ccy')
                     avail = float(detail.get('availBal', 0))
                     if avail > 0:
-                        detail_text.insert('end', f"{ccy}: {avail}\n")
+                        lines.append(f"{ccy}: {avail}\n")
 
-            detail_text.insert('end', "\n" + "=" * 60 + "\n")
-            detail_text.insert('end', "持仓信息\n")
-            detail_text.insert('end', "=" * 60 + "\n\n")
+            lines.append("\n" + "=" * 60 + "\n")
+            lines.append("持仓信息\n")
+            lines.append("=" * 60 + "\n\n")
 
             if positions['code'] == '0' and positions['data']:
                 has_pos = False
                 for pos in positions['data']:
                     if float(pos.get('pos', 0)) != 0:
                         has_pos = True
-                        detail_text.insert('end', f"产品: {pos.get('instId')}\n")
-                        detail_text.insert('end', f"数量: {pos.get('pos')} 张\n")
-                        detail_text.insert('end', f"开仓价: ${pos.get('avgPx')}\n")
-                        detail_text.insert('end', f"盈亏: ${pos.get('upl')} ({float(pos.get('uplRatio', 0))*100:.2f}%)\n")
-                        detail_text.insert('end', "-" * 60 + "\n")
+                        lines.append(f"产品: {pos.get('instId')}\n")
+                        lines.append(f"数量: {pos.get('pos')} 张\n")
+                        lines.append(f"开仓价: ${pos.get('avgPx')}\n")
+                        lines.append(f"盈亏: ${pos.get('upl')} ({float(pos.get('uplRatio', 0))*100:.2f}%)\n")
+                        lines.append("-" * 60 + "\n")
 
                 if not has_pos:
-                    detail_text.insert('end', "暂无持仓\n")
+                    lines.append("暂无持仓\n")
 
         except Exception as e:
-            detail_text.insert('end', f"获取账户信息失败: {e}\n")
+            lines.append(f"获取账户信息失败: {e}\n")
 
-        # 关闭按钮
-        ModernButton(
-            detail_window, "关闭", detail_window.destroy,
-            self.colors['accent_purple'], '#341f97', width=200, height=45
-        ).pack(pady=20)
+        text = ''.join(lines)
+
+        def _apply():
+            if self._detail_text.winfo_exists():
+                self._detail_text.delete('1.0', 'end')
+                self._detail_text.insert('end', text)
+        self.root.after(0, _apply)
 
     def emergency_close(self):
         """紧急平仓"""
@@ -733,10 +850,18 @@ class TradingUI:
                 self.log(f"✗ 平仓异常: {e}")
                 messagebox.showerror("错误", str(e))
 
+    def _set_label(self, label, **options):
+        """更新标签，显示内容与上次相同时跳过config"""
+        if self._label_state.get(label) != options:
+            label.config(**options)
+            self._label_state[label] = options
+
     def update_market_data(self):
         """更新市场数据"""
         try:
-            ticker = self.api_client.get_ticker(self.symbol)
+            symbol = self.symbol
+            ticker = self._cached(('ticker', symbol), self._cache_ttl,
+                                  lambda: self.api_client.get_ticker(symbol))
             if ticker['code'] == '0' and ticker['data']:
                 data = ticker['data'][0]
                 price = float(data['last'])
@@ -746,24 +871,24 @@ class TradingUI:
 
                 change = ((high - low) / price * 100)
 
-                # 根据币种调整显示精度
-                if 'PEPE' in self.symbol or 'SHIB' in self.symbol:
-                    self.price_label.config(text=f"${price:.8f}")
-                else:
-                    self.price_label.config(text=f"${price:.4f}")
-
-                self.change_label.config(
-                    text=f"{change:.2f}%",
-                    fg=self.colors['success'] if change > 0 else self.colors['danger']
-                )
-                self.volume_label.config(text=f"${vol/1000000:.1f}M")
+                # Tk不是线程安全的，控件更新统一交回主线程执行
+                def _apply():
+                    self._set_label(self.price_label, text=self._price_fmt.format(price))
+
+                    self._set_label(
+                        self.change_label,
+                        text=f"{change:.2f}%",
+                        fg=self._col_up if change > 0 else self._col_dn
+                    )
+                    self._set_label(self.volume_label, text=f"${vol/1000000:.1f}M")
+                self.root.after(0, _apply)
         except Exception as e:
             pass
 
     def update_account_data(self):
         """更新账户数据"""
         try:
-            balance = self.api_client.get_balance()
+            balance = self._cached(('balance', None), self._cache_ttl, self.api_client.get_balance)
             if balance['code'] == '0' and balance['data']:
                 data = balance['data'][0]
                 equity = float(data.get('totalEq', 0))
@@ -776,20 +901,26 @@ class TradingUI:
                 margin_used = equity - avail
                 margin_pct = (margin_used / equity * 100) if equity > 0 else 0
 
-                self.balance_label.config(text=f"${equity:.2f}")
-                self.available_label.config(text=f"${avail:.2f}")
-                self.margin_label.config(
-                    text=f"${margin_used:.2f} ({margin_pct:.1f}%)",
-                    fg=self.colors['danger'] if margin_pct > 50 else self.colors['success']
-                )
+                def _apply():
+                    self._set_label(self.balance_label, text=f"${equity:.2f}")
+                    self._set_label(self.available_label, text=f"${avail:.2f}")
+                    self._set_label(
+                        self.margin_label,
+                        text=f"${margin_used:.2f} ({margin_pct:.1f}%)",
+                        fg=self._col_dn if margin_pct > 50 else self._col_up
+                    )
+                self.root.after(0, _apply)
         except Exception as e:
             pass
 
     def update_position_data(self):
         """更新持仓数据"""
+        lines = []
         try:
-            positions = self.api_client.get_positions(inst_id=self.symbol)
-            self.position_text.delete('1.0', 'end')
+            symbol = self.symbol
+            price_fmt = self._price_fmt
+            positions = self._cached(('positions', symbol), self._cache_ttl,
+                                     lambda: self.api_client.get_positions(inst_id=symbol))
 
             if positions['code'] == '0' and positions['data']:
                 has_position = False
@@ -803,82 +934,116 @@ class TradingUI:
                         upl = float(pos.get('upl', 0))
                         upl_ratio = float(pos.get('uplRatio', 0)) * 100
 
-                        self.position_text.insert('end', f"方向: {side}\n")
-                        self.position_text.insert('end', f"数量: {abs(pos_size)} 张\n")
+                        lines.append(f"方向: {side}\n")
+                        lines.append(f"数量: {abs(pos_size)} 张\n")
 
-                        # 根据币种调整精度
-                        if 'PEPE' in self.symbol or 'SHIB' in self.symbol:
-                            self.position_text.insert('end', f"开仓: ${entry:.8f}\n")
-                            self.position_text.insert('end', f"当前: ${mark:.8f}\n")
-                        else:
-                            self.position_text.insert('end', f"开仓: ${entry:.4f}\n")
-                            self.position_text.insert('end', f"当前: ${mark:.4f}\n")
+                        lines.append(f"开仓: {price_fmt.format(entry)}\n")
+                        lines.append(f"当前: {price_fmt.format(mark)}\n")
 
-                        self.position_text.insert('end', f"盈亏: ${upl:.2f} ({upl_ratio:+.2f}%)\n")
+                        lines.append(f"盈亏: ${upl:.2f} ({upl_ratio:+.2f}%)\n")
 
                 if not has_position:
-                    self.position_text.insert('end', "暂无持仓\n\n等待交易信号...")
+                    lines.append("暂无持仓\n\n等待交易信号...")
             else:
-                self.position_text.insert('end', "暂无持仓\n\n等待交易信号...")
+                lines.append("暂无持仓\n\n等待交易信号...")
         except Exception as e:
-            self.position_text.insert('end', f"查询失败: {e}")
+            lines.append(f"查询失败: {e}")
+
+        # 拼成一个字符串一次性写入，避免逐行insert反复重排重绘
+        text = ''.join(lines)
+
+        def _apply():
+            # 内容没变时不重写文本框
+            if text == self._last_position_text:
+                return
+            self._last_position_text = text
+            self.position_text.delete('1.0', 'end')
+            self.position_text.insert('end', text)
+        self.root.after(0, _apply)
 
     def refresh_data(self):
         """刷新所有数据"""
         self.log("🔄 刷新数据...")
-        threading.Thread(target=self._refresh_data_thread, daemon=True).start()
+        self._submit_refresh()
+
+    def _submit_refresh(self):
+        """提交刷新任务，队列里已有待执行任务时不重复提交"""
+        if self._jobs.qsize() == 0:
+            self._jobs.put(self._refresh_data_thread)
+
+    def _worker(self):
+        """后台工作线程，依次执行队列中的任务"""
+        while True:
+            job = self._jobs.get()
+            try:
+                job()
+            except Exception:
+                pass
 
     def _refresh_data_thread(self):
-        """刷新数据线程"""
-        self.update_market_data()
-        self.update_account_data()
-        self.update_position_data()
+        """刷新数据线程（三个查询并发执行，耗时取决于最慢的一个）"""
+        futures = [self._fetch_pool.submit(fn) for fn in
+                   (self.update_market_data, self.update_account_data, self.update_position_data)]
+        for future in futures:
+            future.result()
 
     def start_auto_update(self):
-        """启动自动更新"""
-        def auto_update():
-            while True:
-                try:
-                    self._refresh_data_thread()
-                except:
-                    pass
-                time.sleep(5)
-
-        self.update_thread = threading.Thread(target=auto_update, daemon=True)
-        self.update_thread.start()
+        """启动自动更新（由Tk事件循环定时调度，不再常驻轮询线程）"""
+        self._last_refresh = 0.0
+        self._poll_enabled = True
+        self._tick()
+
+    def _tick(self):
+        """定时刷新：网络请求交给后台工作线程，5秒后再次调度"""
+        now = time.monotonic()
+        # 详情窗口打开时暂停刷新；窗口最小化时界面不可见，降为30秒刷新一次
+        if self._poll_enabled and (self.root.state() != 'iconic' or now - self._last_refresh >= 30):
+            self._last_refresh = now
+            self._submit_refresh()
+        self.root.after(5000, self._tick)
 
     def start_bot(self):
         """启动交易机器人"""
+        if self._bot_thread is not None and self._bot_stop.is_set():
+            messagebox.showwarning("警告", "机器人正在停止，请稍候再启动")
+            return
         if self.is_running:
             messagebox.showwarning("警告", "机器人已在运行中")
             return
 
+        log = self.log
         try:
-            self.log("🚀 正在启动交易机器人...")
-            self.log(f"📊 交易对: {self.symbol}")
-            self.log(f"🎯 策略: {self.available_strategies.get(self.strategy_type)}")
-
-            self.bot_process = subprocess.Popen(
-                ['python', 'main.py', '--mode', 'live'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
-            )
+            log("🚀 正在启动交易机器人...")
+            log(f"📊 交易对: {self.symbol}")
+            log(f"🎯 策略: {self.available_strategies.get(self.strategy_type)}")
+
+            if self.bot_in_process:
+                self._start_bot_thread()
+            else:
+                # 机器人放到独立的进程组中，停止时连同其派生的子进程一起结束
+                if os.name == 'nt':
+                    group_kwargs = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+                else:
+                    group_kwargs = {'start_new_session': True}
+                self.bot_process = subprocess.Popen(
+                    ['python', 'main.py', '--mode', 'live'],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    bufsize=0,
+                    **group_kwargs
+                )
 
             self.is_running = True
-            self.status_indicator.itemconfig(self.status_circle, fill=self.colors['success'])
-            self.status_label.config(text="系统运行中", fg=self.colors['success'])
-            self.start_button.set_enabled(False)
-            self.stop_button.set_enabled(True)
+            self._apply_state('online')
 
-            self.log("✓ 交易机器人已启动")
-            self.log("✓ WebSocket连接中...")
+            log("✓ 交易机器人已启动")
+            log("✓ WebSocket连接中...")
 
-            threading.Thread(target=self._monitor_bot_output, daemon=True).start()
+            if self.bot_process:
+                self._monitor_bot_output()
 
         except Exception as e:
-            self.log(f"✗ 启动失败: {e}")
+            log(f"✗ 启动失败: {e}")
             messagebox.showerror("错误", f"启动失败: {e}")
 
     def stop_bot(self):
@@ -886,46 +1051,211 @@ class TradingUI:
         if not self.is_running:
             return
 
+        proc = self.bot_process
         try:
             self.log("⏸ 正在停止交易机器人...")
-
-            if self.bot_process:
-                self.bot_process.terminate()
-                self.bot_process.wait(timeout=5)
-
-            self.is_running = False
-            self.status_indicator.itemconfig(self.status_circle, fill=self.colors['danger'])
-            self.status_label.config(text="系统离线", fg=self.colors['danger'])
-            self.start_button.set_enabled(True)
             self.stop_button.set_enabled(False)
 
-            self.log("✓ 交易机器人已停止")
+            if self._bot_thread:
+                # 机器人线程收尾（撤单、断开WebSocket）结束后再切换为离线状态
+                self._stop_bot_thread()
+                self.status_indicator.itemconfig(self.status_circle, fill=self.colors['warning'])
+                self.status_label.config(text="正在停止...", fg=self.colors['warning'])
+            elif proc:
+                # 等待子进程退出放到后台线程，避免界面卡住
+                self._signal_bot_group(proc, signal.SIGTERM)
+                threading.Thread(target=self._reap, args=(proc,), daemon=True).start()
+            else:
+                self._on_stopped()
 
         except Exception as e:
             self.log(f"✗ 停止失败: {e}")
 
+    def _apply_state(self, name):
+        """切换状态栏指示灯、文字和启停按钮"""
+        state = self._states[name]
+        running = state['running']
+        self.status_indicator.itemconfig(self.status_circle, fill=state['fill'])
+        self.status_label.config(text=state['text'], fg=state['fg'])
+        self.start_button.set_enabled(not running)
+        self.stop_button.set_enabled(running)
+
+    def _reap(self, proc):
+        """等待机器人进程退出，超时则强制结束，完成后回到主线程更新界面"""
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._signal_bot_group(proc, None)
+            proc.wait()
+        self.root.after(0, self._on_stopped)
+
+    def _signal_bot_group(self, proc, sig):
+        """向机器人进程组发送信号，sig为None时强制结束"""
+        try:
+            if os.name == 'nt':
+                if sig is None:
+                    proc.kill()
+                else:
+                    proc.send_signal(signal.CTRL_BREAK_EVENT)
+            else:
+                os.killpg(os.getpgid(proc.pid), signal.SIGKILL if sig is None else sig)
+        except (ProcessLookupError, PermissionError):
+            # 进程已经退出
+            pass
+
+    def _on_stopped(self):
+        """机器人已停止，更新界面状态"""
+        self.is_running = False
+        self.bot_process = None
+        self._close_output_poll()
+        self._apply_state('offline')
+
+        self.log("✓ 交易机器人已停止")
+
+    def _start_bot_thread(self):
+        """在后台线程中直接运行机器人，日志通过根logger处理器转发到日志面板"""
+        ui = self
+
+        class _UILogHandler(logging.Handler):
+            def emit(self, record):
+                try:
+                    ui._handle_bot_line(self.format(record))
+                except Exception:
+                    self.handleError(record)
+
+        handler = _UILogHandler()
+        handler.setFormatter(logging.Formatter('%(name)s - %(message)s'))
+        logging.getLogger().addHandler(handler)
+
+        stop = self._bot_stop = threading.Event()
+
+        def _run():
+            try:
+                # 延迟导入，只有启动机器人时才加载策略等模块
+                from main import TradingBot
+                bot = TradingBot()
+                self._bot = bot
+                if stop.is_set():
+                    return  # 初始化期间已被停止
+                # 停止通知走Event：run_live开始时会把is_running置为True，只设标志可能被覆盖
+                bot.run_live(stop_event=stop)
+            except Exception as e:
+                self.log(f"✗ 机器人运行异常: {e}")
+            finally:
+                logging.getLogger().removeHandler(handler)
+                self._bot = None
+                # 无论是主动停止还是run_live自行返回，都回到主线程切换为离线状态
+                self.root.after(0, self._on_bot_thread_exit, thread)
+
+        thread = threading.Thread(target=_run, name='trading-bot', daemon=True)
+        self._bot_thread = thread
+        thread.start()
+
+    def _stop_bot_thread(self):
+        """通知进程内机器人退出主循环，收尾（撤单、断开WebSocket）在机器人线程中完成"""
+        self._bot_stop.set()
+        bot = self._bot
+        if bot:
+            bot.is_running = False
+
+    def _on_bot_thread_exit(self, thread):
+        """机器人线程已退出（主线程）"""
+        if thread is not self._bot_thread:
+            return
+        thread.join()
+        self._bot_thread = None
+        self._on_stopped()
+
     def _monitor_bot_output(self):
-        """监控机器人输出"""
-        if not self.bot_process:
+        """监控机器人输出（stdout/stderr都要持续读空，否则管道写满后子进程会阻塞）"""
+        proc = self.bot_process
+        if not proc:
             return
 
-        for line in iter(self.bot_process.stderr.readline, ''):
-            if not self.is_running:
-                break
-            if line.strip():
-                if "检测到" in line or "开仓" in line or "平仓" in line or "触发" in line:
-                    self.log(f"📊 {line.strip()}")
+        if os.name == 'nt':
+            # Windows下select不支持管道，每个管道单独用一个线程读取（log只是入队，可在线程中调用）
+            def _drain(pipe):
+                for raw in iter(pipe.readline, b''):
+                    self._handle_bot_line(raw.decode('utf-8', errors='replace'))
+
+            for pipe in (proc.stdout, proc.stderr):
+                threading.Thread(target=_drain, args=(pipe,), daemon=True).start()
+            return
+
+        # POSIX下管道设为非阻塞，由Tk事件循环定时读取，不需要单独的监控线程
+        sel = selectors.DefaultSelector()
+        for pipe in (proc.stdout, proc.stderr):
+            os.set_blocking(pipe.fileno(), False)
+            # data: [增量解码器, 未凑成整行的残余文本]
+            sel.register(pipe, selectors.EVENT_READ, [codecs.getincrementaldecoder('utf-8')(errors='replace'), ''])
+        self._out_sel = sel
+        self._poll_output()
+
+    def _poll_output(self):
+        """每次唤醒对stdout/stderr做一次select，读出就绪管道中的输出，50ms后再次调度"""
+        self._poll_job = None
+        sel = self._out_sel
+        if sel is None:
+            return
+
+        for key, _ in sel.select(timeout=0):
+            try:
+                chunk = os.read(key.fd, 65536)
+            except BlockingIOError:
+                continue
+            if not chunk:
+                sel.unregister(key.fileobj)
+                self._handle_bot_line(key.data[1])
+                continue
+
+            decoder, pending = key.data
+            *lines, key.data[1] = (pending + decoder.decode(chunk)).split('\n')
+            for line in lines:
+                self._handle_bot_line(line)
+
+        if sel.get_map():
+            self._poll_job = self.root.after(50, self._poll_output)
+        else:
+            self._close_output_poll()
+
+    def _close_output_poll(self):
+        """停止读取机器人输出"""
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        if self._out_sel is not None:
+            self._out_sel.close()
+            self._out_sel = None
+
+    def _handle_bot_line(self, line):
+        """处理机器人输出的一行，只把交易相关的内容显示到日志面板"""
+        line = line.strip()
+        if line and TRADE_KEYWORDS_RE.search(line):
+            self.log(TRADE_LINE_PREFIX + line)
 
     def show_stats(self):
         """显示统计"""
         messagebox.showinfo("统计", "交易统计功能开发中...")
 
     def open_docs(self):
-        """打开文档"""
-        try:
-            os.startfile("README.md")
-        except:
+        """打开文档（在后台线程中调用系统默认程序，不阻塞界面）"""
+        openers = {
+            'win32': lambda path: os.startfile(path),
+            'darwin': lambda path: subprocess.Popen(['open', path]),
+            'linux': lambda path: subprocess.Popen(['xdg-open', path]),
+        }
+        opener = openers.get(sys.platform)
+
+        def _open():
+            try:
+                opener("README.md")
+            except Exception:
+                self.root.after(0, lambda: messagebox.showinfo("提示", "请查看项目目录中的 README.md 文件"))
+
+        if opener is None:
             messagebox.showinfo("提示", "请查看项目目录中的 README.md 文件")
+            return
+        threading.Thread(target=_open, daemon=True).start()
 
 
 def main():
@@ -5,12 +5,158 @@ OKX量化交易 - 完全增强版桌面UI
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
+import queue
+import collections
 import time
+import codecs
+import selectors
 import subprocess
 import os
+import sys
+import json
+import logging
+import re
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import numpy as np
+import yaml
 from okx_trading_bot.config import Config
-from okx_trading_bot.api import OKXClient
+from okx_trading_bot.api import OKXClient, OKXWebSocket
+
+# 优先使用libyaml的C实现，未编译libyaml时退回纯Python实现
+try:
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeDumper as YamlDumper
+
+# rapidfuzz为可选依赖，子串匹配不到时用它做模糊匹配
+try:
+    from rapidfuzz import process, fuzz
+except ImportError:
+    process = None
+
+# 行情缓存有效期（秒），连续输入搜索时复用同一份行情
+TICKER_CACHE_TTL = 5
+# 单价极低的币种，价格显示8位小数
+SMALL_PRICE_TOKENS = ('PEPE', 'SHIB', 'BONK', 'FLOKI')
+# 日志框最多保留的行数
+LOG_MAX_LINES = 5000
+# 搜索输入防抖间隔（毫秒），连续按键只在停顿后过滤一次
+SEARCH_DEBOUNCE_MS = 150
+# 币种列表磁盘缓存及有效期（秒）
+SYMBOLS_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.okxbot', 'symbols.json')
+SYMBOLS_CACHE_TTL = 24 * 3600
+# 交易页自适应轮询（毫秒）：数据变化时快速轮询，连续几轮无变化后逐步放慢到上限
+POLL_FAST_MS = 2000
+POLL_SLOW_MS = 15000
+POLL_TRADE_MS = 1000
+POLL_IDLE_ROUNDS = 3
+# 账户/持仓查询结果的复用时间（秒），连续刷新时合并为一次请求
+API_CACHE_TTL = 2
+# 关闭窗口时等待进程内机器人收尾（主循环休眠+撤单+断开连接）的最长时间（秒）
+BOT_STOP_TIMEOUT = 15
+
+# 设置高DPI支持，需在创建任何窗口之前调用
+if sys.platform == 'win32':
+    try:
+        from ctypes import windll
+        try:
+            windll.shcore.SetProcessDpiAwareness(1)
+        except (AttributeError, OSError):
+            # Windows 8.1以前的系统没有shcore
+            windll.user32.SetProcessDPIAware()
+    except Exception:
+        pass
+
+
+def _configure_styles(colors):
+    """统一配置ttk样式，在创建控件前调用一次"""
+    style = ttk.Style()
+    # 默认主题不支持自定义按钮背景色，改用clam主题
+    style.theme_use('clam')
+
+    # 标签页、表格、下拉框字体
+    style.configure('TNotebook.Tab', font=('Microsoft YaHei UI', 14, 'bold'), padding=[20, 10])
+    style.configure('Treeview', font=('Microsoft YaHei UI', 12), rowheight=30)
+    style.configure('Treeview.Heading', font=('Microsoft YaHei UI', 13, 'bold'))
+    style.configure('TCombobox', font=('Microsoft YaHei UI', 13))
+
+    # 按钮样式：名称 -> (背景色, 悬停色)
+    button_styles = {
+        'Accent.TButton': (colors['accent_blue'], '#0a3d62'),
+        'Purple.TButton': (colors['accent_purple'], '#341f97'),
+        'Success.TButton': (colors['success'], '#27ae60'),
+        'Danger.TButton': (colors['danger'], '#c0392b'),
+        'Warning.TButton': (colors['warning'], '#d35400'),
+        'Teal.TButton': ('#16a085', '#138d75'),
+        'Violet.TButton': ('#8e44ad', '#6c3483'),
+    }
+    for name, (bg_color, hover_color) in button_styles.items():
+        style.configure(name, font=('Microsoft YaHei UI', 13, 'bold'), foreground='white',
+                        background=bg_color, borderwidth=0, focusthickness=0, padding=(24, 12))
+        style.map(name,
+                  background=[('disabled', '#555555'), ('pressed', '#ffffff'), ('active', hover_color)],
+                  foreground=[('disabled', '#888888'), ('pressed', bg_color)])
+
+
+@functools.lru_cache(maxsize=32)
+def _token_pattern(tokens):
+    """多个搜索词编译为一个正则，要求每个词都出现（顺序不限）"""
+    return re.compile("".join(f"(?=.*{re.escape(t)})" for t in tokens), re.IGNORECASE)
+
+
+def match_symbols(search_term, symbols, symbols_upper=None, limit=30):
+    """
+    币种搜索：先做子串匹配，没有命中时再用rapidfuzz模糊匹配
+
+    Args:
+        search_term: 大写的搜索词，可用空格分隔多个词
+        symbols: 币种列表
+        symbols_upper: 与symbols一一对应的大写列表，不传则认为symbols已是大写
+        limit: 模糊匹配最多返回的数量
+
+    Returns:
+        匹配到的币种列表
+    """
+    upper = symbols if symbols_upper is None else symbols_upper
+    tokens = search_term.split()
+    if len(tokens) > 1:
+        search = _token_pattern(tuple(tokens)).search
+        matched = [s for up, s in zip(upper, symbols) if search(up)]
+    else:
+        search_term = search_term.strip()
+        matched = [s for up, s in zip(upper, symbols) if search_term in up]
+    if matched or process is None:
+        return matched
+
+    results = process.extract(search_term, upper, scorer=fuzz.WRatio, score_cutoff=60, limit=limit)
+    return [symbols[index] for _, _, index in results]
+
+
+def update_listbox_diff(listbox, old, new):
+    """
+    增量更新列表框：保留与旧列表相同的前缀，只删除和插入之后变化的部分
+
+    Args:
+        listbox: 列表框控件
+        old: 当前显示的列表
+        new: 需要显示的列表
+
+    Returns:
+        新的显示列表
+    """
+    first_diff = 0
+    for a, b in zip(old, new):
+        if a != b:
+            break
+        first_diff += 1
+
+    if first_diff < len(old):
+        listbox.delete(first_diff, 'end')
+    if first_diff < len(new):
+        listbox.insert('end', *new[first_diff:])
+    return list(new)
 
 
 class SearchableCombobox(ttk.Frame):
@@ -19,6 +165,9 @@ class SearchableCombobox(ttk.Frame):
         super().__init__(parent)
         self.values = values
         self.filtered_values = values.copy()
+        self._values_upper = [v.upper() for v in values]  # 预先转大写，过滤时不再逐个转换
+        self._last_filtered = []  # 列表框当前显示的内容
+        self._filter_job = None
 
         # 搜索框
         self.search_var = tk.StringVar()
@@ -36,19 +185,25 @@ class SearchableCombobox(ttk.Frame):
         self.update_listbox()
 
     def filter_values(self, *args):
-        """模糊搜索过滤"""
+        """模糊搜索过滤（防抖，输入停顿后才执行）"""
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(SEARCH_DEBOUNCE_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        """执行过滤"""
+        self._filter_job = None
         search_term = self.search_var.get().upper()
         if not search_term:
             self.filtered_values = self.values.copy()
         else:
-            self.filtered_values = [v for v in self.values if search_term in v.upper()]
+            self.filtered_values = match_symbols(search_term, self.values, self._values_upper, limit=50)
         self.update_listbox()
 
     def update_listbox(self):
         """更新列表显示"""
-        self.listbox.delete(0, tk.END)
-        for value in self.filtered_values[:50]:  # 最多显示50个
-            self.listbox.insert(tk.END, value)
+        # 最多显示50个
+        self._last_filtered = update_listbox_diff(self.listbox, self._last_filtered, self.filtered_values[:50])
 
     def on_select(self, event):
         """选择项目"""
@@ -66,70 +221,164 @@ class SearchableCombobox(ttk.Frame):
         self.search_var.set(value)
 
 
-class ModernButton(tk.Canvas):
-    """现代化按钮控件"""
-    def __init__(self, parent, text, command, bg_color, hover_color, width=180, height=50):
-        super().__init__(parent, width=width, height=height, highlightthickness=0, bg=parent['bg'])
-        self.text = text
-        self.command = command
-        self.bg_color = bg_color
-        self.hover_color = hover_color
-        self.enabled = True
-
-        self.rect = self.create_rounded_rect(5, 5, width-5, height-5, radius=15, fill=bg_color)
-        self.text_id = self.create_text(width/2, height/2, text=text, fill='white',
-                                        font=('Microsoft YaHei UI', 13, 'bold'))  # 增大按钮字体
-
-        self.bind('<Enter>', self.on_enter)
-        self.bind('<Leave>', self.on_leave)
-        self.bind('<Button-1>', self.on_click)
-
-    def create_rounded_rect(self, x1, y1, x2, y2, radius=25, **kwargs):
-        points = [x1+radius, y1, x1+radius, y1, x2-radius, y1, x2-radius, y1,
-                  x2, y1, x2, y1+radius, x2, y1+radius, x2, y2-radius,
-                  x2, y2-radius, x2, y2, x2-radius, y2, x2-radius, y2,
-                  x1+radius, y2, x1+radius, y2, x1, y2, x1, y2-radius,
-                  x1, y2-radius, x1, y1+radius, x1, y1+radius, x1, y1]
-        return self.create_polygon(points, **kwargs, smooth=True)
-
-    def on_enter(self, event):
-        if self.enabled:
-            self.itemconfig(self.rect, fill=self.hover_color)
-            self.config(cursor='hand2')
-
-    def on_leave(self, event):
-        if self.enabled:
-            self.itemconfig(self.rect, fill=self.bg_color)
-
-    def on_click(self, event):
-        if self.enabled and self.command:
-            self.itemconfig(self.rect, fill='#ffffff')
-            self.after(100, lambda: self.itemconfig(self.rect, fill=self.hover_color))
-            self.after(200, self.command)
-
+class ModernButton(ttk.Button):
+    """ttk样式按钮（原生主题绘制，比Canvas自绘按钮轻量），保留set_enabled接口"""
     def set_enabled(self, enabled):
-        self.enabled = enabled
-        if enabled:
-            self.itemconfig(self.rect, fill=self.bg_color)
-            self.itemconfig(self.text_id, fill='white')
-        else:
-            self.itemconfig(self.rect, fill='#555555')
-            self.itemconfig(self.text_id, fill='#888888')
+        self.state(['!disabled'] if enabled else ['disabled'])
+
+
+class VirtualRankCanvas(tk.Canvas):
+    """
+    虚拟滚动的排行榜
+
+    只为可见的行创建文本项，滚动和刷新时用itemconfig改写文本，
+    绘制开销与总行数无关。行内容由formatter按需格式化，只格式化可见的行。
+    """
+    def __init__(self, parent, columns, colors, row_height=30, on_activate=None, **kwargs):
+        """
+        Args:
+            parent: 父控件
+            columns: 列定义 [(标题, 宽度, 对齐方式)]，对齐方式为 'center'/'e'/'w'
+            colors: 配色 {'bg', 'header_bg', 'text', 'up', 'down', 'select'}
+            row_height: 行高
+            on_activate: 双击行时的回调，参数为行号
+        """
+        super().__init__(parent, highlightthickness=0, bg=colors['bg'], **kwargs)
+        self.colors = colors
+        self.row_height = row_height
+        self.header_height = row_height + 6
+        self.on_activate = on_activate
+        self.yscrollcommand = None
+
+        self.rows = []
+        self.formatter = None
+        self.top_index = 0
+        self.selected = None
+        self.visible_rows = 0
+        self._row_items = []  # 每个可见行: (背景矩形, [各列文本])
+
+        # 各列文本的x坐标和锚点
+        self._text_pos = []
+        x = 0
+        for _, width, anchor in columns:
+            if anchor == 'e':
+                self._text_pos.append((x + width - 12, 'e'))
+            elif anchor == 'w':
+                self._text_pos.append((x + 12, 'w'))
+            else:
+                self._text_pos.append((x + width / 2, 'center'))
+            x += width
+        self.configure(width=x)
+
+        # 表头
+        self.create_rectangle(0, 0, 4000, self.header_height, fill=colors['header_bg'], outline='')
+        for (title, _, _), (tx, anchor) in zip(columns, self._text_pos):
+            self.create_text(tx, self.header_height / 2, text=title, anchor=anchor, fill=colors['text'],
+                             font=('Microsoft YaHei UI', 13, 'bold'))
+
+        self.bind('<Configure>', self._on_configure)
+        self.bind('<MouseWheel>', self._on_mousewheel)
+        self.bind('<Button-4>', lambda e: self.set_top_index(self.top_index - 3))
+        self.bind('<Button-5>', lambda e: self.set_top_index(self.top_index + 3))
+        self.bind('<Button-1>', self._on_click)
+        self.bind('<Double-1>', self._on_double_click)
+
+    def set_rows(self, rows, formatter):
+        """
+        设置全部行数据
+
+        Args:
+            rows: 行数据列表（已排序）
+            formatter: formatter(行号, 行数据) -> (各列文本, 'up'/'down')
+        """
+        self.rows = rows
+        self.formatter = formatter
+        self.selected = None
+        self.set_top_index(self.top_index)
+
+    def set_top_index(self, index):
+        """滚动到指定行（作为第一行显示）"""
+        full_rows = max(1, (self.winfo_height() - self.header_height) // self.row_height)
+        max_top = max(0, len(self.rows) - full_rows)
+        self.top_index = min(max(0, index), max_top)
+        self._redraw()
+
+    def yview(self, *args):
+        """滚动条回调"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.set_top_index(int(float(args[1]) * len(self.rows)))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (max(1, self.visible_rows - 1) if args[2] == 'pages' else 1)
+            self.set_top_index(self.top_index + step)
+
+    def _on_configure(self, event):
+        """窗口大小变化时按需补充可见行的文本项"""
+        self.visible_rows = max(0, (event.height - self.header_height) // self.row_height + 1)
+        while len(self._row_items) < self.visible_rows:
+            y1 = self.header_height + len(self._row_items) * self.row_height
+            rect = self.create_rectangle(0, y1, 4000, y1 + self.row_height, fill=self.colors['bg'],
+                                         outline='', state='hidden')
+            texts = [self.create_text(tx, y1 + self.row_height / 2, anchor=anchor, state='hidden',
+                                      font=('Microsoft YaHei UI', 12))
+                     for tx, anchor in self._text_pos]
+            self._row_items.append((rect, texts))
+        self.set_top_index(self.top_index)
+
+    def _redraw(self):
+        """改写可见行的文本"""
+        rows = self.rows
+        colors = self.colors
+        for slot, (rect, texts) in enumerate(self._row_items):
+            index = self.top_index + slot
+            if slot < self.visible_rows and index < len(rows):
+                values, tag = self.formatter(index, rows[index])
+                fill = colors['up'] if tag == 'up' else colors['down']
+                for item, value in zip(texts, values):
+                    self.itemconfig(item, text=value, fill=fill, state='normal')
+                self.itemconfig(rect, state='normal',
+                                fill=colors['select'] if index == self.selected else colors['bg'])
+            else:
+                self.itemconfig(rect, state='hidden')
+                for item in texts:
+                    self.itemconfig(item, state='hidden')
+
+        if self.yscrollcommand:
+            total = len(rows) or 1
+            self.yscrollcommand(self.top_index / total, min(1.0, (self.top_index + self.visible_rows) / total))
+
+    def _row_at(self, y):
+        """坐标对应的行号，不在数据行上返回None"""
+        if y < self.header_height:
+            return None
+        index = self.top_index + int((y - self.header_height) // self.row_height)
+        return index if index < len(self.rows) else None
+
+    def _on_mousewheel(self, event):
+        self.set_top_index(self.top_index + (-3 if event.delta > 0 else 3))
+
+    def _on_click(self, event):
+        self.selected = self._row_at(event.y)
+        self._redraw()
+
+    def _on_double_click(self, event):
+        index = self._row_at(event.y)
+        if index is not None and self.on_activate:
+            self.selected = index
+            self._redraw()
+            self.on_activate(index)
 
 
 class TradingUI:
+    # 交易相关日志的关键词，合并成一个正则一次扫描
+    _TRADE_RE = re.compile(r'检测到|开仓|平仓|触发')
+
     def __init__(self, root):
         self.root = root
         self.root.title("OKX 量化交易系统 v3.0 - 完全增强版")
         self.root.geometry("1920x1080")  # 增大窗口以容纳更大字体
 
-        # 设置高DPI支持
-        try:
-            from ctypes import windll
-            windll.shcore.SetProcessDpiAwareness(1)
-        except:
-            pass
-
         # 配色方案
         self.colors = {
             'bg_dark': '#0f0f1e',
@@ -147,9 +396,12 @@ class TradingUI:
         }
 
         self.root.configure(bg=self.colors['bg_dark'])
+        _configure_styles(self.colors)
 
         # 加载配置
         self.config = Config()
+        # Config已解析过config.yaml，保存时直接修改这份数据写回，不再重新读取解析
+        self._config_cache = self.config.config
         okx_config = self.config.get_okx_config()
 
         self.api_client = OKXClient(
@@ -160,11 +412,22 @@ class TradingUI:
             proxy=okx_config.get('proxy')
         )
 
-        # 获取所有可交易币种
-        self.all_symbols = []
-        self.load_all_symbols()
+        # 后台线程通过该队列把界面更新交给主线程执行（Tk不是线程安全的）
+        self._ui_queue = queue.Queue()
+
+        # 日志先进入环形缓冲，由主线程定时批量写入日志框
+        self._log_buffer = collections.deque(maxlen=2000)
+
+        # 防抖任务 key -> after id
+        self._debounce_ids = {}
 
-        # 主流币种TOP10
+        # 行情缓存
+        self._ticker_cache = {'ts': 0, 'data': None}
+
+        # 后台网络请求共用的线程池（行情、个人信息、账户持仓、币种列表、私有频道连接）
+        self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ui-io')
+
+        # 主流币种TOP10（加载币种失败时的默认列表）
         self.top_symbols = [
             'BTC-USDT-SWAP', 'ETH-USDT-SWAP', 'SOL-USDT-SWAP',
             'BNB-USDT-SWAP', 'XRP-USDT-SWAP', 'ADA-USDT-SWAP',
@@ -172,6 +435,10 @@ class TradingUI:
             'SHIB-USDT-SWAP'
         ]
 
+        # 获取所有可交易币种
+        self.all_symbols = []
+        self.load_all_symbols()
+
         # 策略列表
         self.available_strategies = {
             'smart': '智能策略 (推荐)',
@@ -180,27 +447,141 @@ class TradingUI:
             'position': '仓位策略 (简单)',
             'grid': '网格策略 (震荡)'
         }
+        # 显示名 -> 策略代码，下拉框切换时直接查表
+        self._strategy_name_to_code = {v: k for k, v in self.available_strategies.items()}
 
         self.symbol = self.config.get('trading.symbol', 'BTC-USDT-SWAP')
         self.strategy_type = self.config.get('trading.strategy_type', 'smart')
         self.bot_process = None
         self.is_running = False
+        # 默认在UI进程内的线程中运行机器人；需要进程隔离时配置 ui.bot_in_process: false
+        self.bot_in_process = self.config.get('ui.bot_in_process', True)
+        self._bot = None
+        self._bot_thread = None  # 机器人线程退出后才清空
+        self._bot_stop = threading.Event()  # 本次运行是否已请求停止
+        self._out_sel = None  # 子进程输出管道的selector
+        self._poll_job = None
         self.market_data_cache = {}  # 缓存市场数据
 
+        # 账户和持仓走私有频道推送，连接成功后交易页不再轮询REST
+        self._ws = None
+        self._ws_positions = {}  # 持仓推送缓存 (instId, posSide) -> 持仓
+        self._ws_lock = threading.Lock()
+        self._account_snapshot = None  # 上次显示的账户数据，未变化时不更新界面
+        self._pos_snapshot = None  # 上次显示的持仓文本
+        self._profile_text = None  # 个人信息页上次显示的持仓文本
+        self._profile_opts = {}  # 个人信息页各标签上次设置的内容
+
+        # 账户和持仓并发请求，两个请求的网络耗时重叠
+        self._refresh_futures = []
+        self._api_cache = {}  # (方法名, 参数) -> (结果, 过期时间)
+        self._api_cache_lock = threading.Lock()
+
+        # 交易页自适应轮询状态
+        self._auto_job = None
+        self._poll_interval = POLL_FAST_MS
+        self._unchanged_count = 0
+        self._state_changed = False  # 上次轮询后账户或持仓显示是否有变化
+        self._stop = threading.Event()  # 窗口关闭后置位，定时刷新不再继续
+
         self.setup_ui()
+        self.root.protocol('WM_DELETE_WINDOW', self._shutdown)
+        self._drain_ui_queue()
+        self._drain_log()
         self.start_auto_update()
+        self._io_pool.submit(self._start_private_ws)
+
+    @property
+    def symbol(self):
+        """当前交易对"""
+        return self._symbol
+
+    @symbol.setter
+    def symbol(self, value):
+        self._symbol = value
+        # 价格显示精度在切换交易对时确定一次，刷新持仓时不再逐行判断
+        small = any(tok in value for tok in SMALL_PRICE_TOKENS)
+        self._price_fmt = "${:.8f}".format if small else "${:.4f}".format
+
+    def _ui(self, fn):
+        """在主线程中执行界面更新（可在任意线程调用）"""
+        self._ui_queue.put(fn)
+
+    def _drain_ui_queue(self):
+        """主线程定时执行后台线程提交的界面更新"""
+        try:
+            while True:
+                fn = self._ui_queue.get_nowait()
+                try:
+                    fn()
+                except Exception as e:
+                    self.log(f"[ERROR] 界面更新失败: {e}")
+        except queue.Empty:
+            pass
+        self.root.after(50, self._drain_ui_queue)
 
     def load_all_symbols(self):
-        """加载所有可交易币种"""
+        """加载所有可交易币种：有磁盘缓存时直接使用并在后台刷新，否则同步从交易所获取"""
+        symbols = self._load_symbols_cached()
+        if symbols:
+            self._io_pool.submit(self._refresh_symbols_async)
+        else:
+            # 如果加载失败，使用默认列表
+            symbols = self._fetch_symbols() or self.top_symbols.copy()
+        self._set_symbols(symbols)
+
+    def _set_symbols(self, symbols):
+        """设置币种列表及其索引"""
+        self.all_symbols = symbols
+        # 大写索引与all_symbols一一对应，搜索时直接匹配
+        self._all_symbols_upper = [s.upper() for s in symbols]
+        self._small_price_symbols = {s for s in symbols
+                                     if any(tok in s for tok in SMALL_PRICE_TOKENS)}
+        # 校验币种是否可交易用集合查找
+        self._all_symbols_set = set(symbols)
+
+    def _load_symbols_cached(self):
+        """读取24小时内的币种列表磁盘缓存，没有则返回None"""
+        try:
+            if time.time() - os.path.getmtime(SYMBOLS_CACHE_FILE) >= SYMBOLS_CACHE_TTL:
+                return None
+            with open(SYMBOLS_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f) or None
+        except Exception:
+            return None
+
+    def _fetch_symbols(self):
+        """从交易所获取币种列表并写入磁盘缓存，失败返回None"""
         try:
             result = self.api_client.get_instruments('SWAP')
-            if result['code'] == '0':
-                self.all_symbols = [inst['instId'] for inst in result['data']
-                                   if inst['instId'].endswith('-USDT-SWAP')]
-                self.all_symbols.sort()
-        except:
-            # 如果加载失败，使用默认列表
-            self.all_symbols = self.top_symbols.copy()
+            if result['code'] != '0':
+                return None
+            symbols = sorted(inst['instId'] for inst in result['data']
+                             if inst['instId'].endswith('-USDT-SWAP'))
+        except Exception:
+            return None
+
+        try:
+            os.makedirs(os.path.dirname(SYMBOLS_CACHE_FILE), exist_ok=True)
+
+            # 先写临时文件再替换，避免中途崩溃留下损坏的文件
+            tmp_file = SYMBOLS_CACHE_FILE + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(symbols, f)
+            os.replace(tmp_file, SYMBOLS_CACHE_FILE)
+        except Exception:
+            pass
+        return symbols
+
+    def _refresh_symbols_async(self):
+        """后台刷新币种列表，有变化时交给主线程更新"""
+        symbols = self._fetch_symbols()
+        if symbols and symbols != self.all_symbols:
+            def _apply():
+                self._set_symbols(symbols)
+                self.update_symbol_listbox(self.symbol_search_var.get().upper())
+
+            self._ui(_apply)
 
     def setup_ui(self):
         """设置UI界面"""
@@ -231,12 +612,13 @@ class TradingUI:
         self.status_label.pack(side='left')
 
         # 主容器 - 使用Notebook标签页
-        # 配置标签页字体大小
-        style = ttk.Style()
-        style.configure('TNotebook.Tab', font=('Microsoft YaHei UI', 14, 'bold'), padding=[20, 10])
-
         main_notebook = ttk.Notebook(self.root)
         main_notebook.pack(fill='both', expand=True, padx=15, pady=15)
+        self.main_notebook = main_notebook
+
+        # 记录当前标签页，自动刷新只刷新可见的页面
+        self._active_tab = 0
+        main_notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
 
         # 标签页1：交易主界面
         trading_tab = tk.Frame(main_notebook, bg=self.colors['bg_dark'])
@@ -294,8 +676,8 @@ class TradingUI:
                                font=('Microsoft YaHei UI', 16), width=25)
         search_entry.pack(side='left', padx=15, pady=30)
 
-        ModernButton(search_frame, "刷新", self.refresh_market_data,
-                    self.colors['accent_blue'], '#0a3d62', width=140, height=50).pack(side='left', padx=15)
+        ModernButton(search_frame, text="刷新", command=self.force_refresh_market_data,
+                     style='Accent.TButton').pack(side='left', padx=15)
 
         # 涨跌排行榜
         rank_frame = tk.Frame(container, bg=self.colors['bg_medium'])
@@ -304,40 +686,26 @@ class TradingUI:
         tk.Label(rank_frame, text="涨跌排行榜 (24小时)", font=('Microsoft YaHei UI', 20, 'bold'),
                 bg=self.colors['bg_medium'], fg=self.colors['text_white']).pack(pady=20)
 
-        # 创建表格 - 增大列宽和高度
-        columns = ('排名', '币种', '当前价格', '24h涨跌', '24h成交量', '操作')
-
-        # 配置表格字体
-        style = ttk.Style()
-        style.configure('Treeview', font=('Microsoft YaHei UI', 12), rowheight=30)
-        style.configure('Treeview.Heading', font=('Microsoft YaHei UI', 13, 'bold'))
-
-        self.market_tree = ttk.Treeview(rank_frame, columns=columns, show='headings', height=18)
-
-        for col in columns:
-            self.market_tree.heading(col, text=col)
-            if col == '币种':
-                self.market_tree.column(col, width=180, anchor='center')
-            elif col == '当前价格':
-                self.market_tree.column(col, width=180, anchor='e')
-            elif col == '24h涨跌':
-                self.market_tree.column(col, width=140, anchor='center')
-            elif col == '24h成交量':
-                self.market_tree.column(col, width=180, anchor='e')
-            elif col == '排名':
-                self.market_tree.column(col, width=100, anchor='center')
-            else:
-                self.market_tree.column(col, width=120, anchor='center')
+        # 创建排行榜 - 只绘制可见行
+        columns = [('排名', 100, 'center'), ('币种', 180, 'center'), ('当前价格', 180, 'e'),
+                   ('24h涨跌', 140, 'center'), ('24h成交量', 180, 'e'), ('操作', 120, 'center')]
+        rank_colors = {
+            'bg': self.colors['bg_light'],
+            'header_bg': self.colors['bg_medium'],
+            'text': self.colors['text_white'],
+            'up': '#2ecc71',
+            'down': '#e74c3c',
+            'select': self.colors['accent_blue'],
+        }
+        self.market_view = VirtualRankCanvas(rank_frame, columns, rank_colors, row_height=30,
+                                             on_activate=self.on_market_select)
 
-        scrollbar = ttk.Scrollbar(rank_frame, orient='vertical', command=self.market_tree.yview)
-        self.market_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(rank_frame, orient='vertical', command=self.market_view.yview)
+        self.market_view.yscrollcommand = scrollbar.set
 
-        self.market_tree.pack(side='left', fill='both', expand=True, padx=25, pady=(0, 25))
+        self.market_view.pack(side='left', fill='both', expand=True, padx=25, pady=(0, 25))
         scrollbar.pack(side='right', fill='y', pady=(0, 25))
 
-        # 双击选择币种
-        self.market_tree.bind('<Double-1>', self.on_market_select)
-
         # 自动加载市场数据
         self.root.after(500, self.refresh_market_data)
 
@@ -394,12 +762,12 @@ class TradingUI:
         self.profile_positions = scrolledtext.ScrolledText(right_info, bg=self.colors['bg_light'],
                                                            fg=self.colors['text_white'],
                                                            font=('Consolas', 14), relief='flat',
-                                                           padx=20, pady=15)
+                                                           padx=20, pady=15, state='disabled')
         self.profile_positions.pack(fill='both', expand=True)
 
         # 刷新按钮 - 增大尺寸
-        ModernButton(container, "刷新个人信息", self.refresh_profile_data,
-                    self.colors['accent_purple'], '#341f97', width=240, height=60).pack(pady=25)
+        ModernButton(container, text="刷新个人信息", command=self.refresh_profile_data,
+                     style='Purple.TButton').pack(pady=25)
 
     def create_trading_config_card(self, parent):
         """创建交易配置卡片"""
@@ -423,6 +791,7 @@ class TradingUI:
         symbol_entry.pack(side='left')
 
         # 币种下拉列表 - 减少高度避免遮挡
+        self._last_symbol_filtered = []
         self.symbol_listbox = tk.Listbox(content, height=3, font=('Consolas', 13))
         self.symbol_listbox.pack(fill='x', pady=8)
         self.symbol_listbox.bind('<<ListboxSelect>>', self.on_symbol_list_select)
@@ -438,10 +807,6 @@ class TradingUI:
 
         self.strategy_var = tk.StringVar(value=self.available_strategies.get(self.strategy_type))
 
-        # 配置Combobox字体
-        style = ttk.Style()
-        style.configure('TCombobox', font=('Microsoft YaHei UI', 13))
-
         strategy_combo = ttk.Combobox(strategy_frame, textvariable=self.strategy_var,
                                      values=list(self.available_strategies.values()),
                                      state='readonly', font=('Microsoft YaHei UI', 13), width=16)
@@ -449,8 +814,8 @@ class TradingUI:
         strategy_combo.bind('<<ComboboxSelected>>', self.on_strategy_changed)
 
         # 保存配置按钮 - 增大尺寸
-        ModernButton(content, "保存配置", self.save_config,
-                    self.colors['accent_blue'], '#0a3d62', width=180, height=45).pack(pady=15)
+        ModernButton(content, text="保存配置", command=self.save_config,
+                     style='Accent.TButton').pack(pady=15)
 
     def create_account_card(self, parent):
         """创建账户信息卡片"""
@@ -499,8 +864,9 @@ class TradingUI:
         self.margin_label.pack(side='right')
 
         # 详情按钮 - 增大尺寸
-        ModernButton(content, "详细信息", lambda: self.root.after(0, lambda: self.root.nametowidget('.').focus()),
-                    self.colors['accent_purple'], '#341f97', width=180, height=42).pack(pady=8)
+        ModernButton(content, text="详细信息",
+                     command=lambda: self.root.after(0, lambda: self.root.nametowidget('.').focus()),
+                     style='Purple.TButton').pack(pady=8)
 
     def create_position_card(self, parent):
         """创建持仓信息卡片"""
@@ -526,30 +892,30 @@ class TradingUI:
         row1 = tk.Frame(btn_container, bg=self.colors['bg_medium'])
         row1.pack(fill='x', pady=8)
 
-        self.start_button = ModernButton(row1, "启动交易", self.start_bot,
-                                         self.colors['success'], '#27ae60', width=220, height=55)
+        self.start_button = ModernButton(row1, text="启动交易", command=self.start_bot,
+                                         style='Success.TButton')
         self.start_button.pack(side='left', padx=8)
 
-        self.stop_button = ModernButton(row1, "停止交易", self.stop_bot,
-                                        self.colors['danger'], '#c0392b', width=220, height=55)
+        self.stop_button = ModernButton(row1, text="停止交易", command=self.stop_bot,
+                                        style='Danger.TButton')
         self.stop_button.pack(side='left', padx=8)
         self.stop_button.set_enabled(False)
 
-        ModernButton(row1, "刷新", self.refresh_data,
-                    self.colors['accent_blue'], '#0a3d62', width=160, height=55).pack(side='left', padx=8)
+        ModernButton(row1, text="刷新", command=self.refresh_data,
+                     style='Accent.TButton').pack(side='left', padx=8)
 
         # 第二行 - 增大按钮尺寸
         row2 = tk.Frame(btn_container, bg=self.colors['bg_medium'])
         row2.pack(fill='x', pady=8)
 
-        ModernButton(row2, "一键平仓", self.emergency_close,
-                    self.colors['warning'], '#d35400', width=200, height=50).pack(side='left', padx=8)
+        ModernButton(row2, text="一键平仓", command=self.emergency_close,
+                     style='Warning.TButton').pack(side='left', padx=8)
 
-        ModernButton(row2, "市场", lambda: self.select_tab(1),
-                    '#16a085', '#138d75', width=160, height=50).pack(side='left', padx=8)
+        ModernButton(row2, text="市场", command=lambda: self.select_tab(1),
+                     style='Teal.TButton').pack(side='left', padx=8)
 
-        ModernButton(row2, "个人", lambda: self.select_tab(2),
-                    '#8e44ad', '#6c3483', width=160, height=50).pack(side='left', padx=8)
+        ModernButton(row2, text="个人", command=lambda: self.select_tab(2),
+                     style='Violet.TButton').pack(side='left', padx=8)
 
     def create_log_panel(self, parent):
         """创建日志面板"""
@@ -586,140 +952,175 @@ class TradingUI:
 
     def select_tab(self, index):
         """切换标签页"""
-        notebook = self.root.children['!notebook']
-        notebook.select(index)
+        self.main_notebook.select(index)
+
+    def _on_tab_changed(self, event):
+        """标签页切换"""
+        self._active_tab = self.main_notebook.index('current')
+
+    def _debounce(self, key, ms, fn):
+        """防抖：ms毫秒内重复调用只执行最后一次"""
+        job = self._debounce_ids.get(key)
+        if job is not None:
+            self.root.after_cancel(job)
+
+        def _run():
+            self._debounce_ids.pop(key, None)
+            fn()
+
+        self._debounce_ids[key] = self.root.after(ms, _run)
 
     def filter_symbol_list(self, *args):
         """过滤币种列表（模糊搜索）"""
-        search_term = self.symbol_search_var.get().upper()
-        self.update_symbol_listbox(search_term)
+        self._debounce('symbol', SEARCH_DEBOUNCE_MS,
+                       lambda: self.update_symbol_listbox(self.symbol_search_var.get().upper()))
 
     def update_symbol_listbox(self, filter_text=''):
         """更新币种列表"""
-        self.symbol_listbox.delete(0, tk.END)
-
         if filter_text:
-            filtered = [s for s in self.all_symbols if filter_text in s.upper()]
+            filtered = match_symbols(filter_text, self.all_symbols, self._all_symbols_upper)
         else:
             filtered = self.all_symbols[:50]  # 默认显示前50个
 
-        for symbol in filtered[:30]:  # 最多显示30个
-            self.symbol_listbox.insert(tk.END, symbol)
+        # 最多显示30个
+        self._last_symbol_filtered = update_listbox_diff(self.symbol_listbox, self._last_symbol_filtered,
+                                                         filtered[:30])
 
     def on_symbol_list_select(self, event):
         """选择币种"""
         selection = self.symbol_listbox.curselection()
         if selection:
             symbol = self.symbol_listbox.get(selection[0])
+            if symbol not in self._all_symbols_set:
+                self.log(f"[WARN] 不可交易的币种: {symbol}")
+                return
             self.symbol_search_var.set(symbol)
             self.symbol = symbol
             self.log(f"[INFO] 选择币种: {symbol}")
 
     def filter_market_list(self, *args):
         """过滤市场列表"""
-        search_term = self.market_search_var.get().upper()
-        self.refresh_market_data(search_term)
-
-    def refresh_market_data(self, filter_text=''):
-        """刷新市场数据"""
+        self._debounce('market', SEARCH_DEBOUNCE_MS,
+                       lambda: self.refresh_market_data(self.market_search_var.get().upper()))
+
+    def force_refresh_market_data(self):
+        """忽略行情缓存，强制刷新市场数据"""
+        self._ticker_cache['ts'] = 0
+        self.refresh_market_data(self.market_search_var.get().upper())
+
+    def _get_swap_tickers(self):
+        """获取永续合约行情，5秒内复用缓存"""
+        cache = self._ticker_cache
+        if cache['data'] is not None and time.time() - cache['ts'] < TICKER_CACHE_TTL:
+            return cache['data']
+
+        # 一次请求获取全部永续合约行情，不再逐个币种请求
+        tickers = self.api_client.get_tickers('SWAP')
+        if tickers['code'] != '0':
+            raise Exception(tickers.get('msg', 'Unknown error'))
+
+        self._ticker_cache = {'ts': time.time(), 'data': tickers}
+        return tickers
+
+    def refresh_market_data(self, filter_text='', quiet=False):
+        """刷新市场数据（quiet为True时不输出日志，用于自动刷新）"""
         def _refresh():
             try:
-                self.market_tree.delete(*self.market_tree.get_children())
-
-                # 获取所有币种行情
-                symbols_to_show = self.all_symbols if not filter_text else \
-                                 [s for s in self.all_symbols if filter_text in s.upper()]
-
-                market_data = []
-                for symbol in symbols_to_show[:100]:  # 最多100个
+                tickers = self._get_swap_tickers()
+
+                # 先解析出数值列，涨跌幅和排序用numpy整体计算，只对展示的行做格式化
+                symbols = []
+                values = []
+                for data in tickers['data']:
+                    symbol = data['instId']
+                    if not symbol.endswith('-USDT-SWAP'):
+                        continue
                     try:
-                        ticker = self.api_client.get_ticker(symbol)
-                        if ticker['code'] == '0' and ticker['data']:
-                            data = ticker['data'][0]
-                            price = float(data['last'])
-                            high = float(data['high24h'])
-                            low = float(data['low24h'])
-
-                            change_pct = ((price - low) / low * 100) if low > 0 else 0
-                            vol = float(data.get('volCcy24h', 0))
-
-                            market_data.append({
-                                'symbol': symbol,
-                                'price': price,
-                                'change': change_pct,
-                                'volume': vol
-                            })
-                    except:
+                        values.append((float(data['last']), float(data['low24h']),
+                                       float(data.get('volCcy24h') or 0)))
+                    except (KeyError, ValueError):
                         continue
-
-                # 按涨跌幅排序
-                market_data.sort(key=lambda x: x['change'], reverse=True)
-
-                # 显示数据
-                for idx, item in enumerate(market_data[:50], 1):
-                    symbol = item['symbol']
-                    price = item['price']
-                    change = item['change']
-                    volume = item['volume']
-
+                    symbols.append(symbol)
+
+                if filter_text:
+                    # instId本身就是大写，无需再转换
+                    matched = set(match_symbols(filter_text, symbols))
+                    keep = [i for i, symbol in enumerate(symbols) if symbol in matched]
+                    symbols = [symbols[i] for i in keep]
+                    values = [values[i] for i in keep]
+
+                arr = np.array(values, dtype=[('p', 'f8'), ('l', 'f8'), ('v', 'f8')])
+                prices, lows = arr['p'], arr['l']
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    change = np.where(lows > 0, (prices - lows) / lows * 100, 0.0)
+
+                # 按涨跌幅从高到低排序，全部交给排行榜，格式化只在显示时进行
+                order = np.argsort(-change, kind='stable').tolist()
+                prices, change, volumes = prices.tolist(), change.tolist(), arr['v'].tolist()
+                rows = [(symbols[i], prices[i], change[i], volumes[i]) for i in order]
+
+                fmt_small = "${:.8f}".format
+                fmt_big = "${:.4f}".format
+                fmt_up = "+{:.2f}%".format
+                fmt_down = "{:.2f}%".format
+                fmt_vol = "${:.2f}M".format
+                small_price_symbols = self._small_price_symbols
+
+                def format_row(index, row):
+                    symbol, price, change_pct, volume = row
                     # 根据币种调整精度
-                    if 'PEPE' in symbol or 'SHIB' in symbol:
-                        price_str = f"${price:.8f}"
-                    else:
-                        price_str = f"${price:.4f}"
-
-                    change_str = f"+{change:.2f}%" if change > 0 else f"{change:.2f}%"
-                    vol_str = f"${volume/1000000:.2f}M"
+                    price_str = fmt_small(price) if symbol in small_price_symbols else fmt_big(price)
+                    change_str = fmt_up(change_pct) if change_pct > 0 else fmt_down(change_pct)
+                    tag = 'up' if change_pct > 0 else 'down'
+                    return (index + 1, symbol, price_str, change_str, fmt_vol(volume / 1000000), '选择'), tag
 
-                    # 插入行
-                    tag = 'up' if change > 0 else 'down'
-                    self.market_tree.insert('', 'end', values=(idx, symbol, price_str, change_str, vol_str, '选择'),
-                                           tags=(tag,))
+                self._ui(lambda: self.market_view.set_rows(rows, format_row))
 
-                # 设置颜色
-                self.market_tree.tag_configure('up', foreground='#2ecc71')
-                self.market_tree.tag_configure('down', foreground='#e74c3c')
-
-                self.log(f"[INFO] 已更新 {len(market_data)} 个币种行情")
+                if not quiet:
+                    self.log(f"[INFO] 已更新 {len(symbols)} 个币种行情")
 
             except Exception as e:
                 self.log(f"[ERROR] 刷新市场数据失败: {e}")
 
-        threading.Thread(target=_refresh, daemon=True).start()
+        self._io_pool.submit(_refresh)
 
-    def on_market_select(self, event):
-        """双击选择币种进行交易"""
-        selection = self.market_tree.selection()
-        if selection:
-            item = self.market_tree.item(selection[0])
-            symbol = item['values'][1]
+    def on_market_select(self, index):
+        """双击选择币种进行交易（index为排行榜中的行号）"""
+        rows = self.market_view.rows
+        if index < len(rows):
+            symbol = rows[index][0]
+            if symbol not in self._all_symbols_set:
+                self.log(f"[WARN] 不可交易的币种: {symbol}")
+                return
             self.symbol = symbol
             self.symbol_search_var.set(symbol)
             self.log(f"[INFO] 选择交易币种: {symbol}")
             self.select_tab(0)  # 切换到交易主界面
             messagebox.showinfo("提示", f"已选择 {symbol}，请保存配置后开始交易")
 
-    def refresh_profile_data(self):
-        """刷新个人信息"""
+    def refresh_profile_data(self, quiet=False):
+        """刷新个人信息（quiet为True时不输出日志，用于自动刷新）"""
         def _refresh():
             try:
                 # 获取账户信息
-                balance = self.api_client.get_balance()
-                positions = self.api_client.get_positions()
+                balance = self._cached_api('get_balance')
+                positions = self._cached_api('get_positions')
 
+                # 后台线程只计算文本，界面更新统一交给主线程
+                updates = {}
                 if balance['code'] == '0' and balance['data']:
                     data = balance['data'][0]
                     total_eq = float(data.get('totalEq', 0))
                     avail_bal = float(data.get('availBal', 0))
                     margin_used = total_eq - avail_bal
 
-                    self.profile_info['total_eq'].config(text=f"${total_eq:.2f} USDT")
-                    self.profile_info['avail_bal'].config(text=f"${avail_bal:.2f} USDT")
-                    self.profile_info['margin_used'].config(text=f"${margin_used:.2f} USDT")
-                    self.profile_info['acct_lv'].config(text=data.get('acctLv', 'N/A'))
+                    updates['total_eq'] = {'text': f"${total_eq:.2f} USDT"}
+                    updates['avail_bal'] = {'text': f"${avail_bal:.2f} USDT"}
+                    updates['margin_used'] = {'text': f"${margin_used:.2f} USDT"}
+                    updates['acct_lv'] = {'text': data.get('acctLv', 'N/A')}
 
                 # 获取持仓
-                self.profile_positions.delete('1.0', 'end')
+                chunks = []
                 pos_count = 0
                 total_upl = 0
 
@@ -730,50 +1131,68 @@ class TradingUI:
                             upl = float(pos.get('upl', 0))
                             total_upl += upl
 
-                            self.profile_positions.insert('end', f"{'='*60}\n")
-                            self.profile_positions.insert('end', f"币种: {pos.get('instId')}\n")
-                            self.profile_positions.insert('end', f"方向: {'做多' if float(pos.get('pos', 0)) > 0 else '做空'}\n")
-                            self.profile_positions.insert('end', f"数量: {abs(float(pos.get('pos', 0)))} 张\n")
-                            self.profile_positions.insert('end', f"开仓价: ${pos.get('avgPx')}\n")
-                            self.profile_positions.insert('end', f"盈亏: ${upl:.2f} ({float(pos.get('uplRatio', 0))*100:.2f}%)\n\n")
+                            chunks.append(
+                                f"{'='*60}\n"
+                                f"币种: {pos.get('instId')}\n"
+                                f"方向: {'做多' if float(pos.get('pos', 0)) > 0 else '做空'}\n"
+                                f"数量: {abs(float(pos.get('pos', 0)))} 张\n"
+                                f"开仓价: ${pos.get('avgPx')}\n"
+                                f"盈亏: ${upl:.2f} ({float(pos.get('uplRatio', 0))*100:.2f}%)\n\n"
+                            )
 
                 if pos_count == 0:
-                    self.profile_positions.insert('end', "暂无持仓")
-
-                self.profile_info['pos_count'].config(text=f"{pos_count} 个")
-                self.profile_info['upl'].config(text=f"${total_upl:.2f} USDT",
-                                               fg=self.colors['success'] if total_upl >= 0 else self.colors['danger'])
-
-                self.log("[INFO] 个人信息已更新")
+                    chunks.append("暂无持仓")
+
+                text = ''.join(chunks)
+                # 持仓文本与上次相同时不重写文本框
+                text_changed = text != self._profile_text
+                self._profile_text = text
+
+                updates['pos_count'] = {'text': f"{pos_count} 个"}
+                updates['upl'] = {'text': f"${total_upl:.2f} USDT",
+                                  'fg': self.colors['success'] if total_upl >= 0 else self.colors['danger']}
+                # 只更新内容有变化的标签，数值不变时不触发重绘
+                updates = {key: opts for key, opts in updates.items() if self._profile_opts.get(key) != opts}
+                self._profile_opts.update(updates)
+
+                def _apply():
+                    for key, opts in updates.items():
+                        self.profile_info[key].config(**opts)
+                    if text_changed:
+                        # 只读文本框，写入时临时开启，整段一次插入
+                        self.profile_positions.config(state='normal')
+                        self.profile_positions.delete('1.0', 'end')
+                        self.profile_positions.insert('end', text)
+                        self.profile_positions.config(state='disabled')
+
+                if updates or text_changed:
+                    self._ui(_apply)
+
+                if not quiet:
+                    self.log("[INFO] 个人信息已更新")
 
             except Exception as e:
                 self.log(f"[ERROR] 更新个人信息失败: {e}")
 
-        threading.Thread(target=_refresh, daemon=True).start()
+        self._io_pool.submit(_refresh)
 
     def on_strategy_changed(self, event):
         """策略改变"""
         strategy_name = self.strategy_var.get()
-        for code, name in self.available_strategies.items():
-            if name == strategy_name:
-                self.strategy_type = code
-                break
+        self.strategy_type = self._strategy_name_to_code.get(strategy_name, self.strategy_type)
         self.log(f"[INFO] 切换策略: {strategy_name}")
 
     def save_config(self):
         """保存配置"""
         try:
             config_path = os.path.join(os.path.dirname(__file__), 'okx_trading_bot', 'config', 'config.yaml')
-            import yaml
-
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config_data = yaml.safe_load(f)
 
+            config_data = self._config_cache
             config_data['trading']['symbol'] = self.symbol
             config_data['trading']['strategy_type'] = self.strategy_type
 
             with open(config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config_data, f, allow_unicode=True)
+                yaml.dump(config_data, f, Dumper=YamlDumper, allow_unicode=True)
 
             self.log("[INFO] 配置已保存")
             messagebox.showinfo("成功", f"配置已保存！\n币种: {self.symbol}\n策略: {self.available_strategies[self.strategy_type]}")
@@ -786,6 +1205,7 @@ class TradingUI:
         if messagebox.askyesno("确认", "确定要平掉所有持仓吗？"):
             try:
                 result = self.api_client.close_position(self.symbol)
+                self._invalidate_api_cache()
                 if result['code'] == '0':
                     self.log("[INFO] 紧急平仓成功")
                     messagebox.showinfo("成功", "已平掉所有持仓")
@@ -796,90 +1216,259 @@ class TradingUI:
                 self.log(f"[ERROR] 平仓异常: {e}")
                 messagebox.showerror("错误", str(e))
 
-    def update_account_data(self):
-        """更新账户数据"""
+    def _start_private_ws(self):
+        """连接私有频道，订阅账户和持仓推送"""
+        okx_config = self.config.get_okx_config()
         try:
-            balance = self.api_client.get_balance()
-            if balance['code'] == '0' and balance['data']:
-                data = balance['data'][0]
-                equity = float(data.get('totalEq', 0))
+            ws = OKXWebSocket(
+                api_key=okx_config['api_key'],
+                secret_key=okx_config['secret_key'],
+                passphrase=okx_config['passphrase'],
+                is_simulated=okx_config.get('is_simulated', False),
+                channel_type='private'
+            )
+            ws.connect()
+            ws.subscribe_account(self._on_account_push)
+            ws.subscribe_positions('SWAP', self._on_positions_push)
+            self._ws = ws
+            self.log("[INFO] 已订阅账户和持仓推送")
+        except Exception as e:
+            # 私有频道不可用时继续定时轮询REST接口
+            self.log(f"[WARN] 订阅账户推送失败，改用定时刷新: {e}")
+
+    def _ws_active(self):
+        """私有频道推送是否可用"""
+        return self._ws is not None and self._ws.is_connected
+
+    def _on_account_push(self, data):
+        """账户推送（WebSocket线程）"""
+        if data:
+            self._show_account(data[0])
+
+    def _on_positions_push(self, data):
+        """持仓推送（WebSocket线程）"""
+        with self._ws_lock:
+            for pos in data:
+                self._ws_positions[(pos.get('instId'), pos.get('posSide'))] = pos
+        self._show_ws_positions()
+
+    def _show_ws_positions(self):
+        """用推送缓存显示当前币种的持仓"""
+        with self._ws_lock:
+            positions = [pos for pos in self._ws_positions.values() if pos.get('instId') == self.symbol]
+        self._show_positions(positions)
+
+    def _show_account(self, data):
+        """显示账户数据，与上次相同时跳过"""
+        equity = float(data.get('totalEq') or 0)
+
+        avail = 0
+        for detail in data.get('details', []):
+            if detail.get('ccy') == 'USDT':
+                avail = float(detail.get('availBal') or 0)
+
+        snapshot = (equity, avail)
+        if snapshot == self._account_snapshot:
+            return
+        self._account_snapshot = snapshot
+        self._state_changed = True
+
+        margin_used = equity - avail
+        margin_pct = (margin_used / equity * 100) if equity > 0 else 0
+
+        margin_color = self.colors['danger'] if margin_pct > 50 else self.colors['success']
+
+        def _apply():
+            self.balance_label.config(text=f"${equity:.2f}")
+            self.available_label.config(text=f"${avail:.2f}")
+            self.margin_label.config(text=f"${margin_used:.2f} ({margin_pct:.1f}%)", fg=margin_color)
+
+        self._ui(_apply)
+
+    def _show_positions(self, positions):
+        """显示持仓数据，文本与上次相同时跳过"""
+        price_fmt = self._price_fmt
+        chunks = []
+        for pos in positions:
+            pos_size = float(pos.get('pos') or 0)
+            if pos_size != 0:
+                side = "做多" if pos_size > 0 else "做空"
+                entry = float(pos.get('avgPx') or 0)
+                mark = float(pos.get('markPx') or 0)
+                upl = float(pos.get('upl') or 0)
+                upl_ratio = float(pos.get('uplRatio') or 0) * 100
+
+                chunks.append(f"方向: {side}\n")
+                chunks.append(f"数量: {abs(pos_size)} 张\n")
+
+                chunks.append(f"开仓: {price_fmt(entry)}\n")
+                chunks.append(f"当前: {price_fmt(mark)}\n")
+
+                chunks.append(f"盈亏: ${upl:.2f} ({upl_ratio:+.2f}%)\n")
+
+        if not chunks:
+            chunks.append("暂无持仓\n\n等待交易信号...")
+
+        text = ''.join(chunks)
+        if text == self._pos_snapshot:
+            return
+        self._pos_snapshot = text
+        self._state_changed = True
 
-                avail = 0
-                for detail in data.get('details', []):
-                    if detail.get('ccy') == 'USDT':
-                        avail = float(detail.get('availBal', 0))
+        def _apply():
+            self.position_text.delete('1.0', 'end')
+            self.position_text.insert('end', text)
 
-                margin_used = equity - avail
-                margin_pct = (margin_used / equity * 100) if equity > 0 else 0
+        self._ui(_apply)
 
-                self.balance_label.config(text=f"${equity:.2f}")
-                self.available_label.config(text=f"${avail:.2f}")
-                self.margin_label.config(text=f"${margin_used:.2f} ({margin_pct:.1f}%)",
-                                        fg=self.colors['danger'] if margin_pct > 50 else self.colors['success'])
+    def update_account_data(self):
+        """更新账户数据"""
+        try:
+            balance = self._cached_api('get_balance')
+            if balance['code'] == '0' and balance['data']:
+                self._show_account(balance['data'][0])
         except:
             pass
 
     def update_position_data(self):
         """更新持仓数据"""
         try:
-            positions = self.api_client.get_positions(inst_id=self.symbol)
-            self.position_text.delete('1.0', 'end')
-
-            if positions['code'] == '0' and positions['data']:
-                has_position = False
-                for pos in positions['data']:
-                    pos_size = float(pos.get('pos', 0))
-                    if pos_size != 0:
-                        has_position = True
-                        side = "做多" if pos_size > 0 else "做空"
-                        entry = float(pos.get('avgPx', 0))
-                        mark = float(pos.get('markPx', 0))
-                        upl = float(pos.get('upl', 0))
-                        upl_ratio = float(pos.get('uplRatio', 0)) * 100
-
-                        self.position_text.insert('end', f"方向: {side}\n")
-                        self.position_text.insert('end', f"数量: {abs(pos_size)} 张\n")
-
-                        if 'PEPE' in self.symbol or 'SHIB' in self.symbol:
-                            self.position_text.insert('end', f"开仓: ${entry:.8f}\n")
-                            self.position_text.insert('end', f"当前: ${mark:.8f}\n")
-                        else:
-                            self.position_text.insert('end', f"开仓: ${entry:.4f}\n")
-                            self.position_text.insert('end', f"当前: ${mark:.4f}\n")
-
-                        self.position_text.insert('end', f"盈亏: ${upl:.2f} ({upl_ratio:+.2f}%)\n")
-
-                if not has_position:
-                    self.position_text.insert('end', "暂无持仓\n\n等待交易信号...")
-            else:
-                self.position_text.insert('end', "暂无持仓\n\n等待交易信号...")
+            positions = self._cached_api('get_positions', inst_id=self.symbol)
+            self._show_positions(positions['data'] if positions['code'] == '0' else [])
         except:
             pass
 
+    def _cached_api(self, method, **params):
+        """调用账户/持仓查询接口，短时间内的重复调用直接返回上次结果（可在任意线程调用）"""
+        key = (method, tuple(sorted(params.items())))
+        now = time.monotonic()
+        with self._api_cache_lock:
+            cached = self._api_cache.get(key)
+            if cached and cached[1] > now:
+                return cached[0]
+
+        result = getattr(self.api_client, method)(**params)
+        if result.get('code') == '0':
+            with self._api_cache_lock:
+                self._api_cache[key] = (result, now + API_CACHE_TTL)
+        return result
+
+    def _invalidate_api_cache(self):
+        """清空查询缓存，下次刷新重新请求接口"""
+        with self._api_cache_lock:
+            self._api_cache.clear()
+
     def refresh_data(self):
         """刷新数据"""
         self.log("[INFO] 刷新数据...")
-        threading.Thread(target=self._refresh_data_thread, daemon=True).start()
+        self._submit_refresh()
 
-    def _refresh_data_thread(self):
-        """刷新数据线程"""
-        self.update_account_data()
-        self.update_position_data()
+    def _submit_refresh(self):
+        """并发刷新账户和持仓，上一轮还没完成时跳过，避免网络慢时任务堆积"""
+        if any(not future.done() for future in self._refresh_futures):
+            return
+        self._refresh_futures = [
+            self._io_pool.submit(self.update_account_data),
+            self._io_pool.submit(self.update_position_data),
+        ]
 
     def start_auto_update(self):
-        """启动自动更新"""
-        def auto_update():
-            while True:
+        """启动自动更新（只刷新当前可见的标签页）"""
+        self._auto_update()
+
+    def _auto_update(self):
+        """自动更新定时任务，窗口最小化时放慢且不刷新"""
+        self._auto_job = None
+        if self._stop.is_set():
+            return
+        interval = 5000
+        try:
+            if self.root.state() == 'iconic':
+                interval = 30000
+            elif self._active_tab == 0:
+                interval = self._next_poll_interval()
+                if self._ws_active():
+                    # 账户和持仓由推送更新，这里只处理切换币种后的持仓显示
+                    self._show_ws_positions()
+                else:
+                    self._submit_refresh()
+            elif self._active_tab == 1:
+                self.refresh_market_data(self.market_search_var.get().upper(), quiet=True)
+            elif self._active_tab == 2:
+                self.refresh_profile_data(quiet=True)
+        except Exception:
+            pass
+        self._auto_job = self.root.after(interval, self._auto_update)
+
+    def _next_poll_interval(self):
+        """交易页轮询间隔：数据有变化时回到快速轮询，连续几轮无变化后逐步放慢"""
+        if self._state_changed:
+            self._state_changed = False
+            self._unchanged_count = 0
+            self._poll_interval = POLL_FAST_MS
+        else:
+            self._unchanged_count += 1
+            if self._unchanged_count >= POLL_IDLE_ROUNDS:
+                self._poll_interval = min(POLL_SLOW_MS, int(self._poll_interval * 1.5))
+        return self._poll_interval
+
+    def _poll_soon(self):
+        """机器人有交易动作时尽快刷新账户和持仓"""
+        if self._stop.is_set():
+            return
+        self._poll_interval = POLL_TRADE_MS
+        self._unchanged_count = 0
+        self._invalidate_api_cache()
+        if self._auto_job is not None:
+            self.root.after_cancel(self._auto_job)
+        self._auto_job = self.root.after(POLL_TRADE_MS, self._auto_update)
+
+    def _shutdown(self):
+        """关闭窗口：停止定时刷新和机器人，断开推送和网络连接后销毁窗口"""
+        self._stop.set()
+        if self._auto_job is not None:
+            self.root.after_cancel(self._auto_job)
+            self._auto_job = None
+        for job in self._debounce_ids.values():
+            self.root.after_cancel(job)
+        self._debounce_ids.clear()
+
+        thread = self._bot_thread
+        if thread is not None:
+            # 机器人线程是守护线程，窗口销毁后进程退出会直接中断它，需等它撤单、断开连接后再退出
+            bot = self._bot
+            self._stop_bot_thread()
+            thread.join(timeout=BOT_STOP_TIMEOUT)
+            if thread.is_alive() and bot is not None:
                 try:
-                    self._refresh_data_thread()
-                except:
+                    bot.stop()
+                except Exception:
                     pass
-                time.sleep(5)
+        elif self.is_running:
+            self.stop_bot()
 
-        threading.Thread(target=auto_update, daemon=True).start()
+        try:
+            if self._ws:
+                self._ws.disconnect()
+        except Exception:
+            pass
+
+        # 取消还在排队的刷新，不等待进行中的请求
+        for future in self._refresh_futures:
+            future.cancel()
+        self._io_pool.shutdown(wait=False)
+        try:
+            self.api_client.session.close()
+        except Exception:
+            pass
+
+        self.root.destroy()
 
     def start_bot(self):
         """启动交易机器人"""
+        if self._bot_thread is not None and self._bot_stop.is_set():
+            messagebox.showwarning("警告", "机器人正在停止，请稍候再启动")
+            return
         if self.is_running:
             messagebox.showwarning("警告", "机器人已在运行中")
             return
@@ -889,13 +1478,15 @@ class TradingUI:
             self.log(f"[INFO] 交易对: {self.symbol}")
             self.log(f"[INFO] 策略: {self.available_strategies.get(self.strategy_type)}")
 
-            self.bot_process = subprocess.Popen(
-                ['python', 'main.py', '--mode', 'live'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
-            )
+            if self.bot_in_process:
+                self._start_bot_thread()
+            else:
+                self.bot_process = subprocess.Popen(
+                    ['python', 'main.py', '--mode', 'live'],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    bufsize=0
+                )
 
             self.is_running = True
             self.status_indicator.itemconfig(self.status_circle, fill=self.colors['success'])
@@ -905,7 +1496,8 @@ class TradingUI:
 
             self.log("[INFO] 交易机器人已启动")
 
-            threading.Thread(target=self._monitor_bot_output, daemon=True).start()
+            if self.bot_process:
+                self._monitor_bot_output()
 
         except Exception as e:
             self.log(f"[ERROR] 启动失败: {e}")
@@ -919,40 +1511,180 @@ class TradingUI:
         try:
             self.log("[INFO] 正在停止交易机器人...")
 
+            if self._bot_thread:
+                # 机器人线程收尾（撤单、断开WebSocket）结束后再切换为离线状态
+                self._stop_bot_thread()
+                self.status_indicator.itemconfig(self.status_circle, fill=self.colors['warning'])
+                self.status_label.config(text="正在停止...", fg=self.colors['warning'])
+                self.stop_button.set_enabled(False)
+                return
+
             if self.bot_process:
                 self.bot_process.terminate()
                 self.bot_process.wait(timeout=5)
+                self._close_output_poll()
 
-            self.is_running = False
-            self.status_indicator.itemconfig(self.status_circle, fill=self.colors['danger'])
-            self.status_label.config(text="系统离线", fg=self.colors['danger'])
-            self.start_button.set_enabled(True)
-            self.stop_button.set_enabled(False)
-
-            self.log("[INFO] 交易机器人已停止")
+            self._set_stopped_state()
 
         except Exception as e:
             self.log(f"[ERROR] 停止失败: {e}")
 
+    def _set_stopped_state(self):
+        """机器人已退出，界面切换为离线状态"""
+        self.is_running = False
+        self.status_indicator.itemconfig(self.status_circle, fill=self.colors['danger'])
+        self.status_label.config(text="系统离线", fg=self.colors['danger'])
+        self.start_button.set_enabled(True)
+        self.stop_button.set_enabled(False)
+
+        self.log("[INFO] 交易机器人已停止")
+
+    def _start_bot_thread(self):
+        """在后台线程中直接运行机器人，日志通过根logger处理器转发到日志面板"""
+        ui = self
+
+        class _UILogHandler(logging.Handler):
+            def emit(self, record):
+                try:
+                    ui._handle_bot_line(self.format(record))
+                except Exception:
+                    self.handleError(record)
+
+        handler = _UILogHandler()
+        handler.setFormatter(logging.Formatter('%(name)s - %(message)s'))
+        logging.getLogger().addHandler(handler)
+
+        stop = self._bot_stop = threading.Event()
+
+        def _run():
+            try:
+                # 延迟导入，只有启动机器人时才加载策略等模块
+                from main import TradingBot
+                bot = TradingBot()
+                self._bot = bot
+                if stop.is_set():
+                    return  # 初始化期间已被停止
+                # 停止通知走Event：run_live开始时会把is_running置为True，只设标志可能被覆盖
+                bot.run_live(stop_event=stop)
+            except Exception as e:
+                self.log(f"[ERROR] 机器人运行异常: {e}")
+            finally:
+                logging.getLogger().removeHandler(handler)
+                self._bot = None
+                # 无论是主动停止还是run_live自行返回，都由主线程切换为离线状态
+                self._ui(lambda: self._on_bot_thread_exit(thread))
+
+        thread = threading.Thread(target=_run, name='trading-bot', daemon=True)
+        self._bot_thread = thread
+        thread.start()
+
+    def _stop_bot_thread(self):
+        """通知进程内机器人退出主循环，收尾（撤单、断开WebSocket）在机器人线程中完成"""
+        self._bot_stop.set()
+        bot = self._bot
+        if bot:
+            bot.is_running = False
+
+    def _on_bot_thread_exit(self, thread):
+        """机器人线程已退出（主线程）"""
+        if thread is not self._bot_thread:
+            return
+        thread.join()
+        self._bot_thread = None
+        self._set_stopped_state()
+
     def _monitor_bot_output(self):
-        """监控机器人输出"""
-        if not self.bot_process:
+        """监控机器人输出（stdout/stderr都要持续读空，否则管道写满后子进程会阻塞）"""
+        proc = self.bot_process
+        if not proc:
             return
 
-        for line in iter(self.bot_process.stderr.readline, ''):
-            if not self.is_running:
-                break
-            if line.strip():
-                if "检测到" in line or "开仓" in line or "平仓" in line or "触发" in line:
-                    self.log(f"[TRADE] {line.strip()}")
+        if os.name == 'nt':
+            # Windows下select不支持管道，每个管道单独用一个线程读取（log只是入缓冲，可在线程中调用）
+            def _drain(pipe):
+                for raw in iter(pipe.readline, b''):
+                    self._handle_bot_line(raw.decode('utf-8', errors='replace'))
+
+            for pipe in (proc.stdout, proc.stderr):
+                threading.Thread(target=_drain, args=(pipe,), daemon=True).start()
+            return
+
+        # POSIX下管道设为非阻塞，由Tk事件循环定时读取，不需要单独的监控线程
+        sel = selectors.DefaultSelector()
+        for pipe in (proc.stdout, proc.stderr):
+            os.set_blocking(pipe.fileno(), False)
+            # data: [增量解码器, 未凑成整行的残余文本]
+            sel.register(pipe, selectors.EVENT_READ, [codecs.getincrementaldecoder('utf-8')(errors='replace'), ''])
+        self._out_sel = sel
+        self._poll_output()
+
+    def _poll_output(self):
+        """每次唤醒对stdout/stderr做一次select，读出就绪管道中的输出，50ms后再次调度"""
+        self._poll_job = None
+        sel = self._out_sel
+        if sel is None:
+            return
+
+        for key, _ in sel.select(timeout=0):
+            try:
+                chunk = os.read(key.fd, 65536)
+            except BlockingIOError:
+                continue
+            if not chunk:
+                sel.unregister(key.fileobj)
+                self._handle_bot_line(key.data[1])
+                continue
+
+            decoder, pending = key.data
+            *lines, key.data[1] = (pending + decoder.decode(chunk)).split('\n')
+            for line in lines:
+                self._handle_bot_line(line)
+
+        if sel.get_map():
+            self._poll_job = self.root.after(50, self._poll_output)
+        else:
+            self._close_output_poll()
+
+    def _close_output_poll(self):
+        """停止读取机器人输出"""
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        if self._out_sel is not None:
+            self._out_sel.close()
+            self._out_sel = None
+
+    def _handle_bot_line(self, line):
+        """处理机器人输出的一行，只把交易相关的内容显示到日志面板"""
+        line = line.strip()
+        if line and self._TRADE_RE.search(line):
+            self.log(f"[TRADE] {line}")
+            self._ui(self._poll_soon)
 
     def log(self, message):
-        """添加日志"""
-        def _log():
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.log_text.insert('end', f"[{timestamp}] {message}\n")
-            self.log_text.see('end')
-        self.root.after(0, _log)
+        """添加日志（可在任意线程调用）"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self._log_buffer.append(f"[{timestamp}] {message}")
+
+    def _drain_log(self):
+        """约30Hz把缓冲中的日志一次写入日志框"""
+        buffer = self._log_buffer
+        if buffer:
+            lines = []
+            try:
+                while True:
+                    lines.append(buffer.popleft())
+            except IndexError:
+                pass
+            log_text = self.log_text
+            log_text.insert('end', '\n'.join(lines) + '\n')
+
+            # 超出上限时删掉最早的行，保持插入和滚动的开销不随运行时间增长
+            count = int(log_text.index('end-1c').split('.')[0])
+            if count > LOG_MAX_LINES:
+                log_text.delete('1.0', f'{count - LOG_MAX_LINES}.0')
+            log_text.see('end')
+        self.root.after(33, self._drain_log)
 
 
 def main():